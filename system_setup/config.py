@@ -21,13 +21,19 @@ def deep_merge(base: Dict, override: Dict) -> Dict:
     Returns:
         Merged dictionary
     """
+    # Copy base once up front; nested dicts in the copy are then merged in
+    # place rather than re-copied at every level
     result = deepcopy(base)
-
-    for key, value in override.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = deep_merge(result[key], value)
-        else:
-            result[key] = deepcopy(value)
+    pending = [(result, override)]
+
+    while pending:
+        target, source = pending.pop()
+        for key, value in source.items():
+            current = target.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                pending.append((current, value))
+            else:
+                target[key] = deepcopy(value)
 
     return result
 
@@ -0,0 +1,62 @@
+#!/bin/bash
+# Show keybindings in a popup using walker
+
+keybinds="=== APPS ===
+SUPER + T : Terminal
+SUPER + B : Firefox
+SUPER + E : File manager (Nemo)
+SUPER + R : App launcher (Walker)
+SUPER + V : Clipboard history
+SUPER + . : Emoji picker
+SUPER + / : This help
+CTRL + \` : Quake terminal
+---
+=== WINDOWS ===
+SUPER + Q : Close window
+SUPER + SHIFT + Q : Force kill window
+SUPER + F : Toggle floating
+SUPER + C : Center floating window
+SUPER + Tab : Cycle windows
+SUPER + \` : Focus urgent window
+LALT + RALT : Toggle fullscreen
+CTRL + ALT + Z : Maximize (keep bar)
+---
+=== VIM MOVEMENT ===
+SUPER + HJKL : Move focus
+SUPER + SHIFT + HJKL : Move window
+SUPER + CTRL + HJKL : Resize window
+SUPER + Arrows : Move focus (alt)
+---
+=== LAYOUT ===
+SUPER + D : Toggle split direction
+SUPER + P : Pseudo tile
+SUPER + G : Toggle group/tabs
+SUPER + W : Cycle grouped windows
+---
+=== WORKSPACES ===
+SUPER + 1-0 : Switch workspace
+SUPER + SHIFT + 1-0 : Move window to workspace
+SUPER + [ : Previous workspace
+SUPER + ] : Next workspace
+SUPER + SHIFT + [ : Move window to prev WS
+SUPER + SHIFT + ] : Move window to next WS
+SUPER + S : Scratchpad
+SUPER + SHIFT + S : Move to scratchpad
+SUPER + Scroll : Cycle workspaces
+---
+=== MOUSE ===
+SUPER + LMB drag : Move window
+SUPER + RMB drag : Resize window
+---
+=== SYSTEM ===
+SUPER + SHIFT + L : Lock screen
+SUPER + SHIFT + B : Toggle status bar
+SUPER + M : Exit Hyprland
+---
+=== SCREENSHOT ===
+Print : Full screen
+SUPER + Print : Window
+SUPER + SHIFT + Print : Region
+SUPER + ALT + Print : Region + annotate"
+
+echo "$keybinds" | walker --dmenu -p "Keybindings"
@@ -38,6 +38,8 @@ class AptManager(PackageManager):
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
 
     def is_installed(self, package: str) -> bool:
         """Check if a package is installed."""
@@ -1,8 +1,9 @@
 """Base package manager abstraction."""
 
+import os
 import subprocess
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, FrozenSet, List, Optional
 
 
 class PackageManager(ABC):
@@ -16,6 +17,7 @@ class PackageManager(ABC):
             dry_run: If True, don't actually execute commands
         """
         self.dry_run = dry_run
+        self._installed: Optional[FrozenSet[str]] = None
 
     @property
     @abstractmethod
@@ -64,11 +66,29 @@ class PackageManager(ABC):
         """
         pass
 
+    def installed_set(self) -> FrozenSet[str]:
+        """
+        Get the names of all installed packages.
+
+        Queried once and cached until the next install.
+
+        Returns:
+            Installed package names (empty if this manager cannot list them)
+        """
+        if self._installed is None:
+            self._installed = self._list_installed()
+        return self._installed
+
+    def _list_installed(self) -> FrozenSet[str]:
+        """List installed package names. Managers that can do so override this."""
+        return frozenset()
+
     def _run_command(
         self,
         cmd: List[str],
         check: bool = True,
         capture_output: bool = False,
+        env: Optional[Dict[str, str]] = None,
     ) -> subprocess.CompletedProcess:
         """
         Run a command with optional dry-run support.
@@ -77,6 +97,7 @@ class PackageManager(ABC):
             cmd: Command to run as list
             check: Raise exception on non-zero exit code
             capture_output: Capture stdout/stderr
+            env: Extra environment variables for the command
 
         Returns:
             CompletedProcess instance
@@ -98,4 +119,5 @@ class PackageManager(ABC):
             check=check,
             capture_output=capture_output,
             text=True if capture_output else False,
+            env={**os.environ, **env} if env else None,
         )
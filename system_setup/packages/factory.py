@@ -1,5 +1,6 @@
 """Package manager factory."""
 
+from functools import lru_cache
 from typing import Optional
 
 from system_setup.packages.apt import AptManager
@@ -11,6 +12,7 @@ from system_setup.packages.winget import ChocolateyManager, WingetManager
 from system_setup.platform import Platform
 
 
+@lru_cache(maxsize=None)
 def get_package_manager(
     platform: Platform,
     dry_run: bool = False,
@@ -19,6 +21,10 @@ def get_package_manager(
     """
     Get the appropriate package manager for the platform.
 
+    The result is cached per (platform, dry_run, prefer_aur_helper), so the
+    PATH probes run once per process. Call get_package_manager.cache_clear()
+    after installing a package manager.
+
     Args:
         platform: Platform instance
         dry_run: Enable dry-run mode
@@ -81,7 +87,12 @@ def ensure_paru_installed(dry_run: bool = False) -> bool:
     if not ParuManager.can_install():
         return False
 
-    return paru.install_paru()
+    if not paru.install_paru():
+        return False
+
+    # A cached lookup may have settled on pacman before paru existed
+    get_package_manager.cache_clear()
+    return True
 
 
 def get_aur_manager(dry_run: bool = False) -> Optional[ParuManager]:
@@ -6,10 +6,31 @@ from typing import List
 
 from system_setup.packages.base import PackageManager
 
+# Skip the cleanup that every `brew install` would otherwise repeat
+INSTALL_ENV = {
+    'HOMEBREW_NO_INSTALL_CLEANUP': '1',
+}
+
+# After update() has run, also skip the implicit update before each install
+UPDATED_INSTALL_ENV = {
+    **INSTALL_ENV,
+    'HOMEBREW_NO_AUTO_UPDATE': '1',
+}
+
 
 class HomebrewManager(PackageManager):
     """Homebrew package manager (macOS/Linux)."""
 
+    def __init__(self, dry_run: bool = False) -> None:
+        """
+        Initialize Homebrew manager.
+
+        Args:
+            dry_run: If True, don't actually execute commands
+        """
+        super().__init__(dry_run)
+        self._updated = False
+
     @property
     def name(self) -> str:
         """Get package manager name."""
@@ -23,6 +44,7 @@ class HomebrewManager(PackageManager):
         """Update Homebrew."""
         try:
             self._run_command(['brew', 'update'])
+            self._updated = True
             return True
         except subprocess.CalledProcessError:
             return False
@@ -32,6 +54,7 @@ class HomebrewManager(PackageManager):
         if not packages:
             return True
 
+        env = UPDATED_INSTALL_ENV if self._updated else INSTALL_ENV
         try:
             # Separate formulas from casks
             formulas = [p for p in packages if not p.endswith('.cask')]
@@ -39,15 +62,17 @@ class HomebrewManager(PackageManager):
 
             # Install formulas
             if formulas:
-                self._run_command(['brew', 'install'] + formulas)
+                self._run_command(['brew', 'install'] + formulas, env=env)
 
             # Install casks
             if casks:
-                self._run_command(['brew', 'install', '--cask'] + casks)
+                self._run_command(['brew', 'install', '--cask'] + casks, env=env)
 
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
 
     def is_installed(self, package: str) -> bool:
         """Check if a package is installed."""
@@ -2,7 +2,7 @@
 
 import shutil
 import subprocess
-from typing import List
+from typing import FrozenSet, List
 
 from system_setup.packages.base import PackageManager
 
@@ -38,6 +38,18 @@ class PacmanManager(PackageManager):
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
+
+    def _list_installed(self) -> FrozenSet[str]:
+        """List installed package names with a single query."""
+        try:
+            result = self._run_command(['pacman', '-Qq'], check=False, capture_output=True)
+        except OSError:
+            return frozenset()
+        if result.returncode != 0:
+            return frozenset()
+        return frozenset(result.stdout.split())
 
     def is_installed(self, package: str) -> bool:
         """Check if a package is installed."""
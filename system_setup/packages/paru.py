@@ -4,7 +4,7 @@ import os
 import shutil
 import subprocess
 import tempfile
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 
 from system_setup.packages.base import PackageManager
 
@@ -88,6 +88,8 @@ class ParuManager(PackageManager):
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
 
     def install(self, packages: List[str]) -> bool:
         """
@@ -110,6 +112,8 @@ class ParuManager(PackageManager):
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
 
     def install_aur(self, packages: List[str]) -> bool:
         """
@@ -131,6 +135,18 @@ class ParuManager(PackageManager):
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
+
+    def _list_installed(self) -> FrozenSet[str]:
+        """List installed package names with a single query."""
+        try:
+            result = self._run_command(['paru', '-Qq'], check=False, capture_output=True)
+        except OSError:
+            return frozenset()
+        if result.returncode != 0:
+            return frozenset()
+        return frozenset(result.stdout.split())
 
     def is_installed(self, package: str) -> bool:
         """Check if a package is installed."""
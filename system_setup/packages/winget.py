@@ -39,6 +39,8 @@ class WingetManager(PackageManager):
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
 
     def is_installed(self, package: str) -> bool:
         """Check if a package is installed."""
@@ -84,6 +86,8 @@ class ChocolateyManager(PackageManager):
             return True
         except subprocess.CalledProcessError:
             return False
+        finally:
+            self._installed = None
 
     def is_installed(self, package: str) -> bool:
         """Check if a package is installed."""
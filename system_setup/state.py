@@ -2,8 +2,9 @@
 
 import json
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 
 
 class StateManager:
@@ -18,6 +19,8 @@ class StateManager:
         """
         self.state_file = state_file or Path.home() / ".system_setup_state"
         self._state: Dict[str, float] = {}
+        self._batch_depth = 0
+        self._dirty = False
         self._load()
 
     def _load(self) -> None:
@@ -46,6 +49,23 @@ class StateManager:
         except OSError as e:
             raise RuntimeError(f"Failed to save state: {e}") from e
 
+    @contextmanager
+    def batched(self) -> Iterator[None]:
+        """
+        Defer saving until the outermost batch exits.
+
+        Steps marked inside the block are written in one save, which also
+        happens if the block raises, so completed steps are never lost.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._dirty = False
+                self._save()
+
     def mark_complete(self, step: str) -> None:
         """
         Mark a step as complete.
@@ -54,7 +74,10 @@ class StateManager:
             step: Step identifier (e.g., 'packages_installed', 'dotfiles_configured')
         """
         self._state[step] = time.time()
-        self._save()
+        if self._batch_depth:
+            self._dirty = True
+        else:
+            self._save()
 
     def is_complete(self, step: str) -> bool:
         """
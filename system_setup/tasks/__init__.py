@@ -1,15 +1,31 @@
 """Task modules for system setup."""
 
+from importlib import import_module
+from typing import Any
+
 from system_setup.tasks.base import BaseTask
-from system_setup.tasks.chezmoi import ChezmoiTask
-from system_setup.tasks.dotfiles import DotfilesTask
-from system_setup.tasks.fish import FishTask
-from system_setup.tasks.hyprland import HyprlandTask
-from system_setup.tasks.modern_tools import ModernToolsTask
-from system_setup.tasks.packages import PackagesTask
 from system_setup.tasks.registry import TaskRegistry, get_registry
-from system_setup.tasks.settings import SettingsTask
-from system_setup.tasks.shell import ShellTask
+
+# Task classes are imported on first access so that importing the package
+# (e.g. for the registry or `--help`) does not load every task module
+_LAZY_TASKS = {
+    "ChezmoiTask": "system_setup.tasks.chezmoi",
+    "DotfilesTask": "system_setup.tasks.dotfiles",
+    "FishTask": "system_setup.tasks.fish",
+    "HyprlandTask": "system_setup.tasks.hyprland",
+    "ModernToolsTask": "system_setup.tasks.modern_tools",
+    "PackagesTask": "system_setup.tasks.packages",
+    "SettingsTask": "system_setup.tasks.settings",
+    "ShellTask": "system_setup.tasks.shell",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_TASKS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
+
 
 __all__ = [
     "BaseTask",
@@ -1,7 +1,10 @@
 """Base task abstraction for system setup."""
 
+import os
+import shutil
 from abc import ABC, abstractmethod
-from typing import Optional
+from pathlib import Path
+from typing import ClassVar, Optional, Tuple
 
 from system_setup.config import Config
 from system_setup.logger import SetupLogger, get_logger
@@ -9,6 +12,9 @@ from system_setup.platform import Platform
 from system_setup.state import StateManager
 from system_setup.utils.command import CommandRunner
 
+# Answers accepted as confirmation at y/N prompts
+YES_ANSWERS = frozenset({'y', 'yes'})
+
 
 class BaseTask(ABC):
     """Abstract base class for all setup tasks.
@@ -20,9 +26,13 @@ class BaseTask(ABC):
 
     Tasks optionally implement:
     - platforms: List of supported platforms (default: all)
-    - depends_on: List of task names that must run first
+    - depends_on: Names of tasks that must run first (class attribute)
     """
 
+    # Declared on the class so the registry can order tasks without
+    # constructing them
+    depends_on: ClassVar[Tuple[str, ...]] = ()
+
     def __init__(
         self,
         config: Config,
@@ -85,11 +95,6 @@ class BaseTask(ABC):
         """List of supported platforms. Empty list means all platforms."""
         return []  # Empty = all platforms supported
 
-    @property
-    def depends_on(self) -> list[str]:
-        """List of task names that must complete before this task."""
-        return []
-
     def is_supported(self) -> bool:
         """Check if this task is supported on the current platform."""
         if not self.platforms:
@@ -136,12 +141,66 @@ class BaseTask(ABC):
             return True
 
         response = input(f"{prompt} (y/N): ")
-        return response.lower() in ('y', 'yes')
+        return response.strip().lower() in YES_ANSWERS
 
     def log_dry_run(self, action: str) -> None:
         """Log a dry-run action."""
         self.logger.info(f"[DRY RUN] Would {action}")
 
+    def _atomic_write_text(self, path: Path, content: str, mode: Optional[int] = None) -> None:
+        """
+        Write a file via a temp file and rename, so readers never see it half-written.
+
+        A symlink (e.g. a dotfile managed by stow or chezmoi) is kept and its
+        target is replaced instead.
+
+        Args:
+            path: File to write
+            content: Text to write
+            mode: Permissions for the file (default: keep those of the file
+                being replaced)
+        """
+        if path.is_symlink():
+            path = path.resolve()
+        tmp_path = path.with_name(path.name + '.tmp')
+        try:
+            # Raw fd write: the bytes are already encoded, no buffered IO needed
+            data = memoryview(content.encode())
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            if mode is not None:
+                os.chmod(tmp_path, mode)
+            elif path.exists():
+                shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _write_if_changed(self, path: Path, content: str, mode: Optional[int] = None) -> bool:
+        """
+        Atomically write a file unless it already holds exactly this content.
+
+        Args:
+            path: File to write
+            content: Text to write
+            mode: Permissions for the file (see _atomic_write_text)
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        try:
+            if path.read_bytes() == content.encode():
+                return False
+        except FileNotFoundError:
+            pass
+        self._atomic_write_text(path, content, mode)
+        return True
+
     @abstractmethod
     def run(self) -> bool:
         """
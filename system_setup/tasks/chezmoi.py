@@ -1,11 +1,63 @@
 """Chezmoi dotfiles management task."""
 
+import hmac
+import os
+import re
 import shutil
+import stat
+import subprocess
+from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import requests
 
 from system_setup.packages.factory import get_package_manager
-from system_setup.tasks.base import BaseTask
+from system_setup.platform.base import Architecture
+from system_setup.tasks.base import YES_ANSWERS, BaseTask
+from system_setup.utils.checksum import HashingReader, normalize_hash
+from system_setup.utils.command import CommandResult
+from system_setup.utils.download import get_session
+
+
+CHEZMOI_RELEASE_API = "https://api.github.com/repos/twpayne/chezmoi/releases/latest"
+CHEZMOI_RELEASE_URL = "https://github.com/twpayne/chezmoi/releases/download"
+
+# Release asset architecture names
+CHEZMOI_ARCH_NAMES = {
+    Architecture.X86_64: 'amd64',
+    Architecture.ARM64: 'arm64',
+    Architecture.AARCH64: 'arm64',
+    Architecture.I386: 'i386',
+}
+
+# Maximum characters of diff/dry-run output shown to the user
+DIFF_PREVIEW_LIMIT = 2000
+
+# Existing [data] table in chezmoi.toml (up to the next table header)
+_DATA_SECTION_RE = re.compile(r'\[data\].*?(?=\n\[|$)', re.DOTALL)
+
+
+class PathType(Enum):
+    """Result of a cached filesystem probe."""
+    FILE = "file"
+    DIR = "dir"
+    MISSING = "missing"
+
+
+@lru_cache(maxsize=None)
+def _stat_cached(path: str) -> PathType:
+    """Stat a path once and remember what kind of entry it is."""
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return PathType.MISSING
+    if stat.S_ISREG(mode):
+        return PathType.FILE
+    if stat.S_ISDIR(mode):
+        return PathType.DIR
+    return PathType.MISSING
 
 
 class ChezmoiTask(BaseTask):
@@ -21,8 +73,11 @@ class ChezmoiTask(BaseTask):
     def __init__(self, *args, **kwargs) -> None:
         """Initialize chezmoi task."""
         super().__init__(*args, **kwargs)
-        self.chezmoi_source_path = Path.home() / ".local" / "share" / "chezmoi"
+        self.home = Path.home()
+        self.chezmoi_source_path = self.home / ".local" / "share" / "chezmoi"
+        self.chezmoi_config_path = self.home / ".config" / "chezmoi" / "chezmoi.toml"
         self._chezmoi_bin: Optional[str] = None
+        self._query_cache: Dict[Tuple[str, ...], CommandResult] = {}
 
     @property
     def name(self) -> str:
@@ -38,6 +93,16 @@ class ChezmoiTask(BaseTask):
 
     def _get_chezmoi_cmd(self) -> str:
         """Get the chezmoi command, checking common install locations."""
+        # Default to just 'chezmoi' and hope for the best
+        return self._resolve_chezmoi_cmd() or 'chezmoi'
+
+    def _resolve_chezmoi_cmd(self) -> Optional[str]:
+        """
+        Locate an installed chezmoi binary.
+
+        Returns:
+            Command to invoke chezmoi, or None if it is not installed
+        """
         if self._chezmoi_bin:
             return self._chezmoi_bin
 
@@ -48,19 +113,43 @@ class ChezmoiTask(BaseTask):
 
         # Check common install locations
         locations = [
-            Path.home() / 'bin' / 'chezmoi',
-            Path.home() / '.local' / 'bin' / 'chezmoi',
+            self.home / 'bin' / 'chezmoi',
+            self.home / '.local' / 'bin' / 'chezmoi',
             Path('/usr/local/bin/chezmoi'),
         ]
-        for loc in locations:
-            if loc.exists() and loc.is_file():
-                self._chezmoi_bin = str(loc)
-                return self._chezmoi_bin
-
-        # Default to just 'chezmoi' and hope for the best
-        self._chezmoi_bin = 'chezmoi'
+        # Directories on PATH were already searched by shutil.which
+        path_dirs = set(os.environ.get('PATH', '').split(os.pathsep))
+        self._chezmoi_bin = next(
+            (
+                str(loc) for loc in locations
+                if str(loc.parent) not in path_dirs and _stat_cached(str(loc)) == PathType.FILE
+            ),
+            None,
+        )
         return self._chezmoi_bin
 
+    def _query(self, *args: str) -> CommandResult:
+        """
+        Run a read-only chezmoi command, reusing earlier output.
+
+        chezmoi has no long-running/batch mode, so repeated queries (managed,
+        status) are served from the first invocation's result until a
+        mutating command invalidates them.
+
+        Args:
+            *args: chezmoi subcommand and arguments
+
+        Returns:
+            CommandResult of the (possibly cached) invocation
+        """
+        if args not in self._query_cache:
+            self._query_cache[args] = self.cmd.run_quiet([self._get_chezmoi_cmd(), *args])
+        return self._query_cache[args]
+
+    def _invalidate_queries(self) -> None:
+        """Forget cached query results after the source or target state changes."""
+        self._query_cache.clear()
+
     def run(self) -> bool:
         """
         Execute chezmoi dotfiles management task.
@@ -92,8 +181,7 @@ class ChezmoiTask(BaseTask):
     def _ensure_chezmoi_installed(self) -> bool:
         """Ensure chezmoi is installed."""
         # Check if already installed (in PATH or common locations)
-        chezmoi_cmd = self._get_chezmoi_cmd()
-        if shutil.which(chezmoi_cmd) or Path(chezmoi_cmd).exists():
+        if self._resolve_chezmoi_cmd():
             self.logger.info("Chezmoi is already installed")
             return True
 
@@ -107,27 +195,116 @@ class ChezmoiTask(BaseTask):
         pkg_manager = get_package_manager(self.platform, self.dry_run)
         if pkg_manager:
             if pkg_manager.install(['chezmoi']):
+                _stat_cached.cache_clear()
                 self.logger.success("Chezmoi installed via package manager")
                 return True
 
-        # Fallback to install script - install to ~/.local/bin
+        # Fallback to release binary - install to ~/.local/bin
         try:
-            bin_dir = Path.home() / '.local' / 'bin'
+            bin_dir = self.home / '.local' / 'bin'
             bin_dir.mkdir(parents=True, exist_ok=True)
-            result = self.cmd.run(
-                f'curl -fsLS get.chezmoi.io | sh -s -- -b {bin_dir}',
-                shell=True,
-            )
-            if result.success:
-                self._chezmoi_bin = str(bin_dir / 'chezmoi')
-                self.logger.success("Chezmoi installed via install script")
-                return True
-            self.logger.error(f"Failed to install chezmoi: {result.stderr}")
-            return False
+            dest = bin_dir / 'chezmoi'
+            self._install_from_release(dest)
+            self._chezmoi_bin = str(dest)
+            self.logger.success("Chezmoi installed from release binary")
+            return True
         except Exception as e:
             self.logger.error(f"Failed to install chezmoi: {e}")
             return False
 
+    def _install_from_release(self, dest: Path) -> None:
+        """
+        Download the latest chezmoi release tarball and extract the binary.
+
+        The tarball is streamed straight into tarfile and hashed as it is
+        read, so nothing is written to disk except the binary itself. The
+        binary is extracted next to dest and only moved into place once the
+        tarball matches the release's checksums.txt.
+
+        Args:
+            dest: Destination path for the chezmoi binary
+
+        Raises:
+            RuntimeError: If the platform is unsupported, the checksum does
+                not match or the binary is missing
+            requests.RequestException: If the download fails
+        """
+        if self.platform.is_macos:
+            os_name = 'darwin'
+        elif self.platform.is_linux:
+            os_name = 'linux'
+        else:
+            raise RuntimeError("No chezmoi release tarball for this platform")
+
+        arch = CHEZMOI_ARCH_NAMES.get(self.platform.architecture)
+        if arch is None:
+            raise RuntimeError(f"Unsupported architecture: {self.platform.architecture.value}")
+
+        import tarfile
+        import tempfile
+
+        session = get_session()
+        response = session.get(CHEZMOI_RELEASE_API, timeout=30)
+        response.raise_for_status()
+        tag = response.json()['tag_name']
+        version = tag.lstrip('v')
+
+        tarball = f"chezmoi_{version}_{os_name}_{arch}.tar.gz"
+        expected = self._release_checksum(session, tag, version, tarball)
+
+        url = f"{CHEZMOI_RELEASE_URL}/{tag}/{tarball}"
+        self.logger.info(f"Downloading {url}...")
+        fd, tmp_name = tempfile.mkstemp(prefix='.chezmoi-', dir=dest.parent)
+        tmp = Path(tmp_name)
+        try:
+            found = False
+            with os.fdopen(fd, 'wb') as f, \
+                    session.get(url, stream=True, timeout=300) as response:
+                response.raise_for_status()
+                reader = HashingReader(response.raw)
+                with tarfile.open(fileobj=reader, mode='r|gz') as tar:
+                    for member in tar:
+                        if member.isfile() and Path(member.name).name == 'chezmoi':
+                            shutil.copyfileobj(tar.extractfile(member), f)
+                            found = True
+                            break
+                actual = reader.hexdigest()
+
+            if not hmac.compare_digest(normalize_hash(actual), expected):
+                raise RuntimeError(f"Checksum mismatch for {tarball}")
+            if not found:
+                raise RuntimeError("chezmoi binary not found in release tarball")
+
+            tmp.chmod(0o755)
+            os.replace(tmp, dest)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    @staticmethod
+    def _release_checksum(
+        session: requests.Session, tag: str, version: str, tarball: str,
+    ) -> bytes:
+        """
+        Look up a release asset's SHA256 in the release's checksums.txt.
+
+        Returns:
+            Digest bytes (see normalize_hash)
+
+        Raises:
+            RuntimeError: If the asset is not listed
+            requests.RequestException: If the download fails
+        """
+        url = f"{CHEZMOI_RELEASE_URL}/{tag}/chezmoi_{version}_checksums.txt"
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        for line in response.text.splitlines():
+            # Lines read "<sha256>  <asset name>"
+            fields = line.split()
+            if len(fields) == 2 and fields[1] == tarball:
+                return normalize_hash(fields[0])
+        raise RuntimeError(f"{tarball} is not listed in the release checksums")
+
     def _init_or_update(self) -> bool:
         """Initialize chezmoi from repo or update existing."""
         repo_url = self._get_repo_url()
@@ -140,6 +317,7 @@ class ChezmoiTask(BaseTask):
                     self.logger.info("[DRY RUN] Would run: chezmoi init")
                     return True
                 result = self.cmd.run([self._get_chezmoi_cmd(), 'init'], check=False)
+                self._invalidate_queries()
                 if result.success:
                     return True
                 self.logger.error(f"Failed to initialize chezmoi: {result.stderr}")
@@ -178,6 +356,7 @@ class ChezmoiTask(BaseTask):
             cmd.append('--ssh')
 
         result = self.cmd.run(cmd, check=False)
+        self._invalidate_queries()
         if result.success:
             self.logger.success("Chezmoi initialized from repository")
             return True
@@ -197,6 +376,7 @@ class ChezmoiTask(BaseTask):
             [self._get_chezmoi_cmd(), 'git', 'pull', '--', '--rebase'],
             check=False,
         )
+        self._invalidate_queries()
         if result.success:
             self.logger.success("Chezmoi source updated from remote")
         else:
@@ -207,34 +387,66 @@ class ChezmoiTask(BaseTask):
     def _apply_dotfiles(self) -> bool:
         """Apply chezmoi dotfiles to home directory."""
         if self.dry_run:
-            self.logger.info("[DRY RUN] Would run: chezmoi apply")
+            # chezmoi's own dry run is read-only, so run it for real to show
+            # exactly what would change (supersedes a separate diff call)
+            try:
+                result = self.cmd.run_head(
+                    [self._get_chezmoi_cmd(), 'apply', '--dry-run', '--verbose'],
+                    limit=DIFF_PREVIEW_LIMIT + 1,
+                    read_only=True,
+                )
+            except (OSError, subprocess.TimeoutExpired):
+                # chezmoi not installed yet (install is skipped in dry run)
+                # or it hung: fall back to naming the command
+                result = None
+            if result is None or not (result.success or result.truncated):
+                self.logger.info("[DRY RUN] Would run: chezmoi apply")
+            elif result.stdout:
+                self.logger.info("[DRY RUN] Changes that would be applied:")
+                self._print_truncated(result.stdout)
+            else:
+                self.logger.info("[DRY RUN] No changes to apply")
             return True
 
         if not self.auto_yes:
             # Show diff first
             self.logger.info("Checking for changes...")
-            result = self.cmd.run_quiet([self._get_chezmoi_cmd(), 'diff'])
+            # Only the preview is shown, so stop reading once it is full
+            result = self.cmd.run_head(
+                [self._get_chezmoi_cmd(), 'diff'],
+                limit=DIFF_PREVIEW_LIMIT + 1,
+            )
             if result.stdout:
                 self.logger.info("Changes to be applied:")
-                print(result.stdout[:2000])  # Limit output
-                if len(result.stdout) > 2000:
-                    print("... (output truncated)")
+                self._print_truncated(result.stdout)
             else:
                 self.logger.info("No changes to apply")
                 return True
 
             response = input("Apply chezmoi dotfiles? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
+            if response.strip().lower() not in YES_ANSWERS:
                 self.logger.info("Skipping chezmoi apply")
                 return True
 
-        result = self.cmd.run([self._get_chezmoi_cmd(), 'apply', '--verbose'], check=False)
+        # --verbose prints every diff; only ask for it when debugging
+        apply_cmd = [self._get_chezmoi_cmd(), 'apply']
+        if self.logger.verbose:
+            apply_cmd.append('--verbose')
+        result = self.cmd.run(apply_cmd, check=False)
+        self._invalidate_queries()
         if result.success:
             self.logger.success("Dotfiles applied successfully")
             return True
         self.logger.error(f"Failed to apply dotfiles: {result.stderr}")
         return False
 
+    @staticmethod
+    def _print_truncated(output: str, limit: int = DIFF_PREVIEW_LIMIT) -> None:
+        """Print command output, truncated to limit characters."""
+        print(output[:limit])
+        if len(output) > limit:
+            print("... (output truncated)")
+
     def add_file(self, path: Path) -> bool:
         """
         Add a file to chezmoi management.
@@ -250,6 +462,7 @@ class ChezmoiTask(BaseTask):
             return True
 
         result = self.cmd.run([self._get_chezmoi_cmd(), 'add', str(path)], check=False)
+        self._invalidate_queries()
         if result.success:
             self.logger.success(f"Added {path} to chezmoi")
             return True
@@ -276,6 +489,7 @@ class ChezmoiTask(BaseTask):
             [self._get_chezmoi_cmd(), 'add', '--template', str(path)],
             check=False,
         )
+        self._invalidate_queries()
         if result.success:
             self.logger.success(f"Added {path} as template to chezmoi")
             return True
@@ -295,7 +509,7 @@ class ChezmoiTask(BaseTask):
         Returns:
             True if successful
         """
-        config_path = Path.home() / ".config" / "chezmoi" / "chezmoi.toml"
+        config_path = self.chezmoi_config_path
 
         if self.dry_run:
             self.logger.info(f"[DRY RUN] Would configure chezmoi data in {config_path}")
@@ -309,27 +523,22 @@ class ChezmoiTask(BaseTask):
             if config_path.exists():
                 existing_content = config_path.read_text()
 
-            # Build data section
-            data_lines = ["[data]"]
-            for key, value in data.items():
-                # Quote string values
-                if isinstance(value, str):
-                    data_lines.append(f'    {key} = "{value}"')
-                else:
-                    data_lines.append(f'    {key} = {value}')
-
+            # Build data section (string values are quoted)
+            data_lines = ["[data]"] + [
+                f'    {key} = "{value}"' if isinstance(value, str) else f'    {key} = {value}'
+                for key, value in data.items()
+            ]
             data_section = "\n".join(data_lines) + "\n"
 
             # Replace or append data section
             if "[data]" in existing_content:
                 # Find and replace existing data section
-                import re
-                pattern = r'\[data\].*?(?=\n\[|$)'
-                new_content = re.sub(pattern, data_section.strip(), existing_content, flags=re.DOTALL)
+                new_content = _DATA_SECTION_RE.sub(data_section.strip(), existing_content)
             else:
                 new_content = existing_content + "\n" + data_section
 
             config_path.write_text(new_content)
+            self._invalidate_queries()
             self.logger.success("Chezmoi data configured")
             return True
 
@@ -350,7 +559,7 @@ class ChezmoiTask(BaseTask):
             self.logger.warning("Bitwarden CLI not installed, skipping integration")
             return True
 
-        config_path = Path.home() / ".config" / "chezmoi" / "chezmoi.toml"
+        config_path = self.chezmoi_config_path
 
         if self.dry_run:
             self.logger.info("[DRY RUN] Would configure Bitwarden integration")
@@ -386,7 +595,7 @@ class ChezmoiTask(BaseTask):
         Returns:
             List of managed file paths
         """
-        result = self.cmd.run_quiet([self._get_chezmoi_cmd(), 'managed'])
+        result = self._query('managed')
         if result.success and result.stdout.strip():
             return result.stdout.strip().split('\n')
         return []
@@ -398,7 +607,7 @@ class ChezmoiTask(BaseTask):
         Returns:
             Dictionary mapping file paths to their status
         """
-        result = self.cmd.run_quiet([self._get_chezmoi_cmd(), 'status'])
+        result = self._query('status')
         if not result.success:
             return {}
         status = {}
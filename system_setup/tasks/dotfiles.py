@@ -1,13 +1,31 @@
 """Dotfiles management task."""
 
+import hmac
+import os
 import shutil
-import tarfile
-from pathlib import Path
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Set, Tuple
 
-from system_setup.tasks.base import BaseTask
-from system_setup.utils.checksum import verify_sha256
+from system_setup.tasks.base import YES_ANSWERS, BaseTask
+from system_setup.utils.checksum import HashingReader, normalize_hash
 from system_setup.utils.download import download_from_gdrive, install_gdown
 
+if TYPE_CHECKING:
+    import tarfile
+
+
+# Top-level directory inside the dotfiles archive
+ARCHIVE_ROOT = "dotfiles"
+
+# How each kind of conflict with an existing dotfile is resolved
+CONFLICT_DESCRIPTIONS = {
+    'backup': 'replace, keep backup',
+    'merge': 'merge contents',
+    'replace': 'file in the way of a directory, keep backup',
+}
+
 
 class DotfilesTask(BaseTask):
     """Manages dotfiles download and installation."""
@@ -15,8 +33,8 @@ class DotfilesTask(BaseTask):
     def __init__(self, *args, **kwargs) -> None:
         """Initialize dotfiles task."""
         super().__init__(*args, **kwargs)
+        self.home = Path.home()
         self.temp_archive = Path("/tmp/dotfiles.tar.gz")
-        self.temp_extract = Path("/tmp/dotfiles")
 
     @property
     def name(self) -> str:
@@ -46,15 +64,11 @@ class DotfilesTask(BaseTask):
         if not self._download_dotfiles():
             return False
 
-        # Step 2: Extract
-        if not self._extract_dotfiles():
-            return False
-
-        # Step 3: Install to home directory
+        # Step 2: Extract straight into the home directory
         if not self._install_dotfiles():
             return False
 
-        # Step 4: Cleanup
+        # Step 3: Cleanup
         self._cleanup()
 
         self.mark_complete()
@@ -66,16 +80,12 @@ class DotfilesTask(BaseTask):
         # Check if already downloaded
         if self.temp_archive.exists():
             self.logger.info(f"Found existing dotfiles archive: {self.temp_archive}")
-            return self._verify_checksum()
-
-        if self.temp_extract.exists() and (self.temp_extract / "dotfiles").exists():
-            self.logger.info(f"Found existing extracted dotfiles: {self.temp_extract}")
             return True
 
         # Ask user if they want to download
         if not self.auto_yes:
             response = input(f"Download dotfiles to {self.temp_archive}? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
+            if response.strip().lower() not in YES_ANSWERS:
                 self.logger.info("Skipping dotfiles download")
                 return False
         else:
@@ -94,111 +104,129 @@ class DotfilesTask(BaseTask):
             gdrive_id = self.config.dotfiles_gdrive_id
             download_from_gdrive(gdrive_id, self.temp_archive)
             self.logger.success("Download complete")
-
-            return self._verify_checksum()
+            return True
 
         except Exception as e:
             self.logger.error(f"Download failed: {e}")
             return False
 
-    def _verify_checksum(self) -> bool:
-        """Verify checksum of downloaded archive."""
-        expected_checksum = self.config.dotfiles_checksum
-
-        if expected_checksum is None:
-            self.logger.info("Checksum verification disabled")
-            return True
+    def _verify_checksum(self, expected_checksum: str, actual_checksum: str) -> bool:
+        """
+        Compare the archive checksum against the configured one.
 
-        if not self.temp_archive.exists():
-            return True
+        Args:
+            expected_checksum: Configured SHA256 hash (hex string)
+            actual_checksum: SHA256 hash computed while scanning the archive
 
+        Returns:
+            True if installation may proceed
+        """
         try:
-            self.logger.info("Verifying checksum...")
-            if verify_sha256(self.temp_archive, expected_checksum):
-                self.logger.success("✅ Checksum verified successfully")
-                return True
-            else:
-                self.logger.error("❌ Checksum verification failed!")
-                self.logger.error(f"   Expected: {expected_checksum}")
-
-                if self.config.checksum_required:
-                    self.logger.error("   Removing potentially compromised file...")
-                    self.temp_archive.unlink()
-                    return False
-                else:
-                    self.logger.warning("   Continuing anyway (checksum not required)")
-                    return True
-
-        except Exception as e:
-            self.logger.error(f"Checksum verification error: {e}")
-            return False
-
-    def _extract_dotfiles(self) -> bool:
-        """Extract dotfiles archive."""
-        if (self.temp_extract / "dotfiles").exists():
-            self.logger.info("Dotfiles already extracted")
+            matches = hmac.compare_digest(
+                normalize_hash(actual_checksum), normalize_hash(expected_checksum)
+            )
+        except ValueError:
+            matches = False
+
+        if matches:
+            self.logger.success("✅ Checksum verified successfully")
             return True
 
-        if self.dry_run:
-            self.logger.info("[DRY RUN] Would extract dotfiles")
-            return True
+        self.logger.error("❌ Checksum verification failed!")
+        self.logger.error(f"   Expected: {expected_checksum}")
 
-        if not self.temp_archive.exists():
-            self.logger.warning("No dotfiles archive found")
+        if self.config.checksum_required:
+            self.logger.error("   Removing potentially compromised file...")
+            self.temp_archive.unlink()
             return False
 
-        try:
-            self.logger.info(f"Extracting dotfiles to {self.temp_extract}...")
-            self.temp_extract.mkdir(parents=True, exist_ok=True)
-
-            with tarfile.open(self.temp_archive, 'r:gz') as tar:
-                tar.extractall(self.temp_extract)
-
-            self.logger.success("Extraction complete")
-            return True
-
-        except Exception as e:
-            self.logger.error(f"Extraction failed: {e}")
-            return False
+        self.logger.warning("   Continuing anyway (checksum not required)")
+        return True
 
     def _install_dotfiles(self) -> bool:
-        """Install dotfiles to home directory."""
-        source_dir = self.temp_extract / "dotfiles"
+        """
+        Install dotfiles to home directory.
 
+        Archive members are streamed directly to their destination, so each
+        byte is decompressed once and written once (no staging directory).
+        The checksum is computed during the pass that lists conflicts, and
+        always before anything is written.
+        """
         if self.dry_run:
             self.logger.info("[DRY RUN] Would install dotfiles to home directory")
             return True
 
-        if not source_dir.exists():
-            self.logger.error(f"Dotfiles directory not found: {source_dir}")
+        if not self.temp_archive.exists():
+            self.logger.warning("No dotfiles archive found")
             return False
 
         # Ask user confirmation
         if not self.auto_yes:
-            response = input(f"Install dotfiles from {source_dir} to home directory? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
+            response = input(
+                f"Install dotfiles from {self.temp_archive} to home directory? (y/N): "
+            )
+            if response.strip().lower() not in YES_ANSWERS:
                 self.logger.info("Skipping dotfiles installation")
-                self.logger.info(f"Dotfiles remain in {self.temp_extract} for manual processing")
+                self.logger.info(f"Dotfiles archive remains at {self.temp_archive}")
                 return True
         else:
             self.logger.info("Auto-yes: installing dotfiles")
 
         try:
-            dest_dir = Path.home()
-            self.logger.info(f"Installing dotfiles from {source_dir} to {dest_dir}...")
+            dest_dir = self.home
+            self.logger.info(f"Installing dotfiles from {self.temp_archive} to {dest_dir}...")
 
-            # Process each dotfile/directory
-            for item in source_dir.glob('.*'):
-                # Skip . and ..
-                if item.name in ('.', '..'):
-                    continue
-
-                dest_path = dest_dir / item.name
+            entries: Optional[Dict[str, bool]] = None
+            expected_checksum = self.config.dotfiles_checksum
+            if expected_checksum is None:
+                self.logger.info("Checksum verification disabled")
+            else:
+                self.logger.info("Verifying checksum...")
+                entries, actual_checksum = self._scan_archive(list_entries=not self.auto_yes)
+                if not self._verify_checksum(expected_checksum, actual_checksum):
+                    return False
 
-                if item.is_file():
-                    self._install_file(item, dest_path)
-                elif item.is_dir():
-                    self._install_directory(item, dest_path)
+            # Ask about every conflict before anything is written
+            skipped: Set[str] = set()
+            if not self.auto_yes:
+                if entries is None:
+                    entries = self._list_entries()
+                skipped = self._confirm_conflicts(entries)
+
+            # Action per top-level dotfile, decided when it is first seen
+            actions: Dict[str, Optional[str]] = {}
+            # mtimes of files already present in directories being merged
+            dest_mtimes: Dict[str, float] = {}
+
+            with self._open_archive() as tar:
+                for member in tar:
+                    relative_path = self._member_path(member)
+                    if relative_path is None:
+                        continue
+
+                    top = relative_path.parts[0]
+                    if top not in actions:
+                        actions[top] = None if top in skipped else self._prepare_install(
+                            top, dest_dir / top, self._member_is_dir(member, relative_path),
+                        )
+                        if actions[top] == 'merge':
+                            dest_mtimes.update(self._scan_mtimes(dest_dir / top, top))
+
+                    action = actions[top]
+                    if action is not None:
+                        self._install_member(
+                            tar,
+                            member,
+                            dest_dir / relative_path,
+                            action,
+                            dest_mtimes.get(str(relative_path)),
+                        )
+
+            for top, action in actions.items():
+                if action == 'merge':
+                    self.logger.info(f"  Merged directory: {top}")
+                elif action is not None:
+                    self.logger.info(f"  Installed: {top}")
 
             self.logger.success("Dotfiles installed successfully")
             return True
@@ -207,60 +235,262 @@ class DotfilesTask(BaseTask):
             self.logger.error(f"Installation failed: {e}")
             return False
 
-    def _install_file(self, source: Path, dest: Path) -> None:
-        """Install a single dotfile."""
-        self.logger.debug(f"Processing file: {source.name}")
+    @contextmanager
+    def _open_archive(self) -> Iterator['tarfile.TarFile']:
+        """
+        Open the dotfiles archive as a sequential tar stream.
+
+        Decompression is handed to pigz when it is installed, so it runs on
+        other cores while this thread writes files; otherwise tarfile's own
+        gzip support is used.
 
-        if dest.exists():
-            if not self.auto_yes:
-                response = input(f"  File '{source.name}' exists. Replace? (y/N): ")
-                if response.lower() not in ('y', 'yes'):
-                    self.logger.info(f"  Skipped: {source.name}")
-                    return
+        Raises:
+            RuntimeError: If pigz exits with an error
+        """
+        # Imported lazily: tarfile pulls in gzip/bz2/lzma at import time
+        import tarfile
 
-            # Create backup
-            backup_path = dest.with_suffix(dest.suffix + '.backup')
-            shutil.copy2(dest, backup_path)
-            self.logger.info(f"  Created backup: {backup_path}")
+        pigz = shutil.which('pigz')
+        if not pigz:
+            with tarfile.open(self.temp_archive, 'r|gz') as tar:
+                yield tar
+            return
 
-        shutil.copy2(source, dest)
-        self.logger.info(f"  Installed: {source.name}")
+        proc = subprocess.Popen(
+            [pigz, '-dc', str(self.temp_archive)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=1 << 20,
+        )
+        try:
+            with tarfile.open(fileobj=proc.stdout, mode='r|') as tar:
+                yield tar
+        finally:
+            proc.stdout.close()
+            _, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"pigz failed: {stderr.decode(errors='replace').strip()}")
+
+    @staticmethod
+    def _member_path(member: 'tarfile.TarInfo') -> Optional[PurePosixPath]:
+        """
+        Map an archive member to its path relative to the home directory.
 
-    def _install_directory(self, source: Path, dest: Path) -> None:
-        """Install a dotfile directory with merge support."""
-        self.logger.debug(f"Processing directory: {source.name}")
+        Returns:
+            Relative path, or None for members outside dotfiles/.* or with
+            unsafe paths
+        """
+        path = PurePosixPath(member.name)
+        parts = [part for part in path.parts if part not in ('', '.')]
+        if path.is_absolute() or '..' in parts:
+            return None
+        if len(parts) < 2 or parts[0] != ARCHIVE_ROOT or not parts[1].startswith('.'):
+            return None
+        return PurePosixPath(*parts[1:])
+
+    @classmethod
+    def _scan_mtimes(cls, root: Path, prefix: str) -> Dict[str, float]:
+        """
+        Walk a directory once and record the mtime of every file in it.
 
-        if dest.exists() and dest.is_dir():
-            if not self.auto_yes:
-                response = input(f"  Directory '{source.name}' exists. Merge contents? (y/N): ")
-                if response.lower() not in ('y', 'yes'):
-                    self.logger.info(f"  Skipped: {source.name}")
-                    return
+        Args:
+            root: Directory to walk
+            prefix: Relative path of root, used to build the returned keys
 
-            # Merge directories using rsync-like behavior
-            self._merge_directories(source, dest)
-        else:
-            # Just copy the whole directory
-            if dest.exists():
-                shutil.rmtree(dest)
-            shutil.copytree(source, dest)
-            self.logger.info(f"  Installed directory: {source.name}")
-
-    def _merge_directories(self, source: Path, dest: Path) -> None:
-        """Merge two directories, preserving newer files."""
-        for item in source.rglob('*'):
-            relative_path = item.relative_to(source)
-            dest_item = dest / relative_path
-
-            if item.is_file():
-                # Copy file if it doesn't exist or source is newer
-                if not dest_item.exists() or item.stat().st_mtime > dest_item.stat().st_mtime:
-                    dest_item.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(item, dest_item)
-            elif item.is_dir():
-                dest_item.mkdir(parents=True, exist_ok=True)
-
-        self.logger.info(f"  Merged directory: {source.name}")
+        Returns:
+            Dict mapping relative POSIX paths to modification times
+        """
+        mtimes: Dict[str, float] = {}
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    key = f"{prefix}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        mtimes.update(cls._scan_mtimes(Path(entry.path), key))
+                    else:
+                        try:
+                            mtimes[key] = entry.stat().st_mtime
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+        return mtimes
+
+    def _list_entries(self) -> Dict[str, bool]:
+        """
+        List the top-level dotfiles in the archive.
+
+        Returns:
+            Dict mapping entry name to whether it is a directory
+        """
+        with self._open_archive() as tar:
+            return self._collect_entries(tar)
+
+    def _scan_archive(self, list_entries: bool) -> Tuple[Optional[Dict[str, bool]], str]:
+        """
+        Hash the archive, optionally listing its entries in the same read.
+
+        Args:
+            list_entries: Also parse the archive for its top-level entries
+
+        Returns:
+            Tuple of (entries or None, SHA256 hex digest of the archive)
+        """
+        # Imported lazily: tarfile pulls in gzip/bz2/lzma at import time
+        import tarfile
+
+        entries: Optional[Dict[str, bool]] = None
+        with self.temp_archive.open('rb') as f:
+            reader = HashingReader(f)
+            if list_entries:
+                with tarfile.open(fileobj=reader, mode='r|gz') as tar:
+                    entries = self._collect_entries(tar)
+            return entries, reader.hexdigest()
+
+    @classmethod
+    def _collect_entries(cls, tar: 'tarfile.TarFile') -> Dict[str, bool]:
+        """Map each top-level dotfile in an open archive to whether it is a directory."""
+        entries: Dict[str, bool] = {}
+        for member in tar:
+            relative_path = cls._member_path(member)
+            if relative_path is None:
+                continue
+            top = relative_path.parts[0]
+            entries[top] = entries.get(top, False) or cls._member_is_dir(member, relative_path)
+        return entries
+
+    @staticmethod
+    def _member_is_dir(member: 'tarfile.TarInfo', relative_path: PurePosixPath) -> bool:
+        """Whether a member belongs to a top-level directory entry."""
+        return member.isdir() or len(relative_path.parts) > 1
+
+    @staticmethod
+    def _classify(dest: Path, is_dir: bool) -> str:
+        """
+        Decide how a top-level dotfile will be installed.
+
+        Returns:
+            'backup' (replace an existing file), 'merge' (into an existing
+            directory), 'replace' (move aside a file that is in the way of a
+            directory) or 'write' (no conflict)
+        """
+        exists = dest.exists() or dest.is_symlink()
+        if is_dir:
+            if dest.is_dir():
+                return 'merge'
+            return 'replace' if exists else 'write'
+        return 'backup' if exists else 'write'
+
+    def _confirm_conflicts(self, entries: Dict[str, bool]) -> Set[str]:
+        """
+        Ask once about all dotfiles that already exist in the home directory.
+
+        Args:
+            entries: Top-level archive entries (name -> is directory)
+
+        Returns:
+            Names of entries the user chose to skip
+        """
+        conflicts = []
+        for name, is_dir in entries.items():
+            action = self._classify(self.home / name, is_dir)
+            if action != 'write':
+                conflicts.append((name, action))
+        if not conflicts:
+            return set()
+
+        self.logger.info(f"{len(conflicts)} dotfiles already exist:")
+        for name, action in conflicts:
+            self.logger.info(f"  • {name} ({CONFLICT_DESCRIPTIONS[action]})")
+
+        response = input("Overwrite existing dotfiles? [a]ll / [n]one / [s]elect: ").strip().lower()
+        if response in ('a', 'all'):
+            return set()
+
+        skipped = set()
+        for name, action in conflicts:
+            if response in ('s', 'select'):
+                if action == 'merge':
+                    prompt = f"  Directory '{name}' exists. Merge contents? (y/N): "
+                elif action == 'replace':
+                    prompt = f"  File '{name}' is in the way of a directory. Replace? (y/N): "
+                else:
+                    prompt = f"  File '{name}' exists. Replace? (y/N): "
+                if input(prompt).strip().lower() in YES_ANSWERS:
+                    continue
+            self.logger.info(f"  Skipped: {name}")
+            skipped.add(name)
+        return skipped
+
+    def _prepare_install(self, name: str, dest: Path, is_dir: bool) -> str:
+        """
+        Prepare the destination for a top-level dotfile.
+
+        Returns:
+            Install action from _classify()
+        """
+        self.logger.debug(f"Processing {'directory' if is_dir else 'file'}: {name}")
+        action = self._classify(dest, is_dir)
+        if action == 'replace':
+            # A file is in the way of a directory: keep it as a backup
+            self._backup(dest)
+        return action
+
+    def _backup(self, dest: Path) -> None:
+        """Move an existing file aside (a rename) before it is overwritten."""
+        backup_path = dest.with_suffix(dest.suffix + '.backup')
+        os.replace(dest, backup_path)
+        self.logger.info(f"  Created backup: {backup_path}")
+
+    def _install_member(
+        self,
+        tar: 'tarfile.TarFile',
+        member: 'tarfile.TarInfo',
+        dest: Path,
+        action: str,
+        dest_mtime: Optional[float] = None,
+    ) -> None:
+        """
+        Write a single archive member to its destination.
+
+        Args:
+            tar: Archive being streamed
+            member: Member to write
+            dest: Destination path
+            action: Install action planned for the member's top-level entry
+            dest_mtime: mtime of an existing destination file (merges only)
+        """
+        if member.isdir():
+            dest.mkdir(parents=True, exist_ok=True)
+            return
+
+        if not member.isfile():
+            if member.issym():
+                kind = 'symlink'
+            elif member.islnk():
+                kind = 'hard link'
+            else:
+                kind = 'special file'
+            self.logger.warning(
+                f"  Skipped {kind} (only files and directories are installed): {member.name}"
+            )
+            return
+
+        if action == 'merge':
+            # Copy file if it doesn't exist or source is newer
+            if dest_mtime is not None and dest_mtime >= member.mtime:
+                return
+        elif action == 'backup':
+            # The original is about to be overwritten, so move it aside
+            # instead of copying its contents
+            self._backup(dest)
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        src = tar.extractfile(member)
+        with src, dest.open('wb') as f:
+            shutil.copyfileobj(src, f, length=1024 * 1024)
+        os.chmod(dest, member.mode & 0o7777)
+        os.utime(dest, (member.mtime, member.mtime))
 
     def _cleanup(self) -> None:
         """Clean up temporary files."""
@@ -274,8 +504,4 @@ class DotfilesTask(BaseTask):
             self.temp_archive.unlink()
             self.logger.debug(f"  Removed: {self.temp_archive}")
 
-        if self.temp_extract.exists():
-            shutil.rmtree(self.temp_extract)
-            self.logger.debug(f"  Removed: {self.temp_extract}")
-
         self.logger.success("Cleanup complete")
@@ -1,13 +1,20 @@
 """Fish shell configuration task."""
 
+import os
+import shlex
 import shutil
+import sys
+from functools import cached_property
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Set
 
 from system_setup.packages.factory import get_package_manager
-from system_setup.tasks.base import BaseTask
+from system_setup.tasks.base import YES_ANSWERS, BaseTask
 
 
+# Fisher bootstrap script
+FISHER_URL = "https://raw.githubusercontent.com/jorgebucaran/fisher/main/functions/fisher.fish"
+
 # Fish plugins to install via Fisher
 FISHER_PLUGINS = [
     "jorgebucaran/fisher",  # Plugin manager itself
@@ -36,6 +43,106 @@ FISH_ABBREVIATIONS = [
     ("tree", "eza --tree"),
 ]
 
+# All abbreviations as one fish script; expansions quoted so fish sees each as one word
+_ABBR_SCRIPT = "\n".join(
+    f"abbr -a {abbr} {shlex.quote(expansion)}" for abbr, expansion in FISH_ABBREVIATIONS
+)
+
+# Copy of the last applied _ABBR_SCRIPT, kept in the fish config directory
+ABBR_MARKER = ".system-setup-abbreviations"
+
+# Base config.fish written when the user has none
+CONFIG_FISH_TEMPLATE = '''# Fish shell configuration
+# Generated by system-setup
+
+# Disable greeting
+set -g fish_greeting
+
+# Environment variables
+set -gx EDITOR hx
+set -gx VISUAL hx
+set -gx PAGER less
+
+# XDG Base Directory
+set -gx XDG_CONFIG_HOME $HOME/.config
+set -gx XDG_DATA_HOME $HOME/.local/share
+set -gx XDG_CACHE_HOME $HOME/.cache
+set -gx XDG_STATE_HOME $HOME/.local/state
+
+# Path additions
+fish_add_path $HOME/.local/bin
+fish_add_path $HOME/.cargo/bin
+
+# Mise (asdf-compatible version manager)
+if command -q mise
+    mise activate fish | source
+end
+
+# Zoxide (smart cd)
+if command -q zoxide
+    zoxide init fish | source
+end
+
+# FZF configuration
+set -gx FZF_DEFAULT_OPTS "--height 40% --layout=reverse --border --preview 'bat --color=always --style=numbers --line-range=:500 {}'"
+
+# Use eza instead of ls (if available)
+if command -q eza
+    alias ls='eza'
+    alias ll='eza -la --git'
+    alias la='eza -a'
+    alias tree='eza --tree'
+end
+
+# Use bat instead of cat (if available)
+if command -q bat
+    alias cat='bat --paging=never'
+end
+
+# Wayland/Hyprland specifics
+if test "$XDG_SESSION_TYPE" = "wayland"
+    set -gx MOZ_ENABLE_WAYLAND 1
+    set -gx QT_QPA_PLATFORM wayland
+end
+
+# Useful functions
+function mkcd -d "Create directory and cd into it"
+    mkdir -p $argv[1] && cd $argv[1]
+end
+
+function extract -d "Extract common archive formats"
+    switch $argv[1]
+        case '*.tar.bz2'
+            tar xjf $argv[1]
+        case '*.tar.gz'
+            tar xzf $argv[1]
+        case '*.tar.xz'
+            tar xJf $argv[1]
+        case '*.bz2'
+            bunzip2 $argv[1]
+        case '*.gz'
+            gunzip $argv[1]
+        case '*.tar'
+            tar xf $argv[1]
+        case '*.zip'
+            unzip $argv[1]
+        case '*.7z'
+            7z x $argv[1]
+        case '*'
+            echo "Unknown archive format: $argv[1]"
+    end
+end
+
+# Git shortcuts
+function gcom -d "Git commit with message"
+    git commit -m "$argv"
+end
+
+function gacp -d "Git add, commit, push"
+    git add -A && git commit -m "$argv" && git push
+end
+'''
+
 
 class FishTask(BaseTask):
     """Manages Fish shell configuration.
@@ -69,6 +176,11 @@ class FishTask(BaseTask):
     def platforms(self) -> list[str]:
         return ['linux', 'macos']
 
+    @cached_property
+    def fish_path(self) -> Optional[str]:
+        """Path to the fish binary, looked up on PATH once."""
+        return shutil.which('fish')
+
     def run(self) -> bool:
         """
         Execute Fish shell configuration task.
@@ -79,6 +191,12 @@ class FishTask(BaseTask):
         if self.skip_if_complete():
             return True
 
+        # Recover from a lost state file without starting fish at all
+        if self._fully_configured():
+            self.logger.info("Fish is already the default shell with plugins and config")
+            self.mark_complete()
+            return True
+
         self.logger.section(self.description)
 
         # Step 1: Ensure Fish is installed
@@ -89,19 +207,15 @@ class FishTask(BaseTask):
         if not self._set_default_shell():
             return False
 
-        # Step 3: Install Fisher plugin manager
-        if not self._install_fisher():
-            return False
-
-        # Step 4: Install plugins (including Tide)
-        if not self._install_plugins():
+        # Step 3: Install Fisher and plugins (including Tide)
+        if not self._install_fisher_and_plugins():
             return False
 
-        # Step 5: Create base config
+        # Step 4: Create base config
         if not self._create_config():
             return False
 
-        # Step 6: Set up abbreviations
+        # Step 5: Set up abbreviations
         if not self._setup_abbreviations():
             return False
 
@@ -110,9 +224,32 @@ class FishTask(BaseTask):
         self.logger.info("Run 'tide configure' to customize your prompt")
         return True
 
+    def _fully_configured(self) -> bool:
+        """Whether every step of run() is already done.
+
+        Fish must be the login shell, Fisher and all FISHER_PLUGINS must be
+        recorded, config.fish must exist, and the abbreviation marker must
+        hold the current abbreviation script. Everything is checked on disk,
+        so this works without the state file.
+        """
+        return (
+            os.environ.get('SHELL', '').endswith('/fish')
+            and (self.config_dir / "functions" / "fisher.fish").exists()
+            and set(FISHER_PLUGINS) <= self._installed_plugins()
+            and (self.config_dir / "config.fish").exists()
+            and self._abbreviations_applied()
+        )
+
+    def _abbreviations_applied(self) -> bool:
+        """Whether an earlier run applied the current abbreviations."""
+        try:
+            return (self.config_dir / ABBR_MARKER).read_text() == _ABBR_SCRIPT
+        except OSError:
+            return False
+
     def _ensure_fish_installed(self) -> bool:
         """Ensure Fish shell is installed."""
-        if shutil.which('fish'):
+        if self.fish_path:
             self.logger.info("Fish shell is already installed")
             return True
 
@@ -128,6 +265,8 @@ class FishTask(BaseTask):
             return False
 
         if pkg_manager.install(['fish']):
+            # Look the binary up again now that it exists
+            self.__dict__.pop('fish_path', None)
             self.logger.success("Fish shell installed")
             return True
         else:
@@ -136,20 +275,21 @@ class FishTask(BaseTask):
 
     def _set_default_shell(self) -> bool:
         """Set Fish as the default shell."""
-        fish_path = shutil.which('fish')
-        if not fish_path:
-            fish_path = "/usr/bin/fish"
+        fish_path = self.fish_path or "/usr/bin/fish"
 
         # Check if already default
-        import os
         current_shell = os.environ.get('SHELL', '')
         if 'fish' in current_shell:
             self.logger.info("Fish is already the default shell")
             return True
 
         if not self.auto_yes:
+            # Without a terminal input() would block automation forever
+            if not sys.stdin.isatty():
+                self.logger.info("No terminal to confirm with - skipping shell change (use --yes)")
+                return True
             response = input(f"Set {fish_path} as default shell? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
+            if response.strip().lower() not in YES_ANSWERS:
                 self.logger.info("Skipping shell change")
                 return True
 
@@ -157,19 +297,30 @@ class FishTask(BaseTask):
             self.logger.info(f"[DRY RUN] Would set {fish_path} as default shell")
             return True
 
-        # Add to /etc/shells if needed (Linux)
-        if self.platform.is_linux:
+        # Add to /etc/shells if needed (Linux); remembered in state per path,
+        # so a fish binary at a new location is checked again
+        shells_key = f'fish_in_etc_shells:{fish_path}'
+        if self.platform.is_linux and not self.state.is_complete(shells_key):
             try:
+                # Whole-line match: a substring test would accept e.g. /usr/bin/fisher
                 with open('/etc/shells', 'r') as f:
-                    shells = f.read()
-                if fish_path not in shells:
+                    registered = any(line.strip() == fish_path for line in f)
+            except OSError as e:
+                self.logger.warning(f"Could not read /etc/shells: {e}")
+            else:
+                if not registered:
                     self.logger.info(f"Adding {fish_path} to /etc/shells...")
-                    self.cmd.run(
-                        f'echo "{fish_path}" | sudo tee -a /etc/shells',
-                        shell=True,
+                    result = self.cmd.run_sudo(
+                        ['tee', '-a', '/etc/shells'],
+                        input=f"{fish_path}\n",
+                        check=False,
                     )
-            except Exception as e:
-                self.logger.warning(f"Could not modify /etc/shells: {e}")
+                    registered = result.success
+                    if not registered:
+                        self.logger.warning(f"Could not modify /etc/shells: {result.stderr}")
+
+                if registered:
+                    self.state.mark_complete(shells_key)
 
         # Change default shell
         self.logger.info(f"Changing default shell to {fish_path}...")
@@ -180,56 +331,54 @@ class FishTask(BaseTask):
         self.logger.error(f"Failed to change shell: {result.stderr}")
         return False
 
-    def _install_fisher(self) -> bool:
-        """Install Fisher plugin manager."""
-        # Check if Fisher is already installed
-        functions_dir = self.config_dir / "functions"
-        fisher_file = functions_dir / "fisher.fish"
+    def _install_fisher_and_plugins(self) -> bool:
+        """
+        Install Fisher and any missing plugins in a single fish session.
+
+        Fisher is bootstrapped from curl only when its function file is
+        absent, and plugins already recorded in Fisher's fish_plugins file
+        are skipped, so re-runs do not start fish at all.
+        """
+        fisher_installed = (self.config_dir / "functions" / "fisher.fish").exists()
+        installed = self._installed_plugins()
+        plugins = [p for p in FISHER_PLUGINS if p not in installed]
 
-        if fisher_file.exists():
-            self.logger.info("Fisher is already installed")
+        if fisher_installed and not plugins:
+            self.logger.info("Fisher and plugins are already installed")
             return True
 
-        self.logger.info("Installing Fisher plugin manager...")
+        self.logger.info(f"Installing Fish plugins: {', '.join(plugins)}...")
 
         if self.dry_run:
-            self.logger.info("[DRY RUN] Would install Fisher")
+            self.logger.info(f"[DRY RUN] Would install plugins: {', '.join(plugins)}")
             return True
 
-        # Install Fisher using the official method
-        install_cmd = (
-            "curl -sL https://raw.githubusercontent.com/jorgebucaran/fisher/main/functions/fisher.fish | "
-            "source && fisher install jorgebucaran/fisher"
-        )
+        install_cmd = f"fisher install {' '.join(plugins)}"
+        if not fisher_installed:
+            # Official bootstrap: source Fisher from curl, then let it install itself
+            install_cmd = f"curl -sL {FISHER_URL} | source && {install_cmd}"
+
         result = self.cmd.run(['fish', '-c', install_cmd], check=False)
         if result.success:
-            self.logger.success("Fisher installed")
-            return True
-        self.logger.error(f"Failed to install Fisher: {result.stderr}")
-        return False
-
-    def _install_plugins(self) -> bool:
-        """Install Fish plugins via Fisher."""
-        self.logger.info("Installing Fish plugins...")
-
-        if self.dry_run:
-            self.logger.info(f"[DRY RUN] Would install plugins: {', '.join(FISHER_PLUGINS)}")
+            self.logger.success("Fisher and plugins installed")
             return True
 
-        for plugin in FISHER_PLUGINS:
-            # Skip Fisher itself (already installed)
-            if plugin == "jorgebucaran/fisher":
-                continue
-
-            self.logger.info(f"  Installing {plugin}...")
-            result = self.cmd.run_quiet(['fish', '-c', f'fisher install {plugin}'])
-            if not result.success:
-                self.logger.warning(f"Failed to install {plugin}: {result.stderr}")
-                # Continue with other plugins
+        if not fisher_installed and not (self.config_dir / "functions" / "fisher.fish").exists():
+            self.logger.error(f"Failed to install Fisher: {result.stderr}")
+            return False
 
-        self.logger.success("Plugins installed")
+        # Non-fatal - fisher keeps going past a plugin that fails
+        self.logger.warning(f"Failed to install some plugins: {result.stderr}")
         return True
 
+    def _installed_plugins(self) -> Set[str]:
+        """Plugins recorded in Fisher's fish_plugins file."""
+        try:
+            with open(self.config_dir / "fish_plugins") as f:
+                return {line.strip() for line in f if line.strip()}
+        except OSError:
+            return set()
+
     def _create_config(self) -> bool:
         """Create Fish configuration file."""
         config_file = self.config_dir / "config.fish"
@@ -248,7 +397,9 @@ class FishTask(BaseTask):
 
         try:
             self.config_dir.mkdir(parents=True, exist_ok=True)
-            config_file.write_text(config_content)
+            # Atomic, so an interrupted run never leaves a partial config
+            # that the exists() check above would preserve
+            self._atomic_write_text(config_file, config_content)
             self.logger.success(f"Created {config_file}")
             return True
         except Exception as e:
@@ -257,96 +408,7 @@ class FishTask(BaseTask):
 
     def _generate_config(self) -> str:
         """Generate Fish shell configuration."""
-        return '''# Fish shell configuration
-# Generated by system-setup
-
-# Disable greeting
-set -g fish_greeting
-
-# Environment variables
-set -gx EDITOR hx
-set -gx VISUAL hx
-set -gx PAGER less
-
-# XDG Base Directory
-set -gx XDG_CONFIG_HOME $HOME/.config
-set -gx XDG_DATA_HOME $HOME/.local/share
-set -gx XDG_CACHE_HOME $HOME/.cache
-set -gx XDG_STATE_HOME $HOME/.local/state
-
-# Path additions
-fish_add_path $HOME/.local/bin
-fish_add_path $HOME/.cargo/bin
-
-# Mise (asdf-compatible version manager)
-if command -q mise
-    mise activate fish | source
-end
-
-# Zoxide (smart cd)
-if command -q zoxide
-    zoxide init fish | source
-end
-
-# FZF configuration
-set -gx FZF_DEFAULT_OPTS "--height 40% --layout=reverse --border --preview 'bat --color=always --style=numbers --line-range=:500 {}'"
-
-# Use eza instead of ls (if available)
-if command -q eza
-    alias ls='eza'
-    alias ll='eza -la --git'
-    alias la='eza -a'
-    alias tree='eza --tree'
-end
-
-# Use bat instead of cat (if available)
-if command -q bat
-    alias cat='bat --paging=never'
-end
-
-# Wayland/Hyprland specifics
-if test "$XDG_SESSION_TYPE" = "wayland"
-    set -gx MOZ_ENABLE_WAYLAND 1
-    set -gx QT_QPA_PLATFORM wayland
-end
-
-# Useful functions
-function mkcd -d "Create directory and cd into it"
-    mkdir -p $argv[1] && cd $argv[1]
-end
-
-function extract -d "Extract common archive formats"
-    switch $argv[1]
-        case '*.tar.bz2'
-            tar xjf $argv[1]
-        case '*.tar.gz'
-            tar xzf $argv[1]
-        case '*.tar.xz'
-            tar xJf $argv[1]
-        case '*.bz2'
-            bunzip2 $argv[1]
-        case '*.gz'
-            gunzip $argv[1]
-        case '*.tar'
-            tar xf $argv[1]
-        case '*.zip'
-            unzip $argv[1]
-        case '*.7z'
-            7z x $argv[1]
-        case '*'
-            echo "Unknown archive format: $argv[1]"
-    end
-end
-
-# Git shortcuts
-function gcom -d "Git commit with message"
-    git commit -m "$argv"
-end
-
-function gacp -d "Git add, commit, push"
-    git add -A && git commit -m "$argv" && git push
-end
-'''
+        return CONFIG_FISH_TEMPLATE
 
     def _setup_abbreviations(self) -> bool:
         """Set up Fish abbreviations."""
@@ -356,9 +418,16 @@ end
             self.logger.info("[DRY RUN] Would set up abbreviations")
             return True
 
-        for abbr, expansion in FISH_ABBREVIATIONS:
+        # One fish process for all abbreviations instead of one each
+        result = self.cmd.run_quiet(['fish', '-c', _ABBR_SCRIPT])
+        if result.success:
+            try:
+                self._write_if_changed(self.config_dir / ABBR_MARKER, _ABBR_SCRIPT)
+            except OSError as e:
+                self.logger.debug(f"Could not record applied abbreviations: {e}")
+        else:
             # Non-fatal - abbreviation might already exist
-            self.cmd.run_quiet(['fish', '-c', f'abbr -a {abbr} {expansion}'])
+            self.logger.debug(f"abbr reported errors: {result.stderr}")
 
         self.logger.success("Abbreviations configured")
         return True
@@ -1,23 +1,26 @@
 """Hyprland desktop environment setup task."""
 
+import os
 import shutil
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, ClassVar, Dict, List, NamedTuple, Set, Tuple, Union
 
 from system_setup.packages.factory import get_package_manager, ensure_paru_installed
-from system_setup.tasks.base import BaseTask
+from system_setup.tasks.base import YES_ANSWERS, BaseTask
 
 
 # Package groups for Hyprland ecosystem
-HYPRLAND_CORE_PACKAGES = [
+HYPRLAND_CORE_PACKAGES = (
     'hyprland',
     'hyprlock',
     'hypridle',
     'hyprshot',
     'xdg-desktop-portal-hyprland',
-]
+)
 
-HYPRLAND_UTILS_PACKAGES = [
+HYPRLAND_UTILS_PACKAGES = (
     'swww',           # Wallpaper daemon
     'waypaper',       # Wallpaper GUI
     'wl-clipboard',   # Clipboard
@@ -27,22 +30,22 @@ HYPRLAND_UTILS_PACKAGES = [
     'satty',          # Screenshot annotation
     'wf-recorder',    # Screen recording
     'brightnessctl',  # Brightness control
-]
+)
 
-HYPRLAND_AUR_PACKAGES = [
+HYPRLAND_AUR_PACKAGES = (
     'ags-hyprpanel-git',  # HyprPanel bar
     'walker',             # App launcher
-]
+)
 
-TERMINAL_PACKAGES = [
+TERMINAL_PACKAGES = (
     'ghostty',        # Modern terminal
-]
+)
 
-TERMINAL_AUR_PACKAGES = [
+TERMINAL_AUR_PACKAGES = (
     # ghostty might be in AUR depending on distro
-]
+)
 
-FILE_MANAGER_PACKAGES = [
+FILE_MANAGER_PACKAGES = (
     'nemo',           # GUI file manager
     'yazi',           # TUI file manager
     'ffmpegthumbnailer',
@@ -53,157 +56,23 @@ FILE_MANAGER_PACKAGES = [
     'ripgrep',
     'fzf',
     'zoxide',
-]
-
-
-class HyprlandTask(BaseTask):
-    """Sets up complete Hyprland desktop environment."""
-
-    def __init__(self, *args, **kwargs) -> None:
-        """Initialize Hyprland setup task."""
-        super().__init__(*args, **kwargs)
-        self.home = Path.home()
-        self.config_dir = self.home / '.config'
-
-    @property
-    def name(self) -> str:
-        return 'hyprland'
-
-    @property
-    def description(self) -> str:
-        return 'Hyprland Desktop Environment Setup'
-
-    @property
-    def state_key(self) -> str:
-        return 'hyprland_setup'
-
-    @property
-    def platforms(self) -> list[str]:
-        return ['linux']
-
-    def run(self) -> bool:
-        """
-        Execute Hyprland setup task.
-
-        Returns:
-            True if successful
-        """
-        if not self.is_supported():
-            self.logger.info("Hyprland is only supported on Linux")
-            return True
-
-        if self.skip_if_complete():
-            return True
-
-        self.logger.section(self.description)
-
-        if not self.auto_yes:
-            response = input("Set up Hyprland desktop environment? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
-                self.logger.info("Skipped Hyprland setup")
-                return True
-
-        steps = [
-            ('hyprland_packages', self._install_packages),
-            ('hyprland_config', self._configure_hyprland),
-            ('hyprland_hyprlock', self._configure_hyprlock),
-            ('hyprland_hypridle', self._configure_hypridle),
-            ('hyprland_panel', self._configure_panel),
-            ('hyprland_launcher', self._configure_launcher),
-            ('hyprland_keybinds', self._create_keybinds_helper),
-        ]
-
-        for step_name, step_func in steps:
-            if self.state.is_complete(step_name):
-                self.logger.info(f"Step {step_name} already complete (skipping)")
-                continue
-
-            if not step_func():
-                self.logger.error(f"Failed at step: {step_name}")
-                return False
-
-            self.state.mark_complete(step_name)
-
-        self.mark_complete()
-        self.logger.success("Hyprland setup complete!")
-        return True
-
-    def _install_packages(self) -> bool:
-        """Install Hyprland packages."""
-        self.logger.info("Installing Hyprland packages...")
-
-        # Ensure paru is available for AUR packages
-        if not ensure_paru_installed(self.dry_run):
-            self.logger.warning("Could not install paru, some packages may be unavailable")
-
-        pkg_manager = get_package_manager(self.platform, self.dry_run)
-        if not pkg_manager:
-            self.logger.error("No package manager found")
-            return False
-
-        # Install official packages
-        all_packages = (
-            HYPRLAND_CORE_PACKAGES +
-            HYPRLAND_UTILS_PACKAGES +
-            TERMINAL_PACKAGES +
-            FILE_MANAGER_PACKAGES
-        )
-
-        self.logger.info(f"Installing {len(all_packages)} packages...")
-        if not pkg_manager.install(all_packages):
-            self.logger.warning("Some official packages failed to install")
-
-        # Install AUR packages if paru available
-        if pkg_manager.name == 'paru':
-            aur_packages = HYPRLAND_AUR_PACKAGES + TERMINAL_AUR_PACKAGES
-            self.logger.info(f"Installing {len(aur_packages)} AUR packages...")
-            if not pkg_manager.install(aur_packages):
-                self.logger.warning("Some AUR packages failed to install")
-
-        return True
-
-    def _configure_hyprland(self) -> bool:
-        """Configure Hyprland main config."""
-        self.logger.info("Configuring Hyprland...")
-
-        hypr_dir = self.config_dir / 'hypr'
-        hypr_dir.mkdir(parents=True, exist_ok=True)
-
-        config_path = hypr_dir / 'hyprland.conf'
-
-        # Get theme colors from config
-        theme = self.config.get('hyprland.theme', 'catppuccin-mocha')
-        terminal = self.config.get('hyprland.terminal', 'ghostty')
-        file_manager = self.config.get('hyprland.file_manager', 'nemo')
-        launcher = self.config.get('hyprland.launcher', 'walker')
-
-        # Theme-specific colors
-        colors = self._get_theme_colors(theme)
-
-        config_content = self._generate_hyprland_config(
-            terminal=terminal,
-            file_manager=file_manager,
-            launcher=launcher,
-            colors=colors,
-        )
-
-        if self.dry_run:
-            self.logger.info(f"[DRY RUN] Would write Hyprland config to {config_path}")
-            return True
-
-        config_path.write_text(config_content)
-        self.logger.success(f"Created {config_path}")
-        return True
-
-    def _generate_hyprland_config(
-        self,
-        terminal: str,
-        file_manager: str,
-        launcher: str,
-        colors: Dict[str, str],
-    ) -> str:
-        """Generate hyprland.conf content."""
-        return f'''# Hyprland Configuration
+)
+
+# Official repo and AUR packages, de-duplicated in install order
+OFFICIAL_PACKAGES = tuple(dict.fromkeys(chain(
+    HYPRLAND_CORE_PACKAGES,
+    HYPRLAND_UTILS_PACKAGES,
+    TERMINAL_PACKAGES,
+    FILE_MANAGER_PACKAGES,
+)))
+
+AUR_PACKAGES = tuple(
+    package for package in dict.fromkeys(chain(HYPRLAND_AUR_PACKAGES, TERMINAL_AUR_PACKAGES))
+    if package not in OFFICIAL_PACKAGES
+)
+
+# hyprland.conf, filled in with str.format (literal braces are doubled)
+HYPRLAND_CONF_TEMPLATE = '''# Hyprland Configuration
 # Generated by system-setup
 
 ################
@@ -250,8 +119,8 @@ general {{
     gaps_in = 4
     gaps_out = 8
     border_size = 2
-    col.active_border = {colors['active_border']}
-    col.inactive_border = {colors['inactive_border']}
+    col.active_border = {active_border}
+    col.inactive_border = {inactive_border}
     resize_on_border = false
     allow_tearing = false
     layout = dwindle
@@ -463,144 +332,385 @@ windowrule = animation slide, class:^(quake)$
 windowrule = workspace special:quake silent, class:^(quake)$
 '''
 
-    def _get_theme_colors(self, theme: str) -> Dict[str, str]:
-        """Get colors for a theme."""
-        themes = {
-            'catppuccin-mocha': {
-                'active_border': 'rgba(cba6f7ee) rgba(89b4faee) 45deg',
-                'inactive_border': 'rgba(585b70aa)',
-            },
-            'rose-pine': {
-                'active_border': 'rgba(c4a7e7ee) rgba(ebbcbaee) 45deg',
-                'inactive_border': 'rgba(6e6a86aa)',
-            },
-            'nord': {
-                'active_border': 'rgba(88c0d0ee) rgba(81a1c1ee) 45deg',
-                'inactive_border': 'rgba(4c566aaa)',
-            },
-        }
-        return themes.get(theme, themes['catppuccin-mocha'])
 
-    def _configure_hyprlock(self) -> bool:
-        """Configure hyprlock."""
-        self.logger.info("Configuring hyprlock...")
+class ThemeColors(NamedTuple):
+    """Window border colors for a Hyprland theme."""
 
-        hypr_dir = self.config_dir / 'hypr'
-        config_path = hypr_dir / 'hyprlock.conf'
-
-        config_content = '''# Hyprlock Configuration
-
-background {
-    monitor =
-    path = screenshot
-    blur_passes = 3
-    blur_size = 8
-    noise = 0.0117
-    contrast = 0.8916
-    brightness = 0.8172
-    vibrancy = 0.1696
-    vibrancy_darkness = 0.0
-}
+    active_border: str
+    inactive_border: str
 
-input-field {
-    monitor =
-    size = 200, 50
-    outline_thickness = 3
-    dots_size = 0.33
-    dots_spacing = 0.15
-    dots_center = true
-    dots_rounding = -1
-    outer_color = rgb(cba6f7)
-    inner_color = rgb(1e1e2e)
-    font_color = rgb(cdd6f4)
-    fade_on_empty = true
-    fade_timeout = 1000
-    placeholder_text = <i>Enter Password...</i>
-    hide_input = false
-    rounding = 15
-    check_color = rgb(a6e3a1)
-    fail_color = rgb(f38ba8)
-    fail_text = <i>$FAIL ($ATTEMPTS)</i>
-    fail_timeout = 2000
-    fail_transition = 300
-    capslock_color = rgb(fab387)
-    numlock_color = -1
-    bothlock_color = -1
-    invert_numlock = false
-    swap_font_color = false
-    position = 0, -20
-    halign = center
-    valign = center
-}
 
-label {
-    monitor =
-    text = $TIME
-    color = rgb(cdd6f4)
-    font_size = 64
-    font_family = JetBrainsMono Nerd Font
-    position = 0, 80
-    halign = center
-    valign = center
+# Border colors per supported theme
+THEMES = {
+    'catppuccin-mocha': ThemeColors(
+        active_border='rgba(cba6f7ee) rgba(89b4faee) 45deg',
+        inactive_border='rgba(585b70aa)',
+    ),
+    'rose-pine': ThemeColors(
+        active_border='rgba(c4a7e7ee) rgba(ebbcbaee) 45deg',
+        inactive_border='rgba(6e6a86aa)',
+    ),
+    'nord': ThemeColors(
+        active_border='rgba(88c0d0ee) rgba(81a1c1ee) 45deg',
+        inactive_border='rgba(4c566aaa)',
+    ),
 }
-'''
+
+# Static config files and scripts shipped with the package
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+# Default Walker config and themes installed by the walker package
+WALKER_DEFAULTS_DIR = Path('/etc/xdg/walker')
+
+
+def _up_to_date(src: Union[str, Path], dest: Union[str, Path]) -> bool:
+    """Whether dest exists and is at least as new as src."""
+    try:
+        return os.stat(src).st_mtime <= os.stat(dest).st_mtime
+    except FileNotFoundError:
+        return False
+
+
+class HyprlandTask(BaseTask):
+    """Sets up complete Hyprland desktop environment."""
+
+    # (state key, method name, steps it depends on), in a valid sequential order.
+    # Only the panel and launcher steps need their packages installed;
+    # the other config steps just write files.
+    STEPS: ClassVar[Tuple[Tuple[str, str, Tuple[str, ...]], ...]] = (
+        ('hyprland_packages', '_install_packages', ()),
+        ('hyprland_config', '_configure_hyprland', ()),
+        ('hyprland_hyprlock', '_configure_hyprlock', ()),
+        ('hyprland_hypridle', '_configure_hypridle', ()),
+        ('hyprland_keybinds', '_create_keybinds_helper', ()),
+        ('hyprland_panel', '_configure_panel', ('hyprland_packages',)),
+        ('hyprland_launcher', '_configure_launcher', ('hyprland_packages',)),
+    )
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize Hyprland setup task."""
+        super().__init__(*args, **kwargs)
+        self.home = Path.home()
+        self.config_dir = self.home / '.config'
+        self.hypr_dir = self.config_dir / 'hypr'
+        # Directories already created during this run
+        self._ensured_dirs: Set[Path] = set()
+
+    @property
+    def name(self) -> str:
+        return 'hyprland'
+
+    @property
+    def description(self) -> str:
+        return 'Hyprland Desktop Environment Setup'
+
+    @property
+    def state_key(self) -> str:
+        return 'hyprland_setup'
+
+    @property
+    def platforms(self) -> list[str]:
+        return ['linux']
+
+    def run(self) -> bool:
+        """
+        Execute Hyprland setup task.
+
+        Returns:
+            True if successful
+        """
+        if not self.is_supported():
+            self.logger.info("Hyprland is only supported on Linux")
+            return True
+
+        if self.skip_if_complete():
+            return True
+
+        # Recover from a lost state file without running any step
+        if self._already_configured():
+            self.logger.info("Hyprland is installed and its config is up to date")
+            self.mark_complete()
+            return True
+
+        self.logger.section(self.description)
+
+        if not self.auto_yes:
+            response = input("Set up Hyprland desktop environment? (y/N): ")
+            if response.strip().lower() not in YES_ANSWERS:
+                self.logger.info("Skipped Hyprland setup")
+                return True
+
+        steps = [
+            (step_name, getattr(self, method_name), deps)
+            for step_name, method_name, deps in self.STEPS
+        ]
+
+        # Save all steps and the task itself in one state write
+        with self.state.batched():
+            if self.config.get_bool('hyprland.parallel', True):
+                if not self._run_steps_parallel(steps):
+                    return False
+            else:
+                for step_name, step_func, _ in steps:
+                    if not self._run_step(step_name, step_func):
+                        return False
+
+            self.mark_complete()
+
+        self.logger.success("Hyprland setup complete!")
+        return True
+
+    def _already_configured(self) -> bool:
+        """
+        Whether every step of run() is already done.
+
+        Hyprland must be on PATH, every generated file and the Walker config
+        must be current, and all official and AUR packages must be installed.
+        """
+        if not shutil.which('hyprland'):
+            return False
+
+        expected = {
+            self.hypr_dir / 'hyprland.conf': self._hyprland_config_content(),
+            self.hypr_dir / 'hyprlock.conf': (DATA_DIR / 'hyprlock.conf').read_text(),
+            self.hypr_dir / 'hypridle.conf': (DATA_DIR / 'hypridle.conf').read_text(),
+            self.home / '.local' / 'bin' / 'show-keybinds':
+                (DATA_DIR / 'show-keybinds.sh').read_text(),
+        }
+        for path, content in expected.items():
+            try:
+                if path.read_bytes() != content.encode():
+                    return False
+            except OSError:
+                return False
+
+        if not self._launcher_configured():
+            return False
+
+        # Last, as it queries the package manager
+        pkg_manager = get_package_manager(self.platform, self.dry_run)
+        if not pkg_manager:
+            return False
+        return set(OFFICIAL_PACKAGES + AUR_PACKAGES) <= pkg_manager.installed_set()
+
+    def _launcher_configured(self) -> bool:
+        """Whether _configure_launcher has nothing left to copy."""
+        default_config = WALKER_DEFAULTS_DIR / 'config.toml'
+        if not default_config.exists():
+            # Walker uses its built-in defaults; nothing is copied
+            return True
+
+        walker_dir = self.config_dir / 'walker'
+        if not _up_to_date(default_config, walker_dir / 'config.toml'):
+            return False
+
+        default_themes = WALKER_DEFAULTS_DIR / 'themes'
+        for src in default_themes.rglob('*'):
+            dest = walker_dir / 'themes' / src.relative_to(default_themes)
+            if src.is_file() and not _up_to_date(src, dest):
+                return False
+        return True
+
+    def _run_step(self, step_name: str, step_func: Callable[[], bool]) -> bool:
+        """
+        Run one setup step unless state already records it.
+
+        Returns:
+            True if the step succeeded or was already complete
+        """
+        if self.state.is_complete(step_name):
+            self.logger.info(f"Step {step_name} already complete (skipping)")
+            return True
+
+        if not step_func():
+            self.logger.error(f"Failed at step: {step_name}")
+            return False
+
+        self.state.mark_complete(step_name)
+        return True
+
+    def _run_steps_parallel(
+        self,
+        steps: List[Tuple[str, Callable[[], bool], Tuple[str, ...]]],
+    ) -> bool:
+        """
+        Run setup steps concurrently, each as soon as its dependencies finish.
+
+        Steps run on worker threads; state is only updated from this thread
+        as each one finishes. Steps whose dependencies fail are not run.
+
+        Args:
+            steps: (name, function, names of steps it depends on) tuples
+
+        Returns:
+            True if every step succeeded or was already complete
+        """
+        done: Set[str] = set()
+        waiting = []
+        for step in steps:
+            if self.state.is_complete(step[0]):
+                self.logger.info(f"Step {step[0]} already complete (skipping)")
+                done.add(step[0])
+            else:
+                waiting.append(step)
+
+        success = True
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            running: Dict[Future, str] = {}
+            while True:
+                for step in [s for s in waiting if all(dep in done for dep in s[2])]:
+                    waiting.remove(step)
+                    running[executor.submit(step[1])] = step[0]
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step_name = running.pop(future)
+                    if future.result():
+                        self.state.mark_complete(step_name)
+                        done.add(step_name)
+                    else:
+                        self.logger.error(f"Failed at step: {step_name}")
+                        success = False
+
+        return success and not waiting
+
+    def _ensure_dir(self, path: Path) -> None:
+        """Create a directory (and parents) once per run."""
+        if path in self._ensured_dirs:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        self._ensured_dirs.add(path)
+
+    def _install_packages(self) -> bool:
+        """Install Hyprland packages."""
+        self.logger.info("Installing Hyprland packages...")
+
+        # Ensure paru is available for AUR packages
+        if not ensure_paru_installed(self.dry_run):
+            self.logger.warning("Could not install paru, some packages may be unavailable")
+
+        pkg_manager = get_package_manager(self.platform, self.dry_run)
+        if not pkg_manager:
+            self.logger.error("No package manager found")
+            return False
+
+        # One query for what is already installed, so re-runs skip the installer
+        installed = pkg_manager.installed_set()
+
+        all_packages = [package for package in OFFICIAL_PACKAGES if package not in installed]
+
+        # paru resolves repo and AUR packages in one transaction
+        if pkg_manager.name == 'paru':
+            aur_packages = [package for package in AUR_PACKAGES if package not in installed]
+            if not all_packages and not aur_packages:
+                self.logger.info("All Hyprland packages are already installed")
+                return True
+            self.logger.info(
+                f"Installing {len(all_packages)} packages and {len(aur_packages)} AUR packages..."
+            )
+            if not pkg_manager.install(all_packages + aur_packages):
+                self.logger.warning("Some packages failed to install")
+            return True
+
+        if not all_packages:
+            self.logger.info("All Hyprland packages are already installed")
+            return True
+
+        self.logger.info(f"Installing {len(all_packages)} packages...")
+        if not pkg_manager.install(all_packages):
+            self.logger.warning("Some official packages failed to install")
+
+        return True
+
+    def _configure_hyprland(self) -> bool:
+        """Configure Hyprland main config."""
+        self.logger.info("Configuring Hyprland...")
+
+        self._ensure_dir(self.hypr_dir)
+
+        config_path = self.hypr_dir / 'hyprland.conf'
+
+        config_content = self._hyprland_config_content()
 
         if self.dry_run:
-            self.logger.info(f"[DRY RUN] Would write hyprlock config to {config_path}")
+            self.logger.info(f"[DRY RUN] Would write Hyprland config to {config_path}")
             return True
 
-        config_path.write_text(config_content)
-        self.logger.success(f"Created {config_path}")
+        if self._write_if_changed(config_path, config_content):
+            self.logger.success(f"Created {config_path}")
+        else:
+            self.logger.info(f"{config_path} is up to date")
         return True
 
-    def _configure_hypridle(self) -> bool:
-        """Configure hypridle."""
-        self.logger.info("Configuring hypridle...")
+    def _hyprland_config_content(self) -> str:
+        """Render hyprland.conf from the configured programs and theme."""
+        # Get theme colors from config
+        theme = self.config.get('hyprland.theme', 'catppuccin-mocha')
+        terminal = self.config.get('hyprland.terminal', 'ghostty')
+        file_manager = self.config.get('hyprland.file_manager', 'nemo')
+        launcher = self.config.get('hyprland.launcher', 'walker')
 
-        hypr_dir = self.config_dir / 'hypr'
-        config_path = hypr_dir / 'hypridle.conf'
+        return self._generate_hyprland_config(
+            terminal=terminal,
+            file_manager=file_manager,
+            launcher=launcher,
+            colors=self._get_theme_colors(theme),
+        )
 
-        config_content = '''# Hypridle Configuration
+    def _generate_hyprland_config(
+        self,
+        terminal: str,
+        file_manager: str,
+        launcher: str,
+        colors: ThemeColors,
+    ) -> str:
+        """Generate hyprland.conf content."""
+        return HYPRLAND_CONF_TEMPLATE.format(
+            terminal=terminal,
+            file_manager=file_manager,
+            launcher=launcher,
+            active_border=colors.active_border,
+            inactive_border=colors.inactive_border,
+        )
 
-general {
-    lock_cmd = pidof hyprlock || hyprlock
-    before_sleep_cmd = loginctl lock-session
-    after_sleep_cmd = hyprctl dispatch dpms on
-}
+    def _get_theme_colors(self, theme: str) -> ThemeColors:
+        """Get colors for a theme (catppuccin-mocha if unknown)."""
+        return THEMES.get(theme, THEMES['catppuccin-mocha'])
 
-# Dim screen after 5 minutes
-listener {
-    timeout = 300
-    on-timeout = brightnessctl -s set 30%
-    on-resume = brightnessctl -r
-}
+    def _configure_hyprlock(self) -> bool:
+        """Configure hyprlock."""
+        self.logger.info("Configuring hyprlock...")
 
-# Lock screen after 10 minutes
-listener {
-    timeout = 600
-    on-timeout = loginctl lock-session
-}
+        self._ensure_dir(self.hypr_dir)
+        config_path = self.hypr_dir / 'hyprlock.conf'
 
-# Turn off screen after 11 minutes
-listener {
-    timeout = 660
-    on-timeout = hyprctl dispatch dpms off
-    on-resume = hyprctl dispatch dpms on
-}
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] Would write hyprlock config to {config_path}")
+            return True
 
-# Suspend after 30 minutes
-listener {
-    timeout = 1800
-    on-timeout = systemctl suspend
-}
-'''
+        if self._write_if_changed(config_path, (DATA_DIR / 'hyprlock.conf').read_text()):
+            self.logger.success(f"Created {config_path}")
+        else:
+            self.logger.info(f"{config_path} is up to date")
+        return True
+
+    def _configure_hypridle(self) -> bool:
+        """Configure hypridle."""
+        self.logger.info("Configuring hypridle...")
+
+        self._ensure_dir(self.hypr_dir)
+        config_path = self.hypr_dir / 'hypridle.conf'
 
         if self.dry_run:
             self.logger.info(f"[DRY RUN] Would write hypridle config to {config_path}")
             return True
 
-        config_path.write_text(config_content)
-        self.logger.success(f"Created {config_path}")
+        if self._write_if_changed(config_path, (DATA_DIR / 'hypridle.conf').read_text()):
+            self.logger.success(f"Created {config_path}")
+        else:
+            self.logger.info(f"{config_path} is up to date")
         return True
 
     def _configure_panel(self) -> bool:
@@ -640,10 +750,10 @@ listener {
         self.logger.info("Configuring Walker launcher...")
 
         walker_dir = self.config_dir / 'walker'
-        walker_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(walker_dir)
 
         # Copy default config if available
-        default_config = Path('/etc/xdg/walker/config.toml')
+        default_config = WALKER_DEFAULTS_DIR / 'config.toml'
         if default_config.exists():
             config_path = walker_dir / 'config.toml'
 
@@ -651,15 +761,19 @@ listener {
                 self.logger.info(f"[DRY RUN] Would copy Walker config to {config_path}")
                 return True
 
-            shutil.copy(default_config, config_path)
+            # copy2 keeps the source mtime, so unchanged defaults are skipped next run
+            self._copy_if_newer(default_config, config_path)
 
-            # Copy themes too
-            default_themes = Path('/etc/xdg/walker/themes')
+            # Copy themes too, comparing each file rather than the directories
+            default_themes = WALKER_DEFAULTS_DIR / 'themes'
+            dest_themes = walker_dir / 'themes'
             if default_themes.exists():
-                dest_themes = walker_dir / 'themes'
-                if dest_themes.exists():
-                    shutil.rmtree(dest_themes)
-                shutil.copytree(default_themes, dest_themes)
+                shutil.copytree(
+                    default_themes,
+                    dest_themes,
+                    copy_function=self._copy_if_newer,
+                    dirs_exist_ok=True,
+                )
 
             self.logger.success("Walker configuration copied")
         else:
@@ -667,84 +781,32 @@ listener {
 
         return True
 
+    @staticmethod
+    def _copy_if_newer(src: Union[str, Path], dest: Union[str, Path]) -> Union[str, Path]:
+        """Copy src to dest with copy2 unless dest is at least as new.
+
+        Usable as a copytree copy_function, so it returns dest.
+        """
+        if _up_to_date(src, dest):
+            return dest
+        return shutil.copy2(src, dest)
+
     def _create_keybinds_helper(self) -> bool:
         """Create keybindings helper script."""
         self.logger.info("Creating keybindings helper...")
 
         bin_dir = self.home / '.local' / 'bin'
-        bin_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(bin_dir)
 
         script_path = bin_dir / 'show-keybinds'
 
-        script_content = r'''#!/bin/bash
-# Show keybindings in a popup using walker
-
-keybinds="=== APPS ===
-SUPER + T : Terminal
-SUPER + B : Firefox
-SUPER + E : File manager (Nemo)
-SUPER + R : App launcher (Walker)
-SUPER + V : Clipboard history
-SUPER + . : Emoji picker
-SUPER + / : This help
-CTRL + \` : Quake terminal
----
-=== WINDOWS ===
-SUPER + Q : Close window
-SUPER + SHIFT + Q : Force kill window
-SUPER + F : Toggle floating
-SUPER + C : Center floating window
-SUPER + Tab : Cycle windows
-SUPER + \` : Focus urgent window
-LALT + RALT : Toggle fullscreen
-CTRL + ALT + Z : Maximize (keep bar)
----
-=== VIM MOVEMENT ===
-SUPER + HJKL : Move focus
-SUPER + SHIFT + HJKL : Move window
-SUPER + CTRL + HJKL : Resize window
-SUPER + Arrows : Move focus (alt)
----
-=== LAYOUT ===
-SUPER + D : Toggle split direction
-SUPER + P : Pseudo tile
-SUPER + G : Toggle group/tabs
-SUPER + W : Cycle grouped windows
----
-=== WORKSPACES ===
-SUPER + 1-0 : Switch workspace
-SUPER + SHIFT + 1-0 : Move window to workspace
-SUPER + [ : Previous workspace
-SUPER + ] : Next workspace
-SUPER + SHIFT + [ : Move window to prev WS
-SUPER + SHIFT + ] : Move window to next WS
-SUPER + S : Scratchpad
-SUPER + SHIFT + S : Move to scratchpad
-SUPER + Scroll : Cycle workspaces
----
-=== MOUSE ===
-SUPER + LMB drag : Move window
-SUPER + RMB drag : Resize window
----
-=== SYSTEM ===
-SUPER + SHIFT + L : Lock screen
-SUPER + SHIFT + B : Toggle status bar
-SUPER + M : Exit Hyprland
----
-=== SCREENSHOT ===
-Print : Full screen
-SUPER + Print : Window
-SUPER + SHIFT + Print : Region
-SUPER + ALT + Print : Region + annotate"
-
-echo "$keybinds" | walker --dmenu -p "Keybindings"
-'''
-
         if self.dry_run:
             self.logger.info(f"[DRY RUN] Would create keybinds helper at {script_path}")
             return True
 
-        script_path.write_text(script_content)
-        script_path.chmod(0o755)
-        self.logger.success(f"Created {script_path}")
+        script_content = (DATA_DIR / 'show-keybinds.sh').read_text()
+        if self._write_if_changed(script_path, script_content, mode=0o755):
+            self.logger.success(f"Created {script_path}")
+        else:
+            self.logger.info(f"{script_path} is up to date")
         return True
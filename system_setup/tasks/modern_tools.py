@@ -1,9 +1,12 @@
 """Modern CLI tools installation task."""
 
-import shutil
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
+from system_setup.packages.base import PackageManager
 from system_setup.packages.factory import get_package_manager
 from system_setup.tasks.base import BaseTask
 
@@ -120,11 +123,142 @@ DEV_TOOLS = {
     },
 }
 
+# Merged lookup table and tool names, built once at import
+ALL_TOOLS = {**MODERN_CLI_TOOLS, **DEV_TOOLS}
+ALL_TOOL_NAMES = tuple(ALL_TOOLS)
+
 # AUR-only packages (Arch Linux)
-AUR_PACKAGES = [
+AUR_PACKAGES: FrozenSet[str] = frozenset({
     "lazydocker",
+})
+
+# Global git settings that route diffs through delta
+DELTA_GIT_CONFIG = [
+    ("core.pager", "delta"),
+    ("interactive.diffFilter", "delta --color-only"),
+    ("delta.navigate", "true"),
+    ("delta.light", "false"),
+    ("delta.side-by-side", "true"),
+    ("delta.line-numbers", "true"),
+    ("merge.conflictStyle", "diff3"),
+    ("diff.colorMoved", "default"),
 ]
 
+# Default config files, encoded once at import
+MISE_CONFIG = '''# mise configuration
+# https://mise.jdx.dev/
+
+[settings]
+# Always use the latest version as default
+legacy_version_file = true
+always_keep_download = false
+always_keep_install = false
+plugin_autoupdate_last_check_duration = "7d"
+
+# Trusted directories for auto-installing tools
+trusted_config_paths = ["~/.config/mise"]
+
+# Default tools to have available globally
+[tools]
+# python = "latest"
+# node = "lts"
+# go = "latest"
+'''.encode()
+
+STARSHIP_CONFIG = '''# Starship prompt configuration
+# https://starship.rs/config/
+
+# Minimal timeout for responsiveness
+command_timeout = 500
+
+# Prompt format - clean and informative
+format = """
+$directory$git_branch$git_status$python$nodejs$rust$golang$cmd_duration
+$character"""
+
+[character]
+success_symbol = "[>](bold green)"
+error_symbol = "[>](bold red)"
+
+[directory]
+truncation_length = 3
+truncate_to_repo = true
+style = "bold cyan"
+
+[git_branch]
+symbol = " "
+style = "bold purple"
+
+[git_status]
+style = "bold yellow"
+conflicted = "!"
+ahead = "^"
+behind = "v"
+diverged = "^v"
+modified = "*"
+staged = "+"
+untracked = "?"
+
+[python]
+symbol = " "
+style = "bold yellow"
+
+[nodejs]
+symbol = " "
+style = "bold green"
+
+[rust]
+symbol = " "
+style = "bold red"
+
+[golang]
+symbol = " "
+style = "bold cyan"
+
+[cmd_duration]
+min_time = 2_000
+style = "bold yellow"
+format = "[$duration]($style) "
+'''.encode()
+
+
+@lru_cache(maxsize=1)
+def _path_executables() -> FrozenSet[str]:
+    """
+    Collect the names of all executables on PATH.
+
+    One directory listing per PATH entry replaces a stat per tool per
+    entry. Call ``_path_executables.cache_clear()`` after installing.
+
+    Names with a PATHEXT extension (Windows) are also added without it, so
+    ``eza.exe`` is found as ``eza``.
+
+    Returns:
+        Frozen set of executable file names
+    """
+    default_pathext = '.COM;.EXE;.BAT;.CMD' if os.name == 'nt' else ''
+    pathext = {
+        ext.lower()
+        for ext in os.environ.get('PATHEXT', default_pathext).split(os.pathsep)
+        if ext
+    }
+    names = set()
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        try:
+            with os.scandir(directory or '.') as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.add(entry.name)
+                            stem, ext = os.path.splitext(entry.name)
+                            if ext.lower() in pathext:
+                                names.add(stem)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return frozenset(names)
+
 
 class ModernToolsTask(BaseTask):
     """Installs modern CLI tools.
@@ -157,85 +291,93 @@ class ModernToolsTask(BaseTask):
 
         self.logger.section(self.description)
 
-        # Step 1: Install core modern tools
-        if not self._install_core_tools():
+        # Step 1: Install core and dev tools together
+        if not self._install_tools():
             return False
 
-        # Step 2: Install dev tools
-        if not self._install_dev_tools():
-            return False
-
-        # Step 3: Configure mise
-        if not self._configure_mise():
-            return False
-
-        # Step 4: Configure starship
-        if not self._configure_starship():
-            return False
-
-        # Step 5: Configure git delta
-        if not self._configure_delta():
-            return False
-
-        # Step 6: Update tldr cache
-        if not self._update_tldr():
+        # Steps 2-5: Configure mise, starship, git delta and the tldr cache.
+        # They touch disjoint files, so run them side by side.
+        steps = [
+            self._configure_mise,
+            self._configure_starship,
+            self._configure_delta,
+            self._update_tldr,
+        ]
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            futures = [executor.submit(step) for step in steps]
+            results = [future.result() for future in as_completed(futures)]
+        if not all(results):
             return False
 
         self.mark_complete()
         self.logger.success("Modern tools installation complete")
         return True
 
-    def _install_core_tools(self) -> bool:
-        """Install core modern CLI tools."""
-        self.logger.info("Installing core modern tools...")
+    @cached_property
+    def pkg_manager(self) -> Optional[PackageManager]:
+        """Package manager for this platform, resolved once per task."""
+        return get_package_manager(self.platform, self.dry_run)
 
-        pkg_manager = get_package_manager(self.platform, self.dry_run)
-        if not pkg_manager:
-            self.logger.error("No package manager available")
-            return False
+    @staticmethod
+    def _has(tool: str) -> bool:
+        """Check whether a tool is on PATH using the cached scan."""
+        return tool in _path_executables()
+
+    def _collect_core_packages(self) -> List[str]:
+        """
+        Collect missing core modern CLI tools.
 
-        # Collect packages to install
+        Returns:
+            Repo packages to install; AUR-only core tools are not
+            installed by this task
+        """
+        self.logger.info("Core modern tools:")
         packages = []
         for tool, info in MODERN_CLI_TOOLS.items():
             pkg_name = info["package"]
-            if not shutil.which(tool) and pkg_name not in AUR_PACKAGES:
+            if not self._has(tool) and pkg_name not in AUR_PACKAGES:
                 packages.append(pkg_name)
                 self.logger.info(f"  {tool}: {info['description']} (replaces {info['replaces']})")
-
         if not packages:
             self.logger.info("All core tools already installed")
-            return True
-
-        if self.dry_run:
-            self.logger.info(f"[DRY RUN] Would install: {', '.join(packages)}")
-            return True
-
-        return pkg_manager.install(packages)
-
-    def _install_dev_tools(self) -> bool:
-        """Install development tools."""
-        self.logger.info("Installing development tools...")
+        return packages
 
-        pkg_manager = get_package_manager(self.platform, self.dry_run)
-        if not pkg_manager:
-            self.logger.error("No package manager available")
-            return False
+    def _collect_dev_packages(self) -> Tuple[List[str], List[str]]:
+        """
+        Collect missing development tools.
 
-        # Collect packages to install
+        Returns:
+            Tuple of (repo packages, AUR packages)
+        """
+        self.logger.info("Development tools:")
         packages = []
         aur_packages = []
-
         for tool, info in DEV_TOOLS.items():
             pkg_name = info["package"]
-            if not shutil.which(tool):
+            if not self._has(tool):
                 if pkg_name in AUR_PACKAGES:
                     aur_packages.append(pkg_name)
                 else:
                     packages.append(pkg_name)
                 self.logger.info(f"  {tool}: {info['description']}")
-
         if not packages and not aur_packages:
             self.logger.info("All dev tools already installed")
+        return packages, aur_packages
+
+    def _install_tools(self) -> bool:
+        """Install missing core and dev tools in one package manager transaction."""
+        self.logger.info("Installing modern tools...")
+
+        pkg_manager = self.pkg_manager
+        if not pkg_manager:
+            self.logger.error("No package manager available")
+            return False
+
+        core_packages = self._collect_core_packages()
+        dev_packages, aur_packages = self._collect_dev_packages()
+        packages = core_packages + dev_packages
+
+        if not packages and not aur_packages:
             return True
 
         if self.dry_run:
@@ -246,20 +388,23 @@ class ModernToolsTask(BaseTask):
             return True
 
         success = True
-        if packages:
-            if not pkg_manager.install(packages):
-                success = False
+        try:
+            if packages:
+                if not pkg_manager.install(packages):
+                    success = False
 
-        # Install AUR packages if paru is available
-        if aur_packages and hasattr(pkg_manager, 'install_aur'):
-            if not pkg_manager.install_aur(aur_packages):
-                self.logger.warning("Some AUR packages failed to install")
+            # Install AUR packages if paru is available
+            if aur_packages and hasattr(pkg_manager, 'install_aur'):
+                if not pkg_manager.install_aur(aur_packages):
+                    self.logger.warning("Some AUR packages failed to install")
+        finally:
+            _path_executables.cache_clear()
 
         return success
 
     def _configure_mise(self) -> bool:
         """Configure mise version manager."""
-        if not shutil.which('mise'):
+        if not self._has('mise'):
             self.logger.info("mise not installed, skipping configuration")
             return True
 
@@ -275,29 +420,9 @@ class ModernToolsTask(BaseTask):
             self.logger.info(f"[DRY RUN] Would create {config_path}")
             return True
 
-        config_content = '''# mise configuration
-# https://mise.jdx.dev/
-
-[settings]
-# Always use the latest version as default
-legacy_version_file = true
-always_keep_download = false
-always_keep_install = false
-plugin_autoupdate_last_check_duration = "7d"
-
-# Trusted directories for auto-installing tools
-trusted_config_paths = ["~/.config/mise"]
-
-# Default tools to have available globally
-[tools]
-# python = "latest"
-# node = "lts"
-# go = "latest"
-'''
-
         try:
             config_path.parent.mkdir(parents=True, exist_ok=True)
-            config_path.write_text(config_content)
+            config_path.write_bytes(MISE_CONFIG)
             self.logger.success("mise configured")
             return True
         except Exception as e:
@@ -306,7 +431,7 @@ trusted_config_paths = ["~/.config/mise"]
 
     def _configure_starship(self) -> bool:
         """Configure starship prompt."""
-        if not shutil.which('starship'):
+        if not self._has('starship'):
             self.logger.info("starship not installed, skipping configuration")
             return True
 
@@ -322,65 +447,9 @@ trusted_config_paths = ["~/.config/mise"]
             self.logger.info(f"[DRY RUN] Would create {config_path}")
             return True
 
-        config_content = '''# Starship prompt configuration
-# https://starship.rs/config/
-
-# Minimal timeout for responsiveness
-command_timeout = 500
-
-# Prompt format - clean and informative
-format = """
-$directory$git_branch$git_status$python$nodejs$rust$golang$cmd_duration
-$character"""
-
-[character]
-success_symbol = "[>](bold green)"
-error_symbol = "[>](bold red)"
-
-[directory]
-truncation_length = 3
-truncate_to_repo = true
-style = "bold cyan"
-
-[git_branch]
-symbol = " "
-style = "bold purple"
-
-[git_status]
-style = "bold yellow"
-conflicted = "!"
-ahead = "^"
-behind = "v"
-diverged = "^v"
-modified = "*"
-staged = "+"
-untracked = "?"
-
-[python]
-symbol = " "
-style = "bold yellow"
-
-[nodejs]
-symbol = " "
-style = "bold green"
-
-[rust]
-symbol = " "
-style = "bold red"
-
-[golang]
-symbol = " "
-style = "bold cyan"
-
-[cmd_duration]
-min_time = 2_000
-style = "bold yellow"
-format = "[$duration]($style) "
-'''
-
         try:
             config_path.parent.mkdir(parents=True, exist_ok=True)
-            config_path.write_text(config_content)
+            config_path.write_bytes(STARSHIP_CONFIG)
             self.logger.success("starship configured")
             return True
         except Exception as e:
@@ -389,7 +458,7 @@ format = "[$duration]($style) "
 
     def _configure_delta(self) -> bool:
         """Configure git-delta as git pager."""
-        if not shutil.which('delta'):
+        if not self._has('delta'):
             self.logger.info("delta not installed, skipping configuration")
             return True
 
@@ -399,28 +468,45 @@ format = "[$duration]($style) "
             self.logger.info("[DRY RUN] Would configure git to use delta")
             return True
 
-        git_configs = [
-            ("core.pager", "delta"),
-            ("interactive.diffFilter", "delta --color-only"),
-            ("delta.navigate", "true"),
-            ("delta.light", "false"),
-            ("delta.side-by-side", "true"),
-            ("delta.line-numbers", "true"),
-            ("merge.conflictStyle", "diff3"),
-            ("diff.colorMoved", "default"),
+        current = self._global_git_config()
+        pending = [
+            (key, value) for key, value in DELTA_GIT_CONFIG
+            if current.get(key.lower()) != value
         ]
+        if not pending:
+            self.logger.info("git-delta already configured")
+            return True
 
-        for key, value in git_configs:
-            result = self.cmd.run_quiet(['git', 'config', '--global', key, value])
+        for key, value in pending:
+            result = self.cmd.run_quiet(
+                ['git', 'config', '--global', key, value], discard_stdout=True
+            )
             if not result.success:
                 self.logger.warning(f"Failed to set git config {key}: {result.stderr}")
 
         self.logger.success("git-delta configured")
         return True
 
+    def _global_git_config(self) -> Dict[str, str]:
+        """
+        Read the global git config in a single git call.
+
+        Returns:
+            Dict of lowercased key to value (empty if unreadable)
+        """
+        result = self.cmd.run_quiet(['git', 'config', '--global', '--null', '--list'])
+        if not result.success:
+            return {}
+        config = {}
+        for entry in result.stdout.split('\0'):
+            key, _, value = entry.partition('\n')
+            if key:
+                config[key.lower()] = value
+        return config
+
     def _update_tldr(self) -> bool:
         """Update tealdeer/tldr cache."""
-        if not shutil.which('tldr'):
+        if not self._has('tldr'):
             self.logger.info("tldr not installed, skipping cache update")
             return True
 
@@ -430,7 +516,7 @@ format = "[$duration]($style) "
             self.logger.info("[DRY RUN] Would update tldr cache")
             return True
 
-        result = self.cmd.run_quiet(['tldr', '--update'])
+        result = self.cmd.run_quiet(['tldr', '--update'], discard_stdout=True)
         if result.success:
             self.logger.success("tldr cache updated")
         else:
@@ -447,11 +533,7 @@ format = "[$duration]($style) "
         Returns:
             Tool info dict or None
         """
-        if tool in MODERN_CLI_TOOLS:
-            return MODERN_CLI_TOOLS[tool]
-        if tool in DEV_TOOLS:
-            return DEV_TOOLS[tool]
-        return None
+        return ALL_TOOLS.get(tool)
 
     def list_installed(self) -> List[str]:
         """
@@ -460,11 +542,7 @@ format = "[$duration]($style) "
         Returns:
             List of installed tool names
         """
-        installed = []
-        for tool in {**MODERN_CLI_TOOLS, **DEV_TOOLS}:
-            if shutil.which(tool):
-                installed.append(tool)
-        return installed
+        return [tool for tool in ALL_TOOL_NAMES if self._has(tool)]
 
     def list_available(self) -> List[str]:
         """
@@ -473,8 +551,4 @@ format = "[$duration]($style) "
         Returns:
             List of available tool names
         """
-        available = []
-        for tool in {**MODERN_CLI_TOOLS, **DEV_TOOLS}:
-            if not shutil.which(tool):
-                available.append(tool)
-        return available
+        return [tool for tool in ALL_TOOL_NAMES if not self._has(tool)]
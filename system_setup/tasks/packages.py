@@ -1,6 +1,9 @@
 """Package installation task."""
 
-from typing import Callable, List, Optional
+import platform as _py_platform
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
 
 from system_setup.config import Config
 from system_setup.packages.factory import get_package_manager
@@ -10,6 +13,91 @@ from system_setup.tasks.base import BaseTask
 from system_setup.utils.command import CommandRunner
 
 
+CASK_SUFFIX = '.cask'
+
+# os-release ID/ID_LIKE values mapped to package list names
+OS_RELEASE_DISTROS = (
+    ('arch', 'arch'),
+    ('debian', 'debian'),
+    ('ubuntu', 'debian'),
+    ('fedora', 'fedora'),
+)
+
+
+def _read_os_release() -> Dict[str, str]:
+    """
+    Parse /etc/os-release into a dict.
+
+    Uses platform.freedesktop_os_release() where available (Python 3.10+).
+
+    Returns:
+        os-release fields
+
+    Raises:
+        OSError: If no os-release file can be read
+    """
+    reader = getattr(_py_platform, 'freedesktop_os_release', None)
+    if reader is not None:
+        return reader()
+
+    info = {}
+    with open('/etc/os-release', 'r') as f:
+        for line in f:
+            key, sep, value = line.strip().partition('=')
+            if sep and not key.startswith('#'):
+                info[key] = value.strip('"\'')
+    return info
+
+
+@lru_cache(maxsize=1)
+def _os_release_distro() -> Optional[str]:
+    """Map the os-release ID and ID_LIKE fields to a package list name."""
+    try:
+        info = _read_os_release()
+    except OSError:
+        return None
+    ids = f"{info.get('ID', '')} {info.get('ID_LIKE', '')}".lower().split()
+    for key, distro in OS_RELEASE_DISTROS:
+        if key in ids:
+            return distro
+    return None
+
+
+@dataclass
+class PackageSet:
+    """Package list partitioned into formulae and casks."""
+
+    packages: List[str] = field(default_factory=list)
+    formulae: List[str] = field(default_factory=list)
+    casks: List[str] = field(default_factory=list)
+    display_names: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_list(cls, packages: List[str]) -> 'PackageSet':
+        """
+        Partition packages in a single pass.
+
+        Args:
+            packages: Package names (casks have .cask suffix)
+
+        Returns:
+            PackageSet with casks stripped of their suffix
+        """
+        package_set = cls(packages=list(packages))
+        for pkg in packages:
+            if pkg.endswith(CASK_SUFFIX):
+                name = pkg[:-len(CASK_SUFFIX)]
+                package_set.casks.append(name)
+                package_set.display_names.append(f"{name} (cask)")
+            else:
+                package_set.formulae.append(pkg)
+                package_set.display_names.append(pkg)
+        return package_set
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+
 class PackagesTask(BaseTask):
     """Manages package installation across platforms.
 
@@ -63,16 +151,15 @@ class PackagesTask(BaseTask):
                 self.logger.warning("Package manager update failed (continuing anyway)")
 
         # Get packages to install from config
-        packages = self._get_packages()
+        packages = PackageSet.from_list(self._get_packages())
 
         if not packages:
             self.logger.warning("No packages defined for this platform")
             self.mark_complete()
             return True
 
-        # Separate regular packages from casks for display purposes
-        regular_packages = [p for p in packages if not p.endswith('.cask')]
-        cask_packages = [p.replace('.cask', '') for p in packages if p.endswith('.cask')]
+        regular_packages = packages.formulae
+        cask_packages = packages.casks
 
         self.logger.info(f"Found {len(packages)} packages to install")
         if cask_packages:
@@ -132,23 +219,12 @@ class PackagesTask(BaseTask):
 
     def _detect_linux_distro(self) -> Optional[str]:
         """Detect Linux distribution name."""
-        try:
-            with open('/etc/os-release', 'r') as f:
-                content = f.read()
-                if 'arch' in content.lower():
-                    return 'arch'
-                elif 'debian' in content.lower() or 'ubuntu' in content.lower():
-                    return 'debian'
-                elif 'fedora' in content.lower():
-                    return 'fedora'
-        except (FileNotFoundError, PermissionError):
-            pass
-        return None
+        return _os_release_distro()
 
     def _install_packages(
         self,
         pkg_manager,
-        packages: List[str],
+        packages: PackageSet,
         label: str = "packages",
     ) -> bool:
         """
@@ -156,7 +232,7 @@ class PackagesTask(BaseTask):
 
         Args:
             pkg_manager: Package manager instance
-            packages: List of package names
+            packages: Partitioned package set
             label: Label for progress display
 
         Returns:
@@ -164,7 +240,7 @@ class PackagesTask(BaseTask):
         """
         if self.dry_run:
             self.log_dry_run(f"install {len(packages)} {label}")
-            for pkg in packages:
+            for pkg in packages.packages:
                 self.logger.track_package(pkg)
             return True
 
@@ -173,16 +249,15 @@ class PackagesTask(BaseTask):
         # Use progress bar for visual feedback
         with self.logger.progress_bar(f"Installing {label}", len(packages)) as progress:
             # Install all packages at once (most package managers handle this efficiently)
-            success = pkg_manager.install(packages)
+            success = pkg_manager.install(packages.packages)
 
             if progress:
                 # Update progress to complete
                 progress.update(progress._task_id, completed=len(packages))
 
         if success:
-            # Track packages for summary (clean up .cask suffix for display)
-            for pkg in packages:
-                display_name = pkg.replace('.cask', ' (cask)') if pkg.endswith('.cask') else pkg
+            # Track packages for summary (casks shown without their suffix)
+            for display_name in packages.display_names:
                 self.logger.track_package(display_name)
 
         return success
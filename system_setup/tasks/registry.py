@@ -1,6 +1,10 @@
 """Task registry for dynamic task discovery and management."""
 
-from typing import Any, Dict, List, Optional, Type
+import inspect
+from collections import deque
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Dict, List, NamedTuple, Optional, Type, Union
 
 from system_setup.config import Config
 from system_setup.platform import Platform
@@ -8,31 +12,52 @@ from system_setup.state import StateManager
 from system_setup.tasks.base import BaseTask
 
 
-# Descriptions for legacy tasks that don't have description property
-TASK_DESCRIPTIONS: Dict[str, str] = {
-    'packages': 'Package Installation',
-    'chezmoi': 'Chezmoi Dotfiles Management',
-    'dotfiles': 'Dotfiles Management (Legacy)',
-    'fish': 'Fish Shell Configuration',
-    'hyprland': 'Hyprland Desktop Environment',
-    'modern-tools': 'Modern CLI Tools Installation',
-    'settings': 'System Settings',
-    'shell': 'Shell Configuration',
-}
+class TaskMeta(NamedTuple):
+    """Fallback metadata for legacy tasks without the matching properties."""
+
+    description: str
+    state_key: str
+
 
-# State keys for legacy tasks
-TASK_STATE_KEYS: Dict[str, str] = {
-    'packages': 'packages_installed',
-    'chezmoi': 'chezmoi_configured',
-    'dotfiles': 'dotfiles_installed',
-    'fish': 'fish_configured',
-    'hyprland': 'hyprland_setup',
-    'modern-tools': 'modern_tools_installed',
-    'settings': 'settings_applied',
-    'shell': 'shell_configured',
+# Metadata for legacy tasks that don't have description/state_key properties
+TASK_META: Dict[str, TaskMeta] = {
+    'packages': TaskMeta('Package Installation', 'packages_installed'),
+    'chezmoi': TaskMeta('Chezmoi Dotfiles Management', 'chezmoi_configured'),
+    'dotfiles': TaskMeta('Dotfiles Management (Legacy)', 'dotfiles_installed'),
+    'fish': TaskMeta('Fish Shell Configuration', 'fish_configured'),
+    'hyprland': TaskMeta('Hyprland Desktop Environment', 'hyprland_setup'),
+    'modern-tools': TaskMeta('Modern CLI Tools Installation', 'modern_tools_installed'),
+    'settings': TaskMeta('System Settings', 'settings_applied'),
+    'shell': TaskMeta('Shell Configuration', 'shell_configured'),
 }
 
 
+@lru_cache(maxsize=None)
+def _accepts_platform(task_class: Type[BaseTask]) -> bool:
+    """Check once per class whether its constructor takes a platform argument."""
+    parameters = inspect.signature(task_class).parameters.values()
+    return any(
+        param.name == 'platform' or param.kind is param.VAR_KEYWORD
+        for param in parameters
+    )
+
+
+def _construct(task_class: Type[BaseTask], **kwargs: Any) -> Any:
+    """
+    Instantiate a task, leaving out platform for legacy constructors.
+
+    Args:
+        task_class: Task class
+        **kwargs: Constructor arguments
+
+    Returns:
+        Task instance
+    """
+    if not _accepts_platform(task_class):
+        kwargs.pop('platform', None)
+    return task_class(**kwargs)
+
+
 class TaskRegistry:
     """Registry for managing available setup tasks.
 
@@ -45,7 +70,8 @@ class TaskRegistry:
 
     def __init__(self) -> None:
         """Initialize empty registry."""
-        self._tasks: Dict[str, Type[BaseTask]] = {}
+        # Values are task classes or lazy "module:Class" import specs
+        self._tasks: Dict[str, Union[Type[BaseTask], str]] = {}
 
     def register(self, task_class: Type[BaseTask]) -> Type[BaseTask]:
         """
@@ -107,7 +133,12 @@ class TaskRegistry:
         Returns:
             Task class or None if not found
         """
-        return self._tasks.get(name)
+        task_class = self._tasks.get(name)
+        if isinstance(task_class, str):
+            module_name, _, class_name = task_class.partition(':')
+            task_class = getattr(import_module(module_name), class_name)
+            self._tasks[name] = task_class
+        return task_class
 
     def list_tasks(self) -> List[str]:
         """
@@ -136,12 +167,8 @@ class TaskRegistry:
             List of supported task names
         """
         supported = []
-        for name, task_class in self._tasks.items():
-            task = task_class(
-                config=config,
-                state=state,
-                platform=platform,
-            )
+        for name in list(self._tasks):
+            task = _construct(self.get(name), config=config, state=state, platform=platform)
             if task.is_supported():
                 supported.append(name)
         return sorted(supported)
@@ -173,23 +200,14 @@ class TaskRegistry:
         if task_class is None:
             return None
 
-        # Try with platform first, fall back to without for legacy tasks
-        try:
-            return task_class(
-                config=config,
-                state=state,
-                platform=platform,
-                dry_run=dry_run,
-                auto_yes=auto_yes,
-            )
-        except TypeError:
-            # Legacy task without platform parameter (e.g., DotfilesTask)
-            return task_class(
-                config=config,
-                state=state,
-                dry_run=dry_run,
-                auto_yes=auto_yes,
-            )
+        return _construct(
+            task_class,
+            config=config,
+            state=state,
+            platform=platform,
+            dry_run=dry_run,
+            auto_yes=auto_yes,
+        )
 
     def get_task_info(
         self,
@@ -214,23 +232,12 @@ class TaskRegistry:
         if task_class is None:
             return None
 
-        # Handle legacy tasks that don't take platform in constructor
-        try:
-            task = task_class(
-                config=config,
-                state=state,
-                platform=platform,
-            )
-        except TypeError:
-            # Legacy task without platform parameter (e.g., DotfilesTask)
-            task = task_class(
-                config=config,
-                state=state,
-            )
+        task = _construct(task_class, config=config, state=state, platform=platform)
 
         # Get task properties with fallbacks for legacy tasks
         task_name = getattr(task, 'name', name)
-        description = getattr(task, 'description', TASK_DESCRIPTIONS.get(name, name.title()))
+        meta = TASK_META.get(name)
+        description = getattr(task, 'description', meta.description if meta else name.title())
 
         # Check supported status
         if hasattr(task, 'is_supported'):
@@ -251,11 +258,11 @@ class TaskRegistry:
             complete = task.is_complete()
         else:
             # Legacy: check state directly
-            state_key = TASK_STATE_KEYS.get(name, f'{name}_configured')
+            state_key = meta.state_key if meta else f'{name}_configured'
             complete = state.is_complete(state_key)
 
         # Get dependencies
-        depends_on = getattr(task, 'depends_on', [])
+        depends_on = list(getattr(task, 'depends_on', ()))
 
         return {
             'name': task_name,
@@ -269,7 +276,9 @@ class TaskRegistry:
         """
         Resolve task dependencies and return execution order.
 
-        Uses topological sort to ensure dependencies run first.
+        Uses a topological sort (Kahn's algorithm) so dependencies run
+        first; otherwise the requested order is kept. Dependencies that
+        were not requested are treated as already satisfied.
 
         Args:
             task_names: List of task names to run
@@ -280,47 +289,75 @@ class TaskRegistry:
         Raises:
             ValueError: If circular dependency detected
         """
-        # Build dependency graph
-        # For now, we'll implement a simple version that assumes
-        # dependencies are already registered
-        # Full implementation would do topological sort
+        requested = set(task_names)
+        depends_on = {
+            name: [dep for dep in self._depends_on(name) if dep in requested and dep != name]
+            for name in task_names
+        }
 
-        # Simple approach: just ensure we have all names
-        # A more sophisticated version would analyze depends_on
-        return task_names
+        # Common case: nothing to reorder
+        if not any(depends_on.values()):
+            return list(task_names)
+
+        in_degree = {name: len(deps) for name, deps in depends_on.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in task_names}
+        for name, deps in depends_on.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        ready = deque(name for name in task_names if in_degree[name] == 0)
+        ordered = []
+        while ready:
+            name = ready.popleft()
+            ordered.append(name)
+            for dependent in dependents[name]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(ordered) < len(depends_on):
+            cycle = sorted(name for name, degree in in_degree.items() if degree > 0)
+            raise ValueError(f"Circular dependency between tasks: {', '.join(cycle)}")
+
+        return ordered
+
+    def _depends_on(self, name: str) -> List[str]:
+        """
+        Get a registered task's dependencies without constructing it.
 
+        Args:
+            name: Task name
 
-# Global registry instance
-_registry: Optional[TaskRegistry] = None
+        Returns:
+            Names of tasks it depends on (empty if unknown)
+        """
+        task_class = self.get(name)
+        if task_class is None:
+            return []
+        return list(getattr(task_class, 'depends_on', ()))
 
 
+@lru_cache(maxsize=None)
 def get_registry() -> TaskRegistry:
-    """Get or create the global task registry."""
-    global _registry
-    if _registry is None:
-        _registry = TaskRegistry()
-        _register_default_tasks(_registry)
-    return _registry
+    """
+    Get or create the global task registry.
+
+    Call get_registry.cache_clear() to start from a fresh registry.
+    """
+    registry = TaskRegistry()
+    _register_default_tasks(registry)
+    return registry
 
 
 def _register_default_tasks(registry: TaskRegistry) -> None:
-    """Register all default tasks."""
-    # Import task classes
-    from system_setup.tasks.packages import PackagesTask
-    from system_setup.tasks.chezmoi import ChezmoiTask
-    from system_setup.tasks.dotfiles import DotfilesTask
-    from system_setup.tasks.fish import FishTask
-    from system_setup.tasks.hyprland import HyprlandTask
-    from system_setup.tasks.modern_tools import ModernToolsTask
-    from system_setup.tasks.settings import SettingsTask
-    from system_setup.tasks.shell import ShellTask
-
-    # Register with explicit names
-    registry._tasks['packages'] = PackagesTask
-    registry._tasks['chezmoi'] = ChezmoiTask
-    registry._tasks['dotfiles'] = DotfilesTask
-    registry._tasks['fish'] = FishTask
-    registry._tasks['hyprland'] = HyprlandTask
-    registry._tasks['modern-tools'] = ModernToolsTask
-    registry._tasks['settings'] = SettingsTask
-    registry._tasks['shell'] = ShellTask
+    """Register all default tasks (imported lazily on first use)."""
+    registry._tasks.update({
+        'packages': 'system_setup.tasks.packages:PackagesTask',
+        'chezmoi': 'system_setup.tasks.chezmoi:ChezmoiTask',
+        'dotfiles': 'system_setup.tasks.dotfiles:DotfilesTask',
+        'fish': 'system_setup.tasks.fish:FishTask',
+        'hyprland': 'system_setup.tasks.hyprland:HyprlandTask',
+        'modern-tools': 'system_setup.tasks.modern_tools:ModernToolsTask',
+        'settings': 'system_setup.tasks.settings:SettingsTask',
+        'shell': 'system_setup.tasks.shell:ShellTask',
+    })
@@ -1,8 +1,9 @@
 """System settings configuration task."""
 
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
 
-from system_setup.tasks.base import BaseTask
+from system_setup.tasks.base import YES_ANSWERS, BaseTask
 
 
 class SettingsTask(BaseTask):
@@ -44,57 +45,117 @@ class SettingsTask(BaseTask):
 
     def _apply_macos_settings(self) -> None:
         """Apply macOS settings."""
-        settings_groups: Dict[str, List[str]] = {
+        settings_groups: Dict[str, List[List[str]]] = {
             "Dock": [
-                'defaults write com.apple.dock "autohide" -bool "true"',
-                'defaults write com.apple.dock "autohide-delay" -float "0"',
-                'defaults write com.apple.dock "show-recents" -bool "false"',
+                ['defaults', 'write', 'com.apple.dock', 'autohide', '-bool', 'true'],
+                ['defaults', 'write', 'com.apple.dock', 'autohide-delay', '-float', '0'],
+                ['defaults', 'write', 'com.apple.dock', 'show-recents', '-bool', 'false'],
             ],
             "Finder": [
-                'defaults write NSGlobalDomain "AppleShowAllExtensions" -bool "true"',
-                'defaults write com.apple.finder "AppleShowAllFiles" -bool "true"',
-                'defaults write com.apple.finder "ShowPathbar" -bool "true"',
+                ['defaults', 'write', 'NSGlobalDomain', 'AppleShowAllExtensions', '-bool', 'true'],
+                ['defaults', 'write', 'com.apple.finder', 'AppleShowAllFiles', '-bool', 'true'],
+                ['defaults', 'write', 'com.apple.finder', 'ShowPathbar', '-bool', 'true'],
             ],
             "General": [
-                'defaults write NSGlobalDomain "ApplePressAndHoldEnabled" -bool "false"',
-                'defaults write com.apple.screencapture "type" -string "png"',
+                [
+                    'defaults',
+                    'write',
+                    'NSGlobalDomain',
+                    'ApplePressAndHoldEnabled',
+                    '-bool',
+                    'false',
+                ],
+                ['defaults', 'write', 'com.apple.screencapture', 'type', '-string', 'png'],
             ],
         }
 
-        for group_name, commands in settings_groups.items():
-            self._apply_settings_group(group_name, commands)
+        self._apply_settings_groups(settings_groups)
 
     def _apply_linux_settings(self) -> None:
         """Apply Linux settings."""
         # GNOME settings
         if self.cmd.is_available('gsettings'):
             gnome_settings = [
-                'gsettings set org.gnome.nautilus.preferences show-hidden-files true',
-                'gsettings set org.gnome.desktop.interface show-battery-percentage true',
+                ['gsettings', 'set', 'org.gnome.nautilus.preferences', 'show-hidden-files', 'true'],
+                [
+                    'gsettings',
+                    'set',
+                    'org.gnome.desktop.interface',
+                    'show-battery-percentage',
+                    'true',
+                ],
             ]
-            self._apply_settings_group("GNOME", gnome_settings)
+            self._apply_settings_groups({"GNOME": gnome_settings})
 
     def _apply_windows_settings(self) -> None:
         """Apply Windows settings."""
         self.logger.info("Windows settings not yet implemented")
 
-    def _apply_settings_group(self, name: str, commands: List[str]) -> None:
-        """Apply a group of settings."""
-        if not self.auto_yes:
-            response = input(f"Apply {name} settings? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
+    def _apply_settings_groups(self, groups: Dict[str, List[List[str]]]) -> None:
+        """Ask once which groups to apply, then apply them."""
+        approved = self._prompt_groups(list(groups))
+        for name in groups:
+            if name not in approved:
                 self.logger.info(f"Skipped: {name}")
-                return
+        selected = [(name, commands) for name, commands in groups.items() if name in approved]
+
+        # Groups are independent; settings.parallel: false applies them in order
+        if len(selected) > 1 and self.config.get_bool('settings.parallel', True):
+            with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+                futures = [
+                    executor.submit(self._apply_settings_group, name, commands)
+                    for name, commands in selected
+                ]
+                for future in futures:
+                    future.result()
+        else:
+            for name, commands in selected:
+                self._apply_settings_group(name, commands)
+
+    def _prompt_groups(self, names: List[str]) -> Set[str]:
+        """
+        Ask which settings groups to apply with a single prompt.
+
+        Args:
+            names: Settings group names
 
+        Returns:
+            Names of the approved groups
+        """
+        if self.auto_yes:
+            return set(names)
+
+        if len(names) == 1:
+            response = input(f"Apply {names[0]} settings? (y/N): ")
+            return set(names) if response.strip().lower() in YES_ANSWERS else set()
+
+        self.logger.info("Settings groups:")
+        for number, name in enumerate(names, 1):
+            self.logger.info(f"  {number}. {name}")
+        response = input("Apply which settings? (e.g. 1,3 / all) [none]: ").strip().lower()
+
+        if response in ('a', 'all') or response in YES_ANSWERS:
+            return set(names)
+        approved = set()
+        for part in response.replace(',', ' ').split():
+            if part.isdigit() and 1 <= int(part) <= len(names):
+                approved.add(names[int(part) - 1])
+        return approved
+
+    def _apply_settings_group(self, name: str, commands: List[List[str]]) -> None:
+        """Apply a group of settings."""
         if self.dry_run:
             self.logger.info(f"[DRY RUN] Would apply {name} settings")
             return
 
         self.logger.info(f"Applying {name} settings...")
-        for cmd in commands:
-            result = self.cmd.run_quiet(cmd, shell=True)
-            if not result.success:
-                self.logger.warning(f"  Failed: {cmd}")
+        failed = [
+            ' '.join(command) for command in commands
+            if not self.cmd.run_quiet(command, discard_stdout=True).success
+        ]
+        if failed:
+            details = '\n'.join(f"  Failed: {command}" for command in failed)
+            self.logger.warning(f"{len(failed)} {name} setting(s) failed:\n{details}")
 
         self.logger.success(f"{name} settings applied")
         self.logger.track_setting(name)
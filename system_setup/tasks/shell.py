@@ -1,9 +1,9 @@
 """Shell configuration task."""
 
-from pathlib import Path
+import shutil
 
 from system_setup.platform.macos import MacOSPlatform
-from system_setup.tasks.base import BaseTask
+from system_setup.tasks.base import YES_ANSWERS, BaseTask
 
 
 class ShellTask(BaseTask):
@@ -51,7 +51,7 @@ class ShellTask(BaseTask):
 
         if not self.auto_yes:
             response = input(f"Set {zsh_path} as default shell? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
+            if response.strip().lower() not in YES_ANSWERS:
                 self.logger.info("Skipped shell configuration")
                 self.state.mark_complete('shell_configured')
                 return True
@@ -63,15 +63,13 @@ class ShellTask(BaseTask):
 
         # Add zsh to /etc/shells if needed
         try:
+            # Whole-line match: a substring test would accept e.g. /bin/zsh-5.9
             with open('/etc/shells', 'r') as f:
-                shells = f.read()
+                registered = any(line.strip() == zsh_path for line in f)
 
-            if zsh_path not in shells:
+            if not registered:
                 self.logger.info(f"Adding {zsh_path} to /etc/shells...")
-                self.cmd.run(
-                    f'echo "{zsh_path}" | sudo tee -a /etc/shells',
-                    shell=True,
-                )
+                self.cmd.run_sudo(['tee', '-a', '/etc/shells'], input=f"{zsh_path}\n")
         except Exception as e:
             self.logger.warning(f"Could not modify /etc/shells: {e}")
 
@@ -89,21 +87,20 @@ class ShellTask(BaseTask):
         """Configure shell on Linux."""
         # Check if fish is enabled and should be default
         if self.config.fish_enabled and self.config.fish_set_default:
-            shell_path = "/usr/bin/fish"
             shell_name = "fish"
         else:
-            shell_path = "/usr/bin/zsh"
             shell_name = "zsh"
 
-        # Verify shell exists
-        if not Path(shell_path).exists():
-            self.logger.warning(f"{shell_name} not found at {shell_path}, skipping shell config")
+        # Locate the shell on PATH rather than assuming /usr/bin
+        shell_path = shutil.which(shell_name)
+        if shell_path is None:
+            self.logger.warning(f"{shell_name} not found on PATH, skipping shell config")
             self.state.mark_complete('shell_configured')
             return True
 
         if not self.auto_yes:
             response = input(f"Set {shell_path} as default shell? (y/N): ")
-            if response.lower() not in ('y', 'yes'):
+            if response.strip().lower() not in YES_ANSWERS:
                 self.logger.info("Skipped shell configuration")
                 self.state.mark_complete('shell_configured')
                 return True
@@ -1,6 +1,6 @@
 """Utility modules."""
 
-from system_setup.utils.checksum import verify_sha256
+from system_setup.utils.checksum import normalize_hash, verify_sha256
 from system_setup.utils.command import CommandResult, CommandRunner, run_command
 from system_setup.utils.download import download_file, download_from_gdrive
 
@@ -9,6 +9,7 @@ __all__ = [
     "CommandRunner",
     "download_file",
     "download_from_gdrive",
+    "normalize_hash",
     "run_command",
     "verify_sha256",
 ]
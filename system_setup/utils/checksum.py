@@ -1,42 +1,84 @@
 """Checksum verification utilities."""
 
 import hashlib
+import hmac
 from pathlib import Path
+from typing import BinaryIO, Union
 
 
-def calculate_sha256(file_path: Path, chunk_size: int = 8192) -> str:
+def _sha256_of(file_path: Path, chunk_size: int = 1 << 20) -> "hashlib._Hash":
     """
-    Calculate SHA256 checksum of a file.
+    Hash a file with SHA256.
+
+    Uses hashlib.file_digest() on Python 3.11+, which runs the read loop
+    in C; older versions read into one reused buffer.
 
     Args:
         file_path: Path to file
-        chunk_size: Read chunk size in bytes
+        chunk_size: Read chunk size in bytes (pre-3.11 fallback only)
 
     Returns:
-        Hex string of SHA256 hash
+        SHA256 hash object
     """
-    sha256 = hashlib.sha256()
+    with file_path.open('rb', buffering=0) as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256')
 
-    with file_path.open('rb') as f:
+        sha256 = hashlib.sha256()
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
         while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
+            size = f.readinto(buffer)
+            if not size:
                 break
-            sha256.update(chunk)
+            sha256.update(view[:size])
 
-    return sha256.hexdigest()
+    return sha256
 
 
-def verify_sha256(file_path: Path, expected_hash: str) -> bool:
+def calculate_sha256(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Calculate SHA256 checksum of a file.
+
+    Args:
+        file_path: Path to file
+        chunk_size: Read chunk size in bytes (pre-3.11 fallback only)
+
+    Returns:
+        Hex string of SHA256 hash
+    """
+    return _sha256_of(file_path, chunk_size).hexdigest()
+
+
+def normalize_hash(hex_hash: str) -> bytes:
+    """
+    Convert a hex SHA256 string to raw digest bytes.
+
+    Args:
+        hex_hash: Hex string in any case, surrounding whitespace allowed
+
+    Returns:
+        Digest bytes
+
+    Raises:
+        ValueError: If hex_hash is not valid hex
+    """
+    return bytes.fromhex(hex_hash.strip())
+
+
+def verify_sha256(file_path: Path, expected_hash: Union[str, bytes]) -> bool:
     """
     Verify SHA256 checksum of a file.
 
+    The raw digests are compared in constant time.
+
     Args:
         file_path: Path to file
-        expected_hash: Expected SHA256 hash (hex string)
+        expected_hash: Expected SHA256 hash, as a hex string or as digest
+            bytes from normalize_hash()
 
     Returns:
-        True if checksum matches
+        True if checksum matches (False if expected_hash is not valid hex)
 
     Raises:
         FileNotFoundError: If file doesn't exist
@@ -44,5 +86,49 @@ def verify_sha256(file_path: Path, expected_hash: str) -> bool:
     if not file_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    actual_hash = calculate_sha256(file_path)
-    return actual_hash.lower() == expected_hash.lower()
+    if isinstance(expected_hash, str):
+        try:
+            expected_hash = normalize_hash(expected_hash)
+        except ValueError:
+            return False
+
+    return hmac.compare_digest(_sha256_of(file_path).digest(), expected_hash)
+
+
+class HashingReader:
+    """
+    Read-only file wrapper that hashes bytes as they are read.
+
+    Lets a consumer such as tarfile parse a file while its checksum is
+    computed in the same pass.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        """
+        Initialize reader.
+
+        Args:
+            fileobj: Binary file object to read from
+        """
+        self._fileobj = fileobj
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the wrapped file and add the bytes to the hash."""
+        data = self._fileobj.read(size)
+        self._sha256.update(data)
+        return data
+
+    def hexdigest(self, chunk_size: int = 1 << 20) -> str:
+        """
+        Hash whatever the consumer left unread and return the SHA256 digest.
+
+        Args:
+            chunk_size: Read chunk size in bytes
+
+        Returns:
+            Hex string of SHA256 hash of the whole file
+        """
+        while self.read(chunk_size):
+            pass
+        return self._sha256.hexdigest()
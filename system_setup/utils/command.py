@@ -1,7 +1,10 @@
 """Centralized command runner for subprocess execution."""
 
+import random
 import shlex
+import shutil
 import subprocess
+import threading
 import time
 from dataclasses import dataclass
 from typing import List, Optional, Union
@@ -18,6 +21,7 @@ class CommandResult:
     stderr: str
     duration: float
     dry_run: bool = False
+    truncated: bool = False
 
     @property
     def success(self) -> bool:
@@ -47,6 +51,9 @@ class CommandRunner:
         timeout: int = 300,
         retries: int = 0,
         retry_delay: float = 1.0,
+        max_delay: float = 60.0,
+        jitter: bool = True,
+        rng: Optional[random.Random] = None,
     ) -> None:
         """
         Initialize command runner.
@@ -55,12 +62,18 @@ class CommandRunner:
             dry_run: If True, don't actually execute commands
             timeout: Default timeout in seconds
             retries: Number of retries on failure (0 = no retries)
-            retry_delay: Initial delay between retries (doubles each retry)
+            retry_delay: Initial delay between retries
+            max_delay: Upper bound on any single delay between retries
+            jitter: Randomize delays (decorrelated jitter) instead of doubling
+            rng: Random source for jitter (pass a seeded one for reproducibility)
         """
         self.dry_run = dry_run
         self.timeout = timeout
         self.retries = retries
         self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._rng = rng or random.Random()
         self._logger = None
 
     @property
@@ -84,6 +97,8 @@ class CommandRunner:
         cwd: Optional[str] = None,
         env: Optional[dict] = None,
         shell: bool = False,
+        input: Optional[str] = None,
+        discard_stdout: bool = False,
     ) -> CommandResult:
         """
         Run a command with logging and error handling.
@@ -97,6 +112,8 @@ class CommandRunner:
             cwd: Working directory
             env: Environment variables
             shell: Use shell execution (avoid if possible)
+            input: Text to send to the command's stdin
+            discard_stdout: Send stdout to /dev/null, capturing only stderr
 
         Returns:
             CommandResult with output and status
@@ -116,6 +133,11 @@ class CommandRunner:
         timeout = timeout or self.timeout
         retries = retries if retries is not None else self.retries
 
+        if capture_output and discard_stdout:
+            streams = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.PIPE}
+        else:
+            streams = {'capture_output': capture_output}
+
         # Dry run mode
         if self.dry_run:
             if self.logger:
@@ -137,20 +159,21 @@ class CommandRunner:
 
         for attempt in range(retries + 1):
             try:
-                start_time = time.time()
+                start_time = time.perf_counter()
 
                 result = subprocess.run(
                     cmd_list,
-                    capture_output=capture_output,
                     text=True,
                     timeout=timeout,
                     cwd=cwd,
                     env=env,
                     shell=shell,
+                    input=input,
                     check=False,  # We handle check ourselves
+                    **streams,
                 )
 
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
 
                 cmd_result = CommandResult(
                     command=cmd_list,
@@ -184,20 +207,23 @@ class CommandRunner:
 
             except subprocess.TimeoutExpired:
                 last_error = subprocess.TimeoutExpired(cmd_list, timeout)
+                reason = f"timed out after {timeout}s"
+            except subprocess.CalledProcessError as e:
+                last_error = e
+                reason = "failed"
+
+            # Back off before the next attempt; timeouts are as likely to be
+            # transient (a stalled mirror) as failures are
+            if attempt < retries:
                 if self.logger:
                     self.logger.warning(
-                        f"Command timed out after {timeout}s: {cmd_str}"
+                        f"Command {reason} (attempt {attempt + 1}/{retries + 1}), "
+                        f"retrying in {delay:.1f}s: {cmd_str}"
                     )
-            except subprocess.CalledProcessError as e:
-                last_error = e
-                if attempt < retries:
-                    if self.logger:
-                        self.logger.warning(
-                            f"Command failed (attempt {attempt + 1}/{retries + 1}), "
-                            f"retrying in {delay}s: {cmd_str}"
-                        )
-                    time.sleep(delay)
-                    delay *= 2  # Exponential backoff
+                time.sleep(delay)
+                delay = self._next_delay(delay)
+            elif self.logger and isinstance(last_error, subprocess.TimeoutExpired):
+                self.logger.warning(f"Command {reason}: {cmd_str}")
 
         # All retries exhausted
         if last_error:
@@ -212,6 +238,20 @@ class CommandRunner:
             duration=0.0,
         )
 
+    def _next_delay(self, delay: float) -> float:
+        """
+        Compute the delay before the next retry.
+
+        With jitter this is decorrelated jitter: a random delay between the
+        initial delay and three times the previous one, so parallel runners
+        don't retry in lockstep. Either way it never exceeds max_delay.
+        """
+        if self.jitter:
+            delay = self._rng.uniform(self.retry_delay, delay * 3)
+        else:
+            delay *= 2
+        return min(self.max_delay, delay)
+
     def run_quiet(
         self,
         command: Union[str, List[str]],
@@ -225,6 +265,95 @@ class CommandRunner:
         kwargs.setdefault('check', False)
         return self.run(command, **kwargs)
 
+    def run_head(
+        self,
+        command: List[str],
+        limit: int,
+        cwd: Optional[str] = None,
+        timeout: Optional[int] = None,
+        read_only: bool = False,
+    ) -> CommandResult:
+        """
+        Run a command but read at most limit characters of its stdout.
+
+        The process is terminated as soon as the limit is reached, so large
+        outputs are never produced or buffered in full. Useful for previews.
+        A command stopped this way has truncated=True on its result and the
+        exit status of the terminated process, since it never finished.
+
+        Args:
+            command: Command to run as list
+            limit: Maximum number of characters to read from stdout
+            cwd: Working directory
+            timeout: Timeout in seconds (None = use default)
+            read_only: Run even in dry-run mode; only for commands that
+                change nothing, such as previews
+
+        Returns:
+            CommandResult with (possibly truncated) stdout; stderr is discarded
+
+        Raises:
+            subprocess.TimeoutExpired: If the command times out
+        """
+        if self.dry_run and not read_only:
+            return self.run(command, check=False)
+
+        cmd_str = ' '.join(command)
+        timeout = timeout or self.timeout
+        start_time = time.perf_counter()
+
+        proc = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            cwd=cwd,
+        )
+        expired = threading.Event()
+
+        def expire() -> None:
+            expired.set()
+            proc.kill()
+
+        # The read below blocks, so the timeout is enforced from a timer
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+        try:
+            stdout = proc.stdout.read(limit)
+            truncated = False
+            if len(stdout) == limit and not expired.is_set():
+                if proc.poll() is None:
+                    proc.terminate()
+                    truncated = True
+                else:
+                    # Already exited: truncated only if output is left over
+                    truncated = bool(proc.stdout.read(1))
+        finally:
+            proc.stdout.close()
+            proc.wait()
+            timer.cancel()
+
+        if expired.is_set():
+            if self.logger:
+                self.logger.warning(f"Command timed out after {timeout}s: {cmd_str}")
+            raise subprocess.TimeoutExpired(command, timeout, output=stdout)
+
+        duration = time.perf_counter() - start_time
+        if self.logger:
+            self.logger.debug(
+                f"Command read ({len(stdout)} chars{', truncated' if truncated else ''}): "
+                f"{cmd_str} ({duration:.2f}s)"
+            )
+
+        return CommandResult(
+            command=command,
+            return_code=proc.returncode,
+            stdout=stdout,
+            stderr="",
+            duration=duration,
+            truncated=truncated,
+        )
+
     def run_sudo(
         self,
         command: Union[str, List[str]],
@@ -243,7 +372,7 @@ class CommandRunner:
         if isinstance(command, str):
             sudo_cmd = f"sudo {command}"
         else:
-            sudo_cmd = ['sudo'] + list(command)
+            sudo_cmd = ['sudo', *command]
 
         return self.run(sudo_cmd, **kwargs)
 
@@ -257,13 +386,7 @@ class CommandRunner:
         Returns:
             Full path to program or None if not found
         """
-        try:
-            result = self.run(['which', program], check=False, capture_output=True)
-            if result.success:
-                return result.stdout.strip()
-        except Exception:
-            pass
-        return None
+        return shutil.which(program)
 
     def is_available(self, program: str) -> bool:
         """Check if a program is available in PATH."""
@@ -1,16 +1,65 @@
 """Download utilities."""
 
+import importlib.util
+import shutil
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Get the shared HTTP session.
+
+    Reusing one session keeps connections (and their TLS handshakes) alive
+    across downloads. Transient gateway errors are retried with backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504)),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _resume_validator(response: requests.Response) -> Optional[str]:
+    """
+    Pick the header value that identifies this version of the file.
+
+    Returns:
+        A strong ETag or else Last-Modified, for use as If-Range; None if
+        the server sent neither (weak ETags are not allowed in If-Range)
+    """
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
 
 
 def download_file(url: str, destination: Path, timeout: int = 300) -> bool:
     """
     Download a file from URL.
 
+    The body is written to a ``.part`` file next to the destination, copied
+    in 1 MiB blocks straight from the underlying stream, and renamed into
+    place once complete. If a previous attempt left a ``.part`` file behind,
+    the download resumes from where it stopped with a Range request. The
+    request carries the ETag or Last-Modified seen when the ``.part`` was
+    started as If-Range, so a file that changed on the server is downloaded
+    again in full instead of being appended to the old prefix.
+
     Args:
         url: URL to download from
         destination: Destination file path
@@ -22,26 +71,63 @@ def download_file(url: str, destination: Path, timeout: int = 300) -> bool:
     Raises:
         requests.RequestException: If download fails
     """
+    part = destination.with_name(destination.name + '.part')
+    validator_file = destination.with_name(destination.name + '.part.validator')
     try:
         # Ensure parent directory exists
         destination.parent.mkdir(parents=True, exist_ok=True)
 
-        # Stream download to handle large files
-        response = requests.get(url, stream=True, timeout=timeout)
-        response.raise_for_status()
-
-        # Write to file
-        with destination.open('wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
+        # Byte ranges only line up with the file if nothing re-encodes it
+        headers = {'Accept-Encoding': 'identity'}
+        offset = part.stat().st_size if part.exists() else 0
+        validator = validator_file.read_text() if validator_file.exists() else None
+        if offset and validator:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator
+        else:
+            # Without a validator there is no telling whether the server
+            # still has the same file, so the partial copy can't be trusted
+            offset = 0
 
+        # Stream download to handle large files
+        with get_session().get(url, stream=True, timeout=timeout, headers=headers) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+
+            if response.status_code == 206:
+                content_range = response.headers.get('Content-Range', '')
+                if not offset or not content_range.startswith(f'bytes {offset}-'):
+                    raise requests.HTTPError(
+                        f"Unexpected Content-Range {content_range!r} resuming at {offset}",
+                        response=response,
+                    )
+                mode = 'ab'
+            else:
+                # Full body: the server ignored Range or the file changed
+                mode = 'wb'
+                validator = _resume_validator(response)
+                if validator:
+                    validator_file.write_text(validator)
+                elif validator_file.exists():
+                    validator_file.unlink()
+
+            with part.open(mode) as f:
+                shutil.copyfileobj(response.raw, f, length=DOWNLOAD_BUFFER_SIZE)
+
+        part.replace(destination)
+        if validator_file.exists():
+            validator_file.unlink()
         return True
-    except requests.RequestException as e:
-        # Clean up partial download
-        if destination.exists():
-            destination.unlink()
+    except requests.HTTPError:
+        # The server refused (e.g. an unsatisfiable range): start over next time
+        for path in (part, validator_file):
+            if path.exists():
+                path.unlink()
         raise
+    except urllib3.exceptions.HTTPError as e:
+        # Errors while reading the raw stream come from urllib3; the partial
+        # .part file is kept so the next attempt can resume
+        raise requests.ConnectionError(e) from e
 
 
 def download_from_gdrive(file_id: str, destination: Path) -> bool:
@@ -58,6 +144,25 @@ def download_from_gdrive(file_id: str, destination: Path) -> bool:
     Raises:
         RuntimeError: If gdown is not available or download fails
     """
+    try:
+        import gdown
+    except ImportError:
+        gdown = None
+
+    if gdown is not None:
+        # Use the library in-process rather than starting another interpreter
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        url = f"https://drive.google.com/uc?id={file_id}"
+        try:
+            if gdown.download(url, str(destination), quiet=True) is None:
+                raise RuntimeError("no file was downloaded")
+        except Exception as e:
+            # Clean up partial download
+            if destination.exists():
+                destination.unlink()
+            raise RuntimeError(f"gdown failed: {e}") from e
+        return destination.exists()
+
     try:
         # Check if gdown is available
         result = subprocess.run(
@@ -92,7 +197,9 @@ def install_gdown() -> bool:
     Returns:
         True if installation successful or gdown already installed
     """
-    # Check if already installed
+    # Check if already installed, as a library or a command
+    if importlib.util.find_spec('gdown') is not None:
+        return True
     result = subprocess.run(
         ['gdown', '--version'],
         capture_output=True,
@@ -16,22 +16,45 @@ def setup_test_logger():
 def mock_config():
     """Create a mock Config object."""
     from unittest.mock import MagicMock
-    return MagicMock()
+
+    from system_setup.config import Config
+    return MagicMock(spec=Config)
 
 
 @pytest.fixture
 def mock_state():
     """Create a mock StateManager object."""
     from unittest.mock import MagicMock
-    return MagicMock()
+
+    from system_setup.state import StateManager
+    return MagicMock(spec=StateManager)
 
 
 @pytest.fixture
 def mock_platform():
     """Create a mock Platform object."""
     from unittest.mock import MagicMock
-    platform = MagicMock()
+
+    from system_setup.platform.base import Platform
+    platform = MagicMock(spec=Platform)
     platform.is_macos = True
     platform.is_linux = False
     platform.is_windows = False
     return platform
+
+
+@pytest.fixture(scope="session")
+def hello_world_file(tmp_path_factory):
+    """Create a read-only sample file containing "Hello, World!" once per session."""
+    path = tmp_path_factory.mktemp("sha") / "test.txt"
+    path.write_text("Hello, World!")
+    return path
+
+
+@pytest.fixture(scope="session")
+def default_config():
+    """Create a Config with only the built-in defaults, shared across the session."""
+    from pathlib import Path
+
+    from system_setup.config import Config
+    return Config(config_path=Path("/nonexistent"))
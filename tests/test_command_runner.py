@@ -126,6 +126,92 @@ class TestCommandRunner:
         assert mock_run.call_count == 2
         assert result.success is True
 
+    @patch('time.sleep')
+    @patch('subprocess.run')
+    def test_retry_delays_jittered_and_capped(self, mock_run, mock_sleep):
+        """Test retry delays stay between retry_delay and max_delay."""
+        import random
+
+        mock_run.return_value = MagicMock(returncode=1, stdout='', stderr='error')
+
+        runner = CommandRunner(
+            retries=6, retry_delay=1.0, max_delay=5.0, rng=random.Random(0)
+        )
+        with pytest.raises(subprocess.CalledProcessError):
+            runner.run(['test'])
+
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(delays) == 6
+        assert all(1.0 <= d <= 5.0 for d in delays)
+        assert max(delays) == 5.0
+
+    def test_run_head_stops_at_limit(self):
+        """Test run_head() reads only the requested prefix of stdout."""
+        import sys
+
+        runner = CommandRunner()
+        result = runner.run_head(
+            [sys.executable, '-c', 'import sys; sys.stdout.write("x" * 1000000)'],
+            limit=10,
+        )
+
+        assert result.truncated is True
+        assert result.stdout == 'x' * 10
+
+    def test_run_head_times_out(self):
+        """Test run_head() kills a command that produces no output in time."""
+        import sys
+
+        runner = CommandRunner(timeout=1)
+        with pytest.raises(subprocess.TimeoutExpired):
+            runner.run_head([sys.executable, '-c', 'import time; time.sleep(30)'], limit=10)
+
+    def test_run_head_reports_failure_exit_code(self):
+        """Test run_head() keeps a non-zero exit code of a command that finished."""
+        import sys
+
+        runner = CommandRunner()
+        result = runner.run_head(
+            [sys.executable, '-c', 'import sys; print("out"); sys.exit(3)'], limit=100,
+        )
+
+        assert result.return_code == 3
+        assert result.truncated is False
+        assert result.stdout == 'out\n'
+
+    def test_run_head_read_only_runs_in_dry_run(self):
+        """Test read_only previews still run when the runner is in dry-run mode."""
+        runner = CommandRunner(dry_run=True)
+
+        assert runner.run_head(['echo', 'hello'], limit=100).stdout == ''
+        assert runner.run_head(['echo', 'hello'], limit=100, read_only=True).stdout == 'hello\n'
+
+    def test_run_head_short_output(self):
+        """Test run_head() returns full output and exit code when under the limit."""
+        runner = CommandRunner()
+        result = runner.run_head(['echo', 'hello'], limit=100)
+
+        assert result.success is True
+        assert result.truncated is False
+        assert result.stdout == 'hello\n'
+
+    def test_run_with_input(self):
+        """Test run() passes input to the command's stdin."""
+        runner = CommandRunner()
+        result = runner.run(['cat'], input='hello\n')
+
+        assert result.success is True
+        assert result.stdout == 'hello\n'
+
+    def test_run_discard_stdout_keeps_stderr(self):
+        """Test discard_stdout drops stdout but still captures stderr."""
+        runner = CommandRunner()
+        result = runner.run(['sh', '-c', 'echo out; echo err >&2'], discard_stdout=True)
+
+        assert result.success is True
+        assert result.stdout == ''
+        assert result.stderr == 'err\n'
+
     def test_which_existing_command(self):
         """Test which() finds existing commands."""
         runner = CommandRunner()
@@ -141,6 +227,13 @@ class TestCommandRunner:
 
         assert path is None
 
+    def test_which_does_not_spawn_process(self):
+        """Test which() resolves PATH in-process, even in dry-run mode."""
+        runner = CommandRunner(dry_run=True)
+        with patch('subprocess.run') as mock_run:
+            assert runner.which('definitely_not_a_real_command_12345') is None
+        mock_run.assert_not_called()
+
     def test_is_available_true(self):
         """Test is_available() for existing commands."""
         runner = CommandRunner()
@@ -175,6 +268,21 @@ class TestCommandRunner:
         with pytest.raises(subprocess.TimeoutExpired):
             runner.run(['sleep', '10'])
 
+    @patch('time.sleep')
+    @patch('subprocess.run')
+    def test_timeout_retried_with_backoff(self, mock_run, mock_sleep):
+        """Test timeouts are retried after a backoff delay."""
+        mock_run.side_effect = [
+            subprocess.TimeoutExpired(['test'], 1),
+            MagicMock(returncode=0, stdout='ok', stderr=''),
+        ]
+
+        runner = CommandRunner(timeout=1, retries=1, retry_delay=0.5)
+        result = runner.run(['test'])
+
+        assert result.success is True
+        mock_sleep.assert_called_once_with(0.5)
+
 
 class TestRunCommandFunction:
     """Tests for the convenience run_command function."""
@@ -122,3 +122,17 @@ class TestConfigDeepMerge:
         result = deep_merge(base, override)
 
         assert result == {'packages': ['c', 'd']}
+
+    def test_deep_merge_deeply_nested_copies(self):
+        """Test deep merge reaches every level without sharing inputs."""
+        from system_setup.config import deep_merge
+
+        base = {'a': {'b': {'c': {'keep': 1, 'list': [1]}}}}
+        override = {'a': {'b': {'c': {'new': [2]}}}}
+        result = deep_merge(base, override)
+
+        assert result == {'a': {'b': {'c': {'keep': 1, 'list': [1], 'new': [2]}}}}
+        result['a']['b']['c']['list'].append(9)
+        result['a']['b']['c']['new'].append(9)
+        assert base == {'a': {'b': {'c': {'keep': 1, 'list': [1]}}}}
+        assert override == {'a': {'b': {'c': {'new': [2]}}}}
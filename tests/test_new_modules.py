@@ -27,6 +27,26 @@ class TestParuManager:
         mock_which.return_value = None
         assert manager.is_available() is False
 
+    def test_paru_installed_set_cached_until_install(self):
+        """Test installed packages are listed once and re-queried after installs."""
+        import subprocess
+        from system_setup.packages.paru import ParuManager
+
+        manager = ParuManager()
+        listing = subprocess.CompletedProcess([], 0, stdout="git\nhyprland\n")
+        with patch.object(manager, '_run_command', return_value=listing) as mock_run:
+            assert manager.installed_set() == frozenset({'git', 'hyprland'})
+            assert manager.installed_set() == frozenset({'git', 'hyprland'})
+            assert mock_run.call_count == 1
+
+            manager.install(['walker'])
+            manager.installed_set()
+            assert mock_run.call_count == 3
+
+            manager.install_aur(['walker-bin'])
+            manager.installed_set()
+            assert mock_run.call_count == 5
+
     @patch('shutil.which')
     def test_paru_can_install(self, mock_which):
         """Test paru installation prerequisites."""
@@ -41,6 +61,25 @@ class TestParuManager:
         assert ParuManager.can_install() is False
 
 
+class TestHomebrewManager:
+    """Tests for HomebrewManager."""
+
+    def test_install_skips_auto_update_only_after_update(self):
+        """Test brew's implicit update is kept until update() has run."""
+        import subprocess
+        from system_setup.packages.homebrew import HomebrewManager
+
+        manager = HomebrewManager()
+        done = subprocess.CompletedProcess([], 0)
+        with patch.object(manager, '_run_command', return_value=done) as mock_run:
+            manager.install(['jq'])
+            assert 'HOMEBREW_NO_AUTO_UPDATE' not in mock_run.call_args[1]['env']
+
+            manager.update()
+            manager.install(['jq'])
+            assert mock_run.call_args[1]['env']['HOMEBREW_NO_AUTO_UPDATE'] == '1'
+
+
 class TestChezmoiTask:
     """Tests for ChezmoiTask."""
 
@@ -87,6 +126,139 @@ class TestChezmoiTask:
         # BaseTask.skip_if_complete() calls state.is_complete with state_key
         mock_state.is_complete.assert_called_with(task.state_key)
 
+    @staticmethod
+    def _release_session(payload, checksum=None):
+        """Mock a session serving a release tarball holding payload as chezmoi."""
+        import hashlib
+        import io
+        import tarfile
+
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+            info = tarfile.TarInfo('chezmoi')
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+        tarball = buf.getvalue()
+        if checksum is None:
+            checksum = hashlib.sha256(tarball).hexdigest()
+
+        api_response = MagicMock()
+        api_response.json.return_value = {'tag_name': 'v2.50.0'}
+        checksums_response = MagicMock()
+        checksums_response.text = (
+            f"{'0' * 64}  chezmoi_2.50.0_darwin_arm64.tar.gz\n"
+            f"{checksum}  chezmoi_2.50.0_linux_amd64.tar.gz\n"
+        )
+        download_response = MagicMock()
+        download_response.raw = io.BytesIO(tarball)
+        download_response.__enter__.return_value = download_response
+
+        session = MagicMock()
+        session.get.side_effect = [api_response, checksums_response, download_response]
+        return session
+
+    @staticmethod
+    def _linux_task():
+        """Create a ChezmoiTask for linux/amd64."""
+        from system_setup.platform.base import Architecture
+        from system_setup.tasks.chezmoi import ChezmoiTask
+
+        mock_platform = MagicMock()
+        mock_platform.is_macos = False
+        mock_platform.is_linux = True
+        mock_platform.architecture = Architecture.X86_64
+
+        return ChezmoiTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=mock_platform,
+        )
+
+    def test_chezmoi_install_from_release(self, tmp_path):
+        """Test chezmoi binary is extracted from the verified release tarball."""
+        payload = b"#!/bin/sh\necho chezmoi\n"
+        session = self._release_session(payload)
+        task = self._linux_task()
+
+        dest = tmp_path / 'chezmoi'
+        with patch('system_setup.tasks.chezmoi.get_session', return_value=session):
+            task._install_from_release(dest)
+
+        assert dest.read_bytes() == payload
+        assert dest.stat().st_mode & 0o111
+        assert session.get.call_args_list[1][0][0].endswith(
+            'v2.50.0/chezmoi_2.50.0_checksums.txt'
+        )
+        assert session.get.call_args_list[2][0][0].endswith(
+            'v2.50.0/chezmoi_2.50.0_linux_amd64.tar.gz'
+        )
+        assert list(tmp_path.iterdir()) == [dest]
+
+    def test_chezmoi_release_checksum_mismatch_installs_nothing(self, tmp_path):
+        """Test a tarball that doesn't match checksums.txt leaves no binary behind."""
+        session = self._release_session(b"tampered", checksum='f' * 64)
+        task = self._linux_task()
+
+        dest = tmp_path / 'chezmoi'
+        with patch('system_setup.tasks.chezmoi.get_session', return_value=session):
+            with pytest.raises(RuntimeError, match="Checksum mismatch"):
+                task._install_from_release(dest)
+
+        assert list(tmp_path.iterdir()) == []
+
+    @patch('system_setup.tasks.chezmoi.shutil.which', return_value=None)
+    def test_chezmoi_resolve_from_install_location(self, mock_which, tmp_path):
+        """Test chezmoi is located in ~/.local/bin and the result is cached."""
+        from system_setup.tasks.chezmoi import ChezmoiTask, _stat_cached
+
+        binary = tmp_path / '.local' / 'bin' / 'chezmoi'
+        binary.parent.mkdir(parents=True)
+        binary.write_text('')
+        _stat_cached.cache_clear()
+
+        with patch('pathlib.Path.home', return_value=tmp_path):
+            task = ChezmoiTask(
+                config=MagicMock(),
+                state=MagicMock(),
+                platform=MagicMock(),
+            )
+
+        assert task._resolve_chezmoi_cmd() == str(binary)
+        binary.unlink()
+        # Resolved path is remembered on the instance
+        assert task._get_chezmoi_cmd() == str(binary)
+
+        _stat_cached.cache_clear()
+
+    def test_chezmoi_queries_are_cached_until_mutation(self):
+        """Test read-only chezmoi queries reuse output until state changes."""
+        from system_setup.tasks.chezmoi import ChezmoiTask
+        from system_setup.utils.command import CommandResult
+
+        task = ChezmoiTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task._chezmoi_bin = 'chezmoi'
+        task._cmd = MagicMock()
+        task._cmd.run_quiet.return_value = CommandResult(
+            command=['chezmoi', 'status'],
+            return_code=0,
+            stdout=' M .bashrc\n',
+            stderr='',
+            duration=0.0,
+        )
+        task._cmd.run.return_value = task._cmd.run_quiet.return_value
+
+        assert task.get_status() == {'.bashrc': 'M'}
+        assert task.get_status() == {'.bashrc': 'M'}
+        assert task._cmd.run_quiet.call_count == 1
+
+        task.add_file(Path('.bashrc'))
+        task.get_status()
+        assert task._cmd.run_quiet.call_count == 2
+
 
 class TestFishTask:
     """Tests for FishTask."""
@@ -128,6 +300,173 @@ class TestFishTask:
         assert "mise" in config
         assert "zoxide" in config
 
+    def test_fish_run_skips_when_fully_configured(self, tmp_path):
+        """Test run() recovers from a lost state file without running fish."""
+        from system_setup.state import StateManager
+        from system_setup.tasks.fish import _ABBR_SCRIPT, ABBR_MARKER, FISHER_PLUGINS, FishTask
+
+        # Fresh state file: nothing recorded, only the files on disk remain
+        state = StateManager(tmp_path / "state.json")
+        config_dir = tmp_path / "fish"
+        task = FishTask(
+            config=MagicMock(),
+            state=state,
+            platform=MagicMock(),
+        )
+        task.config_dir = config_dir
+        (config_dir / "functions").mkdir(parents=True)
+        (config_dir / "functions" / "fisher.fish").touch()
+        (config_dir / "fish_plugins").write_text("\n".join(FISHER_PLUGINS) + "\n")
+        (config_dir / "config.fish").touch()
+        (config_dir / ABBR_MARKER).write_text(_ABBR_SCRIPT)
+        task._cmd = MagicMock()
+
+        with patch.dict('os.environ', {'SHELL': '/usr/bin/fish'}):
+            assert task.run() is True
+
+        assert state.is_complete('fish_configured')
+        task._cmd.run.assert_not_called()
+        task._cmd.run_quiet.assert_not_called()
+
+    def test_fish_not_fully_configured_with_missing_plugin(self, tmp_path):
+        """Test a partly finished run is not treated as fully configured."""
+        from system_setup.tasks.fish import _ABBR_SCRIPT, ABBR_MARKER, FISHER_PLUGINS, FishTask
+
+        task = FishTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task.config_dir = tmp_path
+        (tmp_path / "functions").mkdir()
+        (tmp_path / "functions" / "fisher.fish").touch()
+        (tmp_path / "fish_plugins").write_text("\n".join(FISHER_PLUGINS[:-1]) + "\n")
+        (tmp_path / "config.fish").touch()
+        (tmp_path / ABBR_MARKER).write_text(_ABBR_SCRIPT)
+
+        with patch.dict('os.environ', {'SHELL': '/usr/bin/fish'}):
+            assert task._fully_configured() is False
+
+            # All plugins, but the abbreviations were never applied
+            (tmp_path / "fish_plugins").write_text("\n".join(FISHER_PLUGINS) + "\n")
+            (tmp_path / ABBR_MARKER).unlink()
+            assert task._fully_configured() is False
+
+            # Applied by an older run with a different abbreviation list
+            (tmp_path / ABBR_MARKER).write_text("abbr -a g git")
+            assert task._fully_configured() is False
+
+    def test_fish_default_shell_not_prompted_without_tty(self):
+        """Test the default-shell prompt is skipped when stdin is not a terminal."""
+        from system_setup.tasks.fish import FishTask
+
+        task = FishTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task._cmd = MagicMock()
+
+        with patch.dict('os.environ', {'SHELL': '/bin/bash'}), \
+                patch('sys.stdin') as mock_stdin, \
+                patch('builtins.input') as mock_input:
+            mock_stdin.isatty.return_value = False
+            assert task._set_default_shell() is True
+
+        mock_input.assert_not_called()
+        task._cmd.run.assert_not_called()
+
+    def test_fish_etc_shells_state_is_per_path(self):
+        """Test /etc/shells is re-checked when fish moves to a new path."""
+        from unittest.mock import mock_open
+        from system_setup.tasks.fish import FishTask
+
+        mock_state = MagicMock()
+        mock_state.is_complete.side_effect = (
+            lambda key: key == 'fish_in_etc_shells:/usr/bin/fish'
+        )
+        task = FishTask(
+            config=MagicMock(),
+            state=mock_state,
+            platform=MagicMock(is_linux=True),
+            auto_yes=True,
+        )
+        task._cmd = MagicMock()
+        task.__dict__['fish_path'] = '/usr/local/bin/fish'
+
+        with patch.dict('os.environ', {'SHELL': '/bin/bash'}), \
+                patch('builtins.open', mock_open(read_data='/bin/bash\n/usr/bin/fish\n')):
+            assert task._set_default_shell() is True
+
+        task._cmd.run_sudo.assert_called_once_with(
+            ['tee', '-a', '/etc/shells'], input='/usr/local/bin/fish\n', check=False,
+        )
+        mock_state.mark_complete.assert_called_once_with(
+            'fish_in_etc_shells:/usr/local/bin/fish'
+        )
+
+    def test_fish_create_config_leaves_no_temp_file(self, tmp_path):
+        """Test config.fish is written via a temp file that is renamed into place."""
+        from system_setup.tasks.fish import CONFIG_FISH_TEMPLATE, FishTask
+
+        task = FishTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task.config_dir = tmp_path / "fish"
+
+        assert task._create_config() is True
+
+        assert (task.config_dir / "config.fish").read_text() == CONFIG_FISH_TEMPLATE
+        assert list(task.config_dir.iterdir()) == [task.config_dir / "config.fish"]
+
+    def test_fish_abbreviations_batched(self, tmp_path):
+        """Test all abbreviations are set in a single fish process."""
+        from system_setup.tasks.fish import _ABBR_SCRIPT, ABBR_MARKER, FISH_ABBREVIATIONS, FishTask
+
+        task = FishTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task.config_dir = tmp_path
+        task._cmd = MagicMock()
+
+        assert task._setup_abbreviations() is True
+
+        task._cmd.run_quiet.assert_called_once()
+        script = task._cmd.run_quiet.call_args[0][0][2]
+        assert script.count("abbr -a") == len(FISH_ABBREVIATIONS)
+        assert (tmp_path / ABBR_MARKER).read_text() == _ABBR_SCRIPT
+
+    def test_fish_bootstrap_and_plugins_in_one_session(self, tmp_path):
+        """Test Fisher and missing plugins install together, and re-runs skip fish."""
+        from system_setup.tasks.fish import FISHER_PLUGINS, FishTask
+
+        task = FishTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task.config_dir = tmp_path
+        task._cmd = MagicMock()
+
+        assert task._install_fisher_and_plugins() is True
+
+        task._cmd.run.assert_called_once()
+        script = task._cmd.run.call_args[0][0][2]
+        assert script.startswith("curl -sL ")
+        assert script.endswith("fisher install " + " ".join(FISHER_PLUGINS))
+
+        (tmp_path / "functions").mkdir()
+        (tmp_path / "functions" / "fisher.fish").touch()
+        (tmp_path / "fish_plugins").write_text("\n".join(FISHER_PLUGINS) + "\n")
+        task._cmd.reset_mock()
+
+        assert task._install_fisher_and_plugins() is True
+        task._cmd.run.assert_not_called()
+
 
 class TestModernToolsTask:
     """Tests for ModernToolsTask."""
@@ -192,6 +531,129 @@ class TestModernToolsTask:
         # Unknown tool
         assert task.get_tool_info("nonexistent") is None
 
+    def test_modern_tools_scans_path_once(self, tmp_path, monkeypatch):
+        """Test tool lookups share a single cached PATH scan."""
+        import os
+        from system_setup.tasks.modern_tools import ModernToolsTask, _path_executables
+
+        eza = tmp_path / "eza"
+        eza.write_text("#!/bin/sh\n")
+        eza.chmod(0o755)
+        (tmp_path / "bat").write_text("not executable\n")
+        monkeypatch.setenv("PATH", str(tmp_path))
+        _path_executables.cache_clear()
+
+        task = ModernToolsTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+
+        try:
+            with patch("system_setup.tasks.modern_tools.os.scandir",
+                       wraps=os.scandir) as scandir:
+                assert task.list_installed() == ["eza"]
+                assert "bat" in task.list_available()
+            assert scandir.call_count == 1
+        finally:
+            _path_executables.cache_clear()
+
+    def test_modern_tools_path_scan_strips_pathext(self, tmp_path, monkeypatch):
+        """Test Windows executables such as eza.exe are found by their bare name."""
+        import os
+        from system_setup.tasks.modern_tools import _path_executables
+
+        eza = tmp_path / "eza.EXE"
+        eza.write_text("")
+        eza.chmod(0o755)
+        notes = tmp_path / "notes.txt"
+        notes.write_text("")
+        notes.chmod(0o755)
+        monkeypatch.setenv("PATH", str(tmp_path))
+        monkeypatch.setenv("PATHEXT", os.pathsep.join([".COM", ".EXE", ".BAT"]))
+        _path_executables.cache_clear()
+
+        try:
+            assert _path_executables() == frozenset({"eza.EXE", "eza", "notes.txt"})
+        finally:
+            _path_executables.cache_clear()
+
+
+    def test_modern_tools_delta_sets_only_missing_keys(self):
+        """Test delta configuration reads git config once and skips set keys."""
+        from system_setup.tasks.modern_tools import DELTA_GIT_CONFIG, ModernToolsTask
+
+        task = ModernToolsTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task._cmd = MagicMock()
+        listing = "\0".join(f"{k.lower()}\n{v}" for k, v in DELTA_GIT_CONFIG[1:])
+        task._cmd.run_quiet.return_value = MagicMock(success=True, stdout=listing + "\0")
+
+        with patch.object(ModernToolsTask, "_has", return_value=True):
+            assert task._configure_delta() is True
+
+        calls = [c[0][0] for c in task._cmd.run_quiet.call_args_list]
+        assert calls == [
+            ["git", "config", "--global", "--null", "--list"],
+            ["git", "config", "--global", "core.pager", "delta"],
+        ]
+
+    def test_modern_tools_run_fails_if_any_config_step_fails(self):
+        """Test every post-install step runs and any failure fails the task."""
+        from system_setup.tasks.modern_tools import ModernToolsTask
+
+        mock_state = MagicMock()
+        mock_state.is_complete.return_value = False
+        task = ModernToolsTask(
+            config=MagicMock(),
+            state=mock_state,
+            platform=MagicMock(),
+        )
+
+        steps = ["_configure_mise", "_configure_starship", "_configure_delta", "_update_tldr"]
+        with patch.multiple(
+            ModernToolsTask,
+            _install_tools=MagicMock(return_value=True),
+            _configure_mise=MagicMock(return_value=True),
+            _configure_starship=MagicMock(return_value=False),
+            _configure_delta=MagicMock(return_value=True),
+            _update_tldr=MagicMock(return_value=True),
+        ):
+            assert task.run() is False
+            for step in steps:
+                getattr(ModernToolsTask, step).assert_called_once()
+
+        mock_state.mark_complete.assert_not_called()
+
+    @patch("system_setup.tasks.modern_tools.get_package_manager")
+    def test_modern_tools_installs_in_one_transaction(self, mock_get_pm):
+        """Test core and dev tools go through one install and one AUR call."""
+        from system_setup.tasks.modern_tools import (
+            AUR_PACKAGES, DEV_TOOLS, MODERN_CLI_TOOLS, ModernToolsTask,
+        )
+
+        task = ModernToolsTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        pkg_manager = mock_get_pm.return_value
+
+        with patch.object(ModernToolsTask, "_has", return_value=False):
+            assert task._install_tools() is True
+            assert task.pkg_manager is pkg_manager
+
+        mock_get_pm.assert_called_once()
+        pkg_manager.install.assert_called_once()
+        installed = pkg_manager.install.call_args[0][0]
+        assert MODERN_CLI_TOOLS["eza"]["package"] in installed
+        assert DEV_TOOLS["mise"]["package"] in installed
+        assert not set(installed) & set(AUR_PACKAGES)
+        pkg_manager.install_aur.assert_called_once_with(["lazydocker"])
+
 
 class TestHyprlandTask:
     """Tests for HyprlandTask."""
@@ -218,57 +680,217 @@ class TestHyprlandTask:
         assert task.name == 'hyprland'
         assert task.platforms == ['linux']
 
+    def test_hyprland_parallel_steps_record_state(self):
+        """Test parallel steps honour dependencies and record only successes."""
+        from system_setup.tasks.hyprland import HyprlandTask
 
-class TestConfigExtensions:
-    """Tests for new Config properties."""
-
-    def test_config_chezmoi_properties(self):
-        """Test chezmoi-related config properties."""
-        from system_setup.config import Config
-
-        # Empty config should return defaults
-        config = Config(config_path=Path("/nonexistent"))
-
-        assert config.chezmoi == {}
-        assert config.dotfiles_repo is None
-
-    def test_config_hyprland_properties(self):
-        """Test Hyprland-related config properties."""
-        from system_setup.config import Config
+        mock_state = MagicMock()
+        mock_state.is_complete.side_effect = lambda step: step == 'done'
+        task = HyprlandTask(
+            config=MagicMock(),
+            state=mock_state,
+            platform=MagicMock(),
+        )
+        skipped = MagicMock(return_value=True)
+
+        blocked = MagicMock(return_value=True)
+
+        assert task._run_steps_parallel([
+            ('done', skipped, ()),
+            ('ok', lambda: True, ('done',)),
+            ('broken', lambda: False, ()),
+            ('blocked', blocked, ('broken',)),
+        ]) is False
+
+        skipped.assert_not_called()
+        blocked.assert_not_called()
+        mock_state.mark_complete.assert_called_once_with('ok')
+
+    def test_hyprland_static_files_from_package_data(self, tmp_path):
+        """Test hyprlock, hypridle and the keybinds helper come from shipped data files."""
+        from system_setup.tasks.hyprland import DATA_DIR, HyprlandTask
+
+        with patch('pathlib.Path.home', return_value=tmp_path):
+            task = HyprlandTask(
+                config=MagicMock(),
+                state=MagicMock(),
+                platform=MagicMock(),
+            )
+
+        assert task._configure_hyprlock() is True
+        assert task._configure_hypridle() is True
+        assert task._create_keybinds_helper() is True
+
+        hypr_dir = tmp_path / '.config' / 'hypr'
+        assert (hypr_dir / 'hyprlock.conf').read_text() == (DATA_DIR / 'hyprlock.conf').read_text()
+        assert (hypr_dir / 'hypridle.conf').read_text() == (DATA_DIR / 'hypridle.conf').read_text()
+        script = tmp_path / '.local' / 'bin' / 'show-keybinds'
+        assert script.read_text().startswith('#!/bin/bash')
+        assert script.stat().st_mode & 0o777 == 0o755
+
+    def test_hyprland_copy_if_newer_compares_each_file(self, tmp_path):
+        """Test theme files are copied per file mtime, not per directory mtime."""
+        import os
+        import shutil
+        from system_setup.tasks.hyprland import HyprlandTask
 
-        config = Config(config_path=Path("/nonexistent"))
+        src = tmp_path / 'src'
+        dest = tmp_path / 'dest'
+        src.mkdir()
+        dest.mkdir()
+        (src / 'old.css').write_text('default')
+        (src / 'new.css').write_text('updated')
+        (dest / 'old.css').write_text('customised')
+        (dest / 'new.css').write_text('stale')
+        os.utime(src / 'old.css', (1000, 1000))
+        os.utime(dest / 'old.css', (2000, 2000))
+        os.utime(src / 'new.css', (3000, 3000))
+        os.utime(dest / 'new.css', (2000, 2000))
+        # A newer destination directory must not hide the updated file
+        os.utime(dest, (4000, 4000))
+
+        shutil.copytree(
+            src, dest, copy_function=HyprlandTask._copy_if_newer, dirs_exist_ok=True,
+        )
 
-        assert config.hyprland_enabled is True
-        assert config.hyprland_terminal == "ghostty"
-        assert config.hyprland_launcher == "walker"
-        assert config.hyprland_bar == "hyprpanel"
+        assert (dest / 'old.css').read_text() == 'customised'
+        assert (dest / 'new.css').read_text() == 'updated'
 
-    def test_config_fish_properties(self):
-        """Test Fish-related config properties."""
-        from system_setup.config import Config
+    def test_hyprland_run_skips_when_already_configured(self, tmp_path):
+        """Test run() marks complete without prompting when configs are current."""
+        from system_setup.tasks import hyprland
+        from system_setup.tasks.hyprland import AUR_PACKAGES, OFFICIAL_PACKAGES, HyprlandTask
 
-        config = Config(config_path=Path("/nonexistent"))
+        mock_config = MagicMock()
+        mock_config.get.side_effect = lambda key, default=None: default
+        mock_state = MagicMock()
+        mock_state.is_complete.return_value = False
+        with patch('pathlib.Path.home', return_value=tmp_path / 'home'):
+            task = HyprlandTask(
+                config=mock_config,
+                state=mock_state,
+                platform=MagicMock(),
+            )
+        task._logger = MagicMock()
+        walker_defaults = tmp_path / 'xdg' / 'walker'
+        (walker_defaults / 'themes').mkdir(parents=True)
+        (walker_defaults / 'config.toml').write_text('[ui]\n')
+        (walker_defaults / 'themes' / 'default.css').write_text('* {}\n')
+        mock_pm = MagicMock()
+        mock_pm.installed_set.return_value = frozenset(OFFICIAL_PACKAGES + AUR_PACKAGES)
+
+        with patch.object(hyprland, 'WALKER_DEFAULTS_DIR', walker_defaults), \
+                patch.object(hyprland, 'get_package_manager', return_value=mock_pm):
+            assert task._configure_hyprland() is True
+            assert task._configure_hyprlock() is True
+            assert task._configure_hypridle() is True
+            assert task._create_keybinds_helper() is True
+            assert task._configure_launcher() is True
+
+            with patch('shutil.which', return_value='/usr/bin/hyprland'), \
+                    patch('builtins.input') as mock_input:
+                assert task.run() is True
+
+        mock_input.assert_not_called()
+        mock_state.mark_complete.assert_called_once_with('hyprland_setup')
+
+    def test_hyprland_not_configured_without_aur_packages_or_launcher(self, tmp_path):
+        """Test a run that missed AUR packages or Walker files is not treated as done."""
+        import os
+        from system_setup.tasks import hyprland
+        from system_setup.tasks.hyprland import AUR_PACKAGES, OFFICIAL_PACKAGES, HyprlandTask
 
-        assert config.fish_enabled is True
-        assert config.fish_set_default is True
-        # fish_plugins now comes from defaults.yaml which gets loaded
-        assert isinstance(config.fish_plugins, list)
+        mock_config = MagicMock()
+        mock_config.get.side_effect = lambda key, default=None: default
+        with patch('pathlib.Path.home', return_value=tmp_path / 'home'):
+            task = HyprlandTask(
+                config=mock_config,
+                state=MagicMock(),
+                platform=MagicMock(),
+            )
+        task._logger = MagicMock()
+        walker_defaults = tmp_path / 'xdg' / 'walker'
+        (walker_defaults / 'themes').mkdir(parents=True)
+        (walker_defaults / 'config.toml').write_text('[ui]\n')
+        theme = walker_defaults / 'themes' / 'default.css'
+        theme.write_text('* {}\n')
+        mock_pm = MagicMock()
+        mock_pm.installed_set.return_value = frozenset(OFFICIAL_PACKAGES)
+
+        with patch.object(hyprland, 'WALKER_DEFAULTS_DIR', walker_defaults), \
+                patch.object(hyprland, 'get_package_manager', return_value=mock_pm), \
+                patch('shutil.which', return_value='/usr/bin/hyprland'):
+            assert task._configure_hyprland() is True
+            assert task._configure_hyprlock() is True
+            assert task._configure_hypridle() is True
+            assert task._create_keybinds_helper() is True
+            assert task._configure_launcher() is True
+
+            # First run could not get paru, so the AUR packages are missing
+            assert task._already_configured() is False
+
+            mock_pm.installed_set.return_value = frozenset(OFFICIAL_PACKAGES + AUR_PACKAGES)
+            assert task._already_configured() is True
+
+            # An updated default theme still has to be copied
+            os.utime(theme, (os.stat(theme).st_mtime + 60,) * 2)
+            assert task._already_configured() is False
+
+            assert task._configure_launcher() is True
+            (task.config_dir / 'walker' / 'config.toml').unlink()
+            assert task._already_configured() is False
+
+    def test_hyprland_paru_installs_in_one_call(self):
+        """Test paru gets repo and AUR packages in a single install."""
+        from system_setup.tasks import hyprland
+        from system_setup.tasks.hyprland import HyprlandTask
 
-    def test_config_modern_tools_properties(self):
-        """Test modern tools-related config properties."""
-        from system_setup.config import Config
+        task = HyprlandTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        mock_pm = MagicMock()
+        mock_pm.name = 'paru'
+        mock_pm.installed_set.return_value = frozenset({'jq'})
 
-        config = Config(config_path=Path("/nonexistent"))
+        with patch.object(hyprland, 'ensure_paru_installed', return_value=True), \
+                patch.object(hyprland, 'get_package_manager', return_value=mock_pm):
+            assert task._install_packages() is True
 
-        assert config.modern_tools_enabled is True
-        assert config.modern_tools_skip == []
+        mock_pm.install.assert_called_once()
+        packages = mock_pm.install.call_args[0][0]
+        assert 'hyprland' in packages
+        assert 'ags-hyprpanel-git' in packages
+        assert 'jq' not in packages
 
-    def test_config_theme_properties(self):
-        """Test theme-related config properties."""
-        from system_setup.config import Config
 
-        config = Config(config_path=Path("/nonexistent"))
+class TestConfigExtensions:
+    """Tests for new Config properties."""
 
-        assert config.theme_colorscheme == "catppuccin-mocha"
-        assert config.theme_font == "JetBrainsMono Nerd Font"
-        assert config.theme_icons == "Papirus-Dark"
+    @pytest.mark.parametrize("attr,expected", [
+        # Empty config should return defaults
+        ("chezmoi", {}),
+        ("dotfiles_repo", None),
+        ("hyprland_enabled", True),
+        ("hyprland_terminal", "ghostty"),
+        ("hyprland_launcher", "walker"),
+        ("hyprland_bar", "hyprpanel"),
+        ("fish_enabled", True),
+        ("fish_set_default", True),
+        ("modern_tools_enabled", True),
+        ("modern_tools_skip", []),
+        ("theme_colorscheme", "catppuccin-mocha"),
+        ("theme_font", "JetBrainsMono Nerd Font"),
+        ("theme_icons", "Papirus-Dark"),
+    ])
+    def test_config_default_properties(self, default_config, attr, expected):
+        """Test config properties fall back to their defaults."""
+        value = getattr(default_config, attr)
+
+        assert value == expected
+        assert type(value) is type(expected)
+
+    def test_config_fish_plugins(self, default_config):
+        """Test fish plugins come from defaults.yaml."""
+        assert isinstance(default_config.fish_plugins, list)
@@ -1,16 +1,18 @@
 """Tests for state management."""
 
-import tempfile
-from pathlib import Path
-
 import pytest
 
 from system_setup.state import StateManager
 
 
-def test_state_mark_complete(tmp_path):
+@pytest.fixture
+def state_file(tmp_path):
+    """Path for a state file in a fresh per-test directory."""
+    return tmp_path / "test_state"
+
+
+def test_state_mark_complete(state_file):
     """Test marking steps as complete."""
-    state_file = tmp_path / "test_state"
     state = StateManager(state_file)
 
     assert not state.is_complete('test_step')
@@ -19,9 +21,8 @@ def test_state_mark_complete(tmp_path):
     assert state.is_complete('test_step')
 
 
-def test_state_persistence(tmp_path):
+def test_state_persistence(state_file):
     """Test state persistence across instances."""
-    state_file = tmp_path / "test_state"
 
     # First instance
     state1 = StateManager(state_file)
@@ -35,9 +36,8 @@ def test_state_persistence(tmp_path):
     assert not state2.is_complete('step3')
 
 
-def test_state_clear(tmp_path):
+def test_state_clear(state_file):
     """Test clearing state."""
-    state_file = tmp_path / "test_state"
     state = StateManager(state_file)
 
     state.mark_complete('step1')
@@ -46,3 +46,18 @@ def test_state_clear(tmp_path):
     state.clear()
     assert not state.is_complete('step1')
     assert not state_file.exists()
+
+
+def test_state_batched_saves_once(state_file):
+    """Test steps marked in a batch are written together when it exits."""
+    state = StateManager(state_file)
+
+    with state.batched():
+        state.mark_complete('step1')
+        with state.batched():
+            state.mark_complete('step2')
+        assert not state_file.exists()
+
+    reloaded = StateManager(state_file)
+    assert reloaded.is_complete('step1')
+    assert reloaded.is_complete('step2')
@@ -5,6 +5,23 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from system_setup.tasks.base import BaseTask
+
+
+class SimpleTask(BaseTask):
+    """Minimal concrete task for exercising BaseTask behaviour."""
+
+    @property
+    def name(self) -> str:
+        return 'simple'
+
+    @property
+    def description(self) -> str:
+        return 'Simple Task'
+
+    def run(self) -> bool:
+        return True
+
 
 class TestBaseTask:
     """Tests for BaseTask abstract base class."""
@@ -61,20 +78,6 @@ class TestBaseTask:
 
     def test_base_task_skip_if_complete(self):
         """Test skip_if_complete behavior."""
-        from system_setup.tasks.base import BaseTask
-
-        class SimpleTask(BaseTask):
-            @property
-            def name(self) -> str:
-                return 'simple'
-
-            @property
-            def description(self) -> str:
-                return 'Simple Task'
-
-            def run(self) -> bool:
-                return True
-
         mock_state = MagicMock()
         mock_state.is_complete.return_value = True
 
@@ -131,6 +134,59 @@ class TestBaseTask:
         assert task_linux.is_supported() is True
         assert task_macos.is_supported() is False
 
+    def test_base_task_write_if_changed(self, tmp_path):
+        """Test _write_if_changed skips files that already hold the content."""
+        task = SimpleTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        path = tmp_path / 'app.conf'
+
+        assert task._write_if_changed(path, 'a = 1\n') is True
+        assert task._write_if_changed(path, 'a = 1\n') is False
+        assert task._write_if_changed(path, 'a = 2\n') is True
+        assert path.read_text() == 'a = 2\n'
+
+        script = tmp_path / 'helper'
+        assert task._write_if_changed(script, '#!/bin/sh\n', mode=0o755) is True
+        assert script.stat().st_mode & 0o777 == 0o755
+        assert task._write_if_changed(script, '#!/bin/sh\necho\n') is True
+        assert script.stat().st_mode & 0o777 == 0o755
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['app.conf', 'helper']
+
+    def test_base_task_write_if_changed_keeps_symlink(self, tmp_path):
+        """Test a symlinked file is written through, leaving the link in place."""
+        task = SimpleTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        target = tmp_path / 'dotfiles' / 'hyprland.conf'
+        target.parent.mkdir()
+        target.write_text('old\n')
+        link = tmp_path / 'hyprland.conf'
+        link.symlink_to(target)
+
+        assert task._write_if_changed(link, 'new\n') is True
+
+        assert link.is_symlink()
+        assert target.read_text() == 'new\n'
+        assert sorted(p.name for p in target.parent.iterdir()) == ['hyprland.conf']
+
+    def test_base_task_confirm_action_ignores_whitespace(self):
+        """Test confirmations accept padded and mixed-case answers."""
+        task = SimpleTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+
+        with patch('builtins.input', return_value=' Yes \n'):
+            assert task.confirm_action("Proceed?") is True
+        with patch('builtins.input', return_value='n'):
+            assert task.confirm_action("Proceed?") is False
+
 
 class TestTaskRegistry:
     """Tests for TaskRegistry."""
@@ -200,6 +256,64 @@ class TestTaskRegistry:
         assert task.name == 'packages'
         assert task.dry_run is True
 
+    def test_registry_imports_tasks_lazily(self):
+        """Test string task specs are imported and cached on first get()."""
+        from system_setup.tasks.registry import TaskRegistry
+        from system_setup.tasks.shell import ShellTask
+
+        registry = TaskRegistry()
+        registry._tasks['shell'] = 'system_setup.tasks.shell:ShellTask'
+
+        assert registry.list_tasks() == ['shell']
+        assert registry.get('shell') is ShellTask
+        assert registry._tasks['shell'] is ShellTask
+
+    def test_registry_create_legacy_task_without_platform(self):
+        """Test tasks whose constructor lacks platform are built without it."""
+        from system_setup.tasks.registry import TaskRegistry
+
+        class LegacyTask:
+            def __init__(self, config, state, dry_run=False, auto_yes=False):
+                self.dry_run = dry_run
+
+        registry = TaskRegistry()
+        registry._tasks['legacy'] = LegacyTask
+
+        task = registry.create_task(
+            'legacy',
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+            dry_run=True,
+        )
+        assert isinstance(task, LegacyTask)
+        assert task.dry_run is True
+
+    def test_registry_resolve_dependencies(self):
+        """Test dependencies are ordered first and cycles are rejected."""
+        from system_setup.tasks.registry import TaskRegistry
+
+        def make_task(deps):
+            return type('FakeTask', (), {'depends_on': tuple(deps)})
+
+        registry = TaskRegistry()
+        registry._tasks = {
+            'packages': make_task([]),
+            'fish': make_task(['packages']),
+            'shell': make_task(['fish']),
+            'settings': make_task([]),
+        }
+
+        assert registry.resolve_dependencies(['shell', 'settings', 'fish', 'packages']) == [
+            'settings', 'packages', 'fish', 'shell',
+        ]
+        # Unrequested dependencies are assumed done
+        assert registry.resolve_dependencies(['shell', 'settings']) == ['shell', 'settings']
+
+        registry._tasks['packages'] = make_task(['shell'])
+        with pytest.raises(ValueError, match="Circular dependency"):
+            registry.resolve_dependencies(['packages', 'fish', 'shell'])
+
 
 class TestPackagesTask:
     """Tests for PackagesTask."""
@@ -247,9 +361,10 @@ class TestPackagesTask:
 
     def test_packages_task_get_packages(self):
         """Test package list retrieval."""
+        from system_setup.config import Config
         from system_setup.tasks.packages import PackagesTask
 
-        mock_config = MagicMock()
+        mock_config = MagicMock(spec_set=Config)
         mock_config.get_packages_for_platform.return_value = ['vim', 'git', 'curl']
 
         mock_state = MagicMock()
@@ -267,9 +382,40 @@ class TestPackagesTask:
         packages = task._get_packages()
         assert isinstance(packages, list)
 
+    def test_detect_linux_distro_from_os_release(self):
+        """Test distro detection matches os-release ID and ID_LIKE fields."""
+        from system_setup.tasks import packages
+
+        cases = [
+            ({'ID': 'manjaro', 'ID_LIKE': 'arch'}, 'arch'),
+            ({'ID': 'ubuntu', 'ID_LIKE': 'debian'}, 'debian'),
+            ({'ID': 'fedora'}, 'fedora'),
+            ({'ID': 'opensuse-tumbleweed', 'HOME_URL': 'https://archive.org'}, None),
+        ]
+        try:
+            for info, expected in cases:
+                packages._os_release_distro.cache_clear()
+                with patch.object(packages, '_read_os_release', return_value=info):
+                    assert packages._os_release_distro() == expected
+        finally:
+            packages._os_release_distro.cache_clear()
+
+    def test_package_set_partitions_casks(self):
+        """Test packages are split into formulae and casks in one pass."""
+        from system_setup.tasks.packages import PackageSet
+
+        packages = PackageSet.from_list(['git', 'firefox.cask', 'vim'])
+
+        assert len(packages) == 3
+        assert packages.packages == ['git', 'firefox.cask', 'vim']
+        assert packages.formulae == ['git', 'vim']
+        assert packages.casks == ['firefox']
+        assert packages.display_names == ['git', 'firefox (cask)', 'vim']
+
     @patch('system_setup.packages.factory.get_package_manager')
     def test_packages_task_dry_run(self, mock_get_pm):
         """Test PackagesTask in dry-run mode."""
+        from system_setup.config import Config
         from system_setup.tasks.packages import PackagesTask
 
         mock_pm = MagicMock()
@@ -277,7 +423,7 @@ class TestPackagesTask:
         mock_pm.update.return_value = True
         mock_get_pm.return_value = mock_pm
 
-        mock_config = MagicMock()
+        mock_config = MagicMock(spec_set=Config)
         mock_config.get_packages_for_platform.return_value = ['vim', 'git']
 
         mock_state = MagicMock()
@@ -302,72 +448,361 @@ class TestPackagesTask:
         mock_pm.install.assert_not_called()
 
 
-class TestAllTasksInheritFromBaseTask:
-    """Test that all tasks properly inherit from BaseTask."""
+class TestDotfilesTask:
+    """Tests for DotfilesTask."""
 
-    def test_all_tasks_inherit(self):
-        """Verify all task classes inherit from BaseTask."""
-        from system_setup.tasks.base import BaseTask
-        from system_setup.tasks.packages import PackagesTask
-        from system_setup.tasks.chezmoi import ChezmoiTask
+    def test_install_dotfiles_copies_and_merges(self, tmp_path):
+        """Test dotfiles are streamed from the archive, backed up and merged."""
+        import tarfile
         from system_setup.tasks.dotfiles import DotfilesTask
-        from system_setup.tasks.fish import FishTask
-        from system_setup.tasks.modern_tools import ModernToolsTask
-        from system_setup.tasks.settings import SettingsTask
-        from system_setup.tasks.shell import ShellTask
-        from system_setup.tasks.hyprland import HyprlandTask
-
-        tasks = [
-            PackagesTask,
-            ChezmoiTask,
-            DotfilesTask,
-            FishTask,
-            ModernToolsTask,
-            SettingsTask,
-            ShellTask,
-            HyprlandTask,
-        ]
 
-        for task_class in tasks:
-            assert issubclass(task_class, BaseTask), \
-                f"{task_class.__name__} does not inherit from BaseTask"
+        source = tmp_path / 'src' / 'dotfiles'
+        (source / '.config' / 'app').mkdir(parents=True)
+        (source / '.bashrc').write_text('new bashrc')
+        (source / '.config' / 'app' / 'settings').write_text('settings')
+        (source / 'README').write_text('not a dotfile')
 
-    def test_all_tasks_have_required_properties(self):
-        """Verify all tasks implement required properties."""
-        from system_setup.tasks.packages import PackagesTask
-        from system_setup.tasks.chezmoi import ChezmoiTask
+        archive = tmp_path / 'dotfiles.tar.gz'
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(source, arcname='dotfiles')
+
+        home = tmp_path / 'home'
+        (home / '.config').mkdir(parents=True)
+        (home / '.bashrc').write_text('old bashrc')
+        (home / '.config' / 'keep').write_text('keep')
+
+        with patch('pathlib.Path.home', return_value=home):
+            task = DotfilesTask(
+                config=MagicMock(dotfiles_checksum=None),
+                state=MagicMock(),
+                platform=MagicMock(),
+                auto_yes=True,
+            )
+        task.temp_archive = archive
+
+        assert task._install_dotfiles() is True
+
+        assert (home / '.bashrc').read_text() == 'new bashrc'
+        assert (home / '.bashrc.backup').read_text() == 'old bashrc'
+        assert (home / '.config' / 'app' / 'settings').read_text() == 'settings'
+        assert (home / '.config' / 'keep').read_text() == 'keep'
+        assert not (home / 'README').exists()
+
+    def test_merge_keeps_newer_destination_files(self, tmp_path):
+        """Test merging only overwrites files older than the archive copy."""
+        import os
+        import tarfile
         from system_setup.tasks.dotfiles import DotfilesTask
-        from system_setup.tasks.fish import FishTask
-        from system_setup.tasks.modern_tools import ModernToolsTask
-        from system_setup.tasks.settings import SettingsTask
-        from system_setup.tasks.shell import ShellTask
-        from system_setup.tasks.hyprland import HyprlandTask
-
-        task_classes = [
-            PackagesTask,
-            ChezmoiTask,
-            DotfilesTask,
-            FishTask,
-            ModernToolsTask,
-            SettingsTask,
-            ShellTask,
-            HyprlandTask,
-        ]
 
-        mock_config = MagicMock()
-        mock_state = MagicMock()
-        mock_platform = MagicMock()
+        source = tmp_path / 'src' / 'dotfiles' / '.config'
+        source.mkdir(parents=True)
+        (source / 'newer').write_text('from archive')
+        (source / 'older').write_text('from archive')
+
+        archive = tmp_path / 'dotfiles.tar.gz'
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(source.parent, arcname='dotfiles')
+
+        dest = tmp_path / 'home' / '.config'
+        dest.mkdir(parents=True)
+        (dest / 'newer').write_text('local edit')
+        (dest / 'older').write_text('stale')
+        future = (source / 'newer').stat().st_mtime + 3600
+        os.utime(dest / 'newer', (future, future))
+        os.utime(dest / 'older', (0, 0))
+
+        with patch('pathlib.Path.home', return_value=tmp_path / 'home'):
+            task = DotfilesTask(
+                config=MagicMock(dotfiles_checksum=None),
+                state=MagicMock(),
+                platform=MagicMock(),
+                auto_yes=True,
+            )
+        task.temp_archive = archive
+
+        assert task._install_dotfiles() is True
+
+        assert (dest / 'newer').read_text() == 'local edit'
+        assert (dest / 'older').read_text() == 'from archive'
+
+    def test_conflicts_confirmed_in_one_prompt(self, tmp_path):
+        """Test existing dotfiles are listed and confirmed with a single prompt."""
+        import tarfile
+        from system_setup.tasks.dotfiles import DotfilesTask
+        from system_setup.utils.checksum import calculate_sha256
+
+        source = tmp_path / 'src' / 'dotfiles'
+        source.mkdir(parents=True)
+        (source / '.bashrc').write_text('new bashrc')
+        (source / '.vimrc').write_text('new vimrc')
+        (source / '.gitconfig').write_text('gitconfig')
+
+        archive = tmp_path / 'dotfiles.tar.gz'
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(source, arcname='dotfiles')
+
+        home = tmp_path / 'home'
+        home.mkdir()
+        (home / '.bashrc').write_text('old bashrc')
+        (home / '.vimrc').write_text('old vimrc')
+
+        # Checksum is verified in the same pass that lists the conflicts
+        checksum = calculate_sha256(archive)
+        with patch('pathlib.Path.home', return_value=home):
+            task = DotfilesTask(
+                config=MagicMock(dotfiles_checksum=checksum),
+                state=MagicMock(),
+                platform=MagicMock(),
+            )
+        task.temp_archive = archive
+
+        with patch('builtins.input', side_effect=['y', 'n']) as mock_input:
+            assert task._install_dotfiles() is True
+
+        assert mock_input.call_count == 2
+        assert (home / '.bashrc').read_text() == 'old bashrc'
+        assert (home / '.vimrc').read_text() == 'old vimrc'
+        assert (home / '.gitconfig').read_text() == 'gitconfig'
+
+    def test_file_in_the_way_of_directory_is_confirmed_and_backed_up(self, tmp_path):
+        """Test a file where the archive has a directory is prompted for and kept."""
+        import os
+        import tarfile
+        from system_setup.tasks.dotfiles import DotfilesTask
+
+        source = tmp_path / 'src' / 'dotfiles'
+        (source / '.config').mkdir(parents=True)
+        (source / '.config' / 'settings').write_text('settings')
+        os.symlink('settings', source / '.config' / 'link')
+
+        archive = tmp_path / 'dotfiles.tar.gz'
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(source, arcname='dotfiles')
+
+        home = tmp_path / 'home'
+        home.mkdir()
+        (home / '.config').write_text('user data')
+
+        with patch('pathlib.Path.home', return_value=home):
+            task = DotfilesTask(
+                config=MagicMock(dotfiles_checksum=None),
+                state=MagicMock(),
+                platform=MagicMock(),
+            )
+        task.temp_archive = archive
+        task._logger = MagicMock()
+
+        with patch('builtins.input', side_effect=['y', 'a']) as mock_input:
+            assert task._install_dotfiles() is True
+
+        assert mock_input.call_count == 2
+        assert (home / '.config.backup').read_text() == 'user data'
+        assert (home / '.config' / 'settings').read_text() == 'settings'
+        warnings = [c.args[0] for c in task._logger.warning.call_args_list]
+        assert any('symlink' in w and 'link' in w for w in warnings)
+
+    def test_checksum_mismatch_installs_nothing(self, tmp_path):
+        """Test a bad checksum removes the archive before any file is written."""
+        import tarfile
+        from system_setup.tasks.dotfiles import DotfilesTask
+
+        source = tmp_path / 'src' / 'dotfiles'
+        source.mkdir(parents=True)
+        (source / '.bashrc').write_text('new bashrc')
 
-        for task_class in task_classes:
-            task = task_class(
-                config=mock_config,
-                state=mock_state,
-                platform=mock_platform,
+        archive = tmp_path / 'dotfiles.tar.gz'
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(source, arcname='dotfiles')
+
+        home = tmp_path / 'home'
+        home.mkdir()
+
+        with patch('pathlib.Path.home', return_value=home):
+            task = DotfilesTask(
+                config=MagicMock(dotfiles_checksum='0' * 64, checksum_required=True),
+                state=MagicMock(),
+                platform=MagicMock(),
+                auto_yes=True,
             )
+        task.temp_archive = archive
+
+        assert task._install_dotfiles() is False
+
+        assert not archive.exists()
+        assert not (home / '.bashrc').exists()
+
+
+class TestShellTask:
+    """Tests for ShellTask."""
+
+    def test_macos_shell_matches_whole_etc_shells_lines(self):
+        """Test /etc/shells is only appended to when no line equals zsh_path."""
+        from unittest.mock import mock_open
+        from system_setup.platform.macos import MacOSPlatform
+        from system_setup.tasks.shell import ShellTask
+
+        platform = MagicMock(spec=MacOSPlatform)
+        platform.zsh_path = '/opt/homebrew/bin/zsh'
+        task = ShellTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=platform,
+            auto_yes=True,
+        )
+        task._cmd = MagicMock()
+        task._logger = MagicMock()
+
+        shells = '/bin/zsh\n/opt/homebrew/bin/zsh-5.9\n'
+        with patch('builtins.open', mock_open(read_data=shells)):
+            assert task._configure_macos_shell() is True
+        task._cmd.run_sudo.assert_called_once_with(
+            ['tee', '-a', '/etc/shells'], input='/opt/homebrew/bin/zsh\n'
+        )
+
+        task._cmd.reset_mock()
+        with patch('builtins.open', mock_open(read_data=shells + '/opt/homebrew/bin/zsh\n')):
+            assert task._configure_macos_shell() is True
+        task._cmd.run_sudo.assert_not_called()
+
+    @patch('system_setup.tasks.shell.shutil.which')
+    def test_linux_shell_located_on_path(self, mock_which):
+        """Test the Linux default shell is resolved with a PATH lookup."""
+        from system_setup.tasks.shell import ShellTask
+
+        mock_which.return_value = '/usr/local/bin/zsh'
+        task = ShellTask(
+            config=MagicMock(fish_enabled=False),
+            state=MagicMock(),
+            platform=MagicMock(),
+            auto_yes=True,
+        )
+        task._cmd = MagicMock()
+        task._logger = MagicMock()
+
+        assert task._configure_linux_shell() is True
+        mock_which.assert_called_once_with('zsh')
+        task._cmd.run.assert_called_once_with(['chsh', '-s', '/usr/local/bin/zsh'], check=False)
+
+        mock_which.return_value = None
+        task._cmd.reset_mock()
+        assert task._configure_linux_shell() is True
+        task._cmd.run.assert_not_called()
+
+
+class TestSettingsTask:
+    """Tests for SettingsTask."""
+
+    def test_settings_group_runs_argv_without_shell(self):
+        """Test settings commands run as argv lists and failures are reported."""
+        from system_setup.tasks.settings import SettingsTask
+        from system_setup.utils.command import CommandRunner
+
+        task = SettingsTask(
+            config=MagicMock(),
+            state=MagicMock(),
+            platform=MagicMock(),
+            auto_yes=True,
+        )
+        task._cmd = CommandRunner()
+        task._logger = MagicMock()
+
+        with patch.object(task._cmd, 'run', wraps=task._cmd.run) as mock_run:
+            task._apply_settings_group("Test", [['true'], ['false'], ['true']])
+
+        assert mock_run.call_count == 3
+        assert all(not c[1].get('shell') for c in mock_run.call_args_list)
+        task._logger.warning.assert_called_once_with("1 Test setting(s) failed:\n  Failed: false")
+
+    def test_settings_groups_prompted_once(self):
+        """Test all settings groups are chosen from a single prompt."""
+        from system_setup.tasks.settings import SettingsTask
+
+        task = SettingsTask(
+            config=MagicMock(get_bool=MagicMock(return_value=False)),
+            state=MagicMock(),
+            platform=MagicMock(),
+        )
+        task._logger = MagicMock()
+        groups = {"Dock": ['true'], "Finder": ['true'], "General": ['true']}
+
+        with patch('builtins.input', return_value='1, 3') as mock_input, \
+                patch.object(task, '_apply_settings_group') as mock_apply:
+            task._apply_settings_groups(groups)
+
+        mock_input.assert_called_once()
+        assert [c[0][0] for c in mock_apply.call_args_list] == ["Dock", "General"]
+        task._logger.info.assert_any_call("Skipped: Finder")
+
+    def test_settings_groups_applied_concurrently(self):
+        """Test approved groups run on worker threads when parallel is enabled."""
+        import threading
+        from system_setup.tasks.settings import SettingsTask
+
+        task = SettingsTask(
+            config=MagicMock(get_bool=MagicMock(return_value=True)),
+            state=MagicMock(),
+            platform=MagicMock(),
+            auto_yes=True,
+        )
+        task._logger = MagicMock()
+        threads = {}
+
+        def record(name, commands):
+            threads[name] = threading.current_thread()
+
+        with patch.object(task, '_apply_settings_group', side_effect=record):
+            task._apply_settings_groups({"Dock": ['true'], "Finder": ['true']})
+
+        assert set(threads) == {"Dock", "Finder"}
+        assert threading.main_thread() not in threads.values()
+
+
+ALL_TASK_CLASSES = [
+    "packages:PackagesTask",
+    "chezmoi:ChezmoiTask",
+    "dotfiles:DotfilesTask",
+    "fish:FishTask",
+    "modern_tools:ModernToolsTask",
+    "settings:SettingsTask",
+    "shell:ShellTask",
+    "hyprland:HyprlandTask",
+]
+
+
+def _load_task_class(spec):
+    """Import a task class from a "module:Class" spec under system_setup.tasks."""
+    from importlib import import_module
+
+    module_name, class_name = spec.split(":")
+    return getattr(import_module(f"system_setup.tasks.{module_name}"), class_name)
+
+
+@pytest.mark.parametrize("spec", ALL_TASK_CLASSES, ids=lambda spec: spec.split(":")[1])
+class TestAllTasksInheritFromBaseTask:
+    """Test that all tasks properly inherit from BaseTask."""
+
+    def test_all_tasks_inherit(self, spec):
+        """Verify the task class inherits from BaseTask."""
+        from system_setup.tasks.base import BaseTask
+
+        task_class = _load_task_class(spec)
+
+        assert issubclass(task_class, BaseTask), \
+            f"{task_class.__name__} does not inherit from BaseTask"
+
+    def test_all_tasks_have_required_properties(self, spec, mock_config, mock_state, mock_platform):
+        """Verify the task implements required properties."""
+        task_class = _load_task_class(spec)
+
+        task = task_class(
+            config=mock_config,
+            state=mock_state,
+            platform=mock_platform,
+        )
 
-            # All tasks must have these
-            assert isinstance(task.name, str), f"{task_class.__name__} name is not a string"
-            assert len(task.name) > 0, f"{task_class.__name__} name is empty"
-            assert isinstance(task.description, str), f"{task_class.__name__} description is not a string"
-            assert isinstance(task.state_key, str), f"{task_class.__name__} state_key is not a string"
-            assert callable(task.run), f"{task_class.__name__} run is not callable"
+        # All tasks must have these
+        assert isinstance(task.name, str), f"{task_class.__name__} name is not a string"
+        assert len(task.name) > 0, f"{task_class.__name__} name is empty"
+        assert isinstance(task.description, str), f"{task_class.__name__} description is not a string"
+        assert isinstance(task.state_key, str), f"{task_class.__name__} state_key is not a string"
+        assert callable(task.run), f"{task_class.__name__} run is not callable"
@@ -1,41 +1,93 @@
 """Tests for utility functions."""
 
-import tempfile
+import os
+import sys
 from pathlib import Path
 
 import pytest
 
-from system_setup.utils.checksum import calculate_sha256, verify_sha256
+from system_setup.utils.checksum import (
+    HashingReader,
+    calculate_sha256,
+    normalize_hash,
+    verify_sha256,
+)
 
+# Known SHA256 of "Hello, World!"
+HELLO_WORLD_SHA256 = "dffd6021bb2bd5b0af676290809ec3a53191dd81c7f70a4b28688a362182986f"
 
-def test_calculate_sha256(tmp_path):
+
+def test_calculate_sha256(hello_world_file):
     """Test SHA256 calculation."""
-    test_file = tmp_path / "test.txt"
-    test_file.write_text("Hello, World!")
+    assert calculate_sha256(hello_world_file) == HELLO_WORLD_SHA256
 
-    # Known SHA256 of "Hello, World!"
-    expected = "dffd6021bb2bd5b0af676290809ec3a53191dd81c7f70a4b28688a362182986f"
-    actual = calculate_sha256(test_file)
 
-    assert actual == expected
+def test_calculate_sha256_chunked_fallback(tmp_path, monkeypatch):
+    """Test the pre-3.11 fallback hashes across chunk boundaries."""
+    import hashlib
 
+    test_file = tmp_path / "test.bin"
+    data = bytes(range(256)) * 40
+    test_file.write_bytes(data)
+    monkeypatch.delattr(hashlib, "file_digest", raising=False)
 
-def test_verify_sha256_success(tmp_path):
-    """Test successful checksum verification."""
-    test_file = tmp_path / "test.txt"
-    test_file.write_text("Hello, World!")
+    assert calculate_sha256(test_file, chunk_size=1000) == hashlib.sha256(data).hexdigest()
 
-    expected = "dffd6021bb2bd5b0af676290809ec3a53191dd81c7f70a4b28688a362182986f"
-    assert verify_sha256(test_file, expected) is True
 
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="hashlib.file_digest is 3.11+")
+def test_calculate_sha256_uses_file_digest(tmp_path, monkeypatch):
+    """Test large files are hashed by hashlib.file_digest, not a Python loop."""
+    import hashlib
+
+    test_file = tmp_path / "big.bin"
+    data = os.urandom(4 * 1024 * 1024)
+    test_file.write_bytes(data)
+
+    calls = []
+    real_file_digest = hashlib.file_digest
+
+    def file_digest(fileobj, digest):
+        calls.append(digest)
+        return real_file_digest(fileobj, digest)
+
+    monkeypatch.setattr(hashlib, "file_digest", file_digest)
+
+    assert calculate_sha256(test_file) == hashlib.sha256(data).hexdigest()
+    assert calls == ["sha256"]
 
-def test_verify_sha256_failure(tmp_path):
-    """Test failed checksum verification."""
-    test_file = tmp_path / "test.txt"
-    test_file.write_text("Hello, World!")
 
+def test_verify_sha256_success(hello_world_file):
+    """Test successful checksum verification."""
+    assert verify_sha256(hello_world_file, HELLO_WORLD_SHA256) is True
+
+
+def test_verify_sha256_failure(hello_world_file):
+    """Test failed checksum verification."""
     wrong_hash = "0" * 64
-    assert verify_sha256(test_file, wrong_hash) is False
+    assert verify_sha256(hello_world_file, wrong_hash) is False
+
+
+def test_verify_sha256_normalizes_expected_hash(hello_world_file):
+    """Test expected hashes are accepted in any case and rejected if malformed."""
+    expected = HELLO_WORLD_SHA256.upper() + "\n"
+    assert verify_sha256(hello_world_file, expected) is True
+    assert verify_sha256(hello_world_file, "not-a-hash") is False
+
+
+def test_verify_sha256_accepts_normalized_hash(hello_world_file):
+    """Test a hash normalized once can be reused as digest bytes."""
+    expected = normalize_hash(f" {HELLO_WORLD_SHA256.upper()} ")
+    assert len(expected) == 32
+    assert verify_sha256(hello_world_file, expected) is True
+    assert verify_sha256(hello_world_file, bytes(32)) is False
+
+
+def test_hashing_reader_hashes_unread_remainder(hello_world_file):
+    """Test HashingReader digests the whole file even after a partial read."""
+    with hello_world_file.open('rb') as f:
+        reader = HashingReader(f)
+        assert reader.read(5) == b"Hello"
+        assert reader.hexdigest() == calculate_sha256(hello_world_file)
 
 
 def test_verify_sha256_missing_file(tmp_path):
@@ -44,3 +96,153 @@ def test_verify_sha256_missing_file(tmp_path):
 
     with pytest.raises(FileNotFoundError):
         verify_sha256(missing_file, "0" * 64)
+
+
+def _stream_response(raw, status_code=200, headers=None):
+    """Build a mock streaming response whose body is read from raw."""
+    from unittest.mock import MagicMock
+
+    response = MagicMock()
+    response.raw = raw
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.__enter__.return_value = response
+    return response
+
+
+def test_download_file_streams_body(tmp_path):
+    """Test download_file copies the decoded raw stream to disk."""
+    import io
+    from unittest.mock import patch
+
+    from system_setup.utils.download import download_file
+
+    data = b"x" * 3_000_000
+    response = _stream_response(io.BytesIO(data))
+    destination = tmp_path / "sub" / "file.bin"
+
+    with patch("requests.Session.get", return_value=response):
+        assert download_file("https://example.com/file.bin", destination) is True
+
+    assert response.raw.decode_content is True
+    assert destination.read_bytes() == data
+
+
+def test_download_file_resumes_partial_download(tmp_path):
+    """Test a failure mid-stream keeps the .part file and the retry resumes it."""
+    import io
+    from unittest.mock import MagicMock, patch
+
+    import requests
+    import urllib3
+
+    from system_setup.utils.download import download_file
+
+    raw = MagicMock()
+    raw.read.side_effect = [b"partial", urllib3.exceptions.ProtocolError("reset")]
+    destination = tmp_path / "file.bin"
+    part = tmp_path / "file.bin.part"
+
+    first = _stream_response(raw, headers={"ETag": '"v1"'})
+    with patch("requests.Session.get", return_value=first):
+        with pytest.raises(requests.RequestException):
+            download_file("https://example.com/file.bin", destination)
+
+    assert not destination.exists()
+    assert part.read_bytes() == b"partial"
+
+    response = _stream_response(
+        io.BytesIO(b" rest"), status_code=206, headers={"Content-Range": "bytes 7-11/12"},
+    )
+    with patch("requests.Session.get", return_value=response) as mock_get:
+        assert download_file("https://example.com/file.bin", destination) is True
+
+    headers = mock_get.call_args.kwargs["headers"]
+    assert headers["Range"] == "bytes=7-"
+    assert headers["If-Range"] == '"v1"'
+    assert destination.read_bytes() == b"partial rest"
+    assert list(tmp_path.iterdir()) == [destination]
+
+
+def test_download_file_restarts_changed_file(tmp_path):
+    """Test a .part is replaced, not appended to, when the server sends a full body."""
+    import io
+    from unittest.mock import patch
+
+    from system_setup.utils.download import download_file
+
+    destination = tmp_path / "file.bin"
+    (tmp_path / "file.bin.part").write_bytes(b"old prefix")
+    (tmp_path / "file.bin.part.validator").write_text('"v1"')
+
+    # If-Range didn't match: the server answers 200 with the new file
+    response = _stream_response(io.BytesIO(b"new file"), headers={"ETag": '"v2"'})
+    with patch("requests.Session.get", return_value=response):
+        assert download_file("https://example.com/file.bin", destination) is True
+
+    assert destination.read_bytes() == b"new file"
+
+
+def test_download_file_discards_part_without_validator(tmp_path):
+    """Test a .part with no recorded ETag/Last-Modified is not resumed."""
+    import io
+    from unittest.mock import patch
+
+    from system_setup.utils.download import download_file
+
+    destination = tmp_path / "file.bin"
+    (tmp_path / "file.bin.part").write_bytes(b"unknown")
+
+    response = _stream_response(io.BytesIO(b"whole file"))
+    with patch("requests.Session.get", return_value=response) as mock_get:
+        assert download_file("https://example.com/file.bin", destination) is True
+
+    assert "Range" not in mock_get.call_args.kwargs["headers"]
+    assert destination.read_bytes() == b"whole file"
+
+
+def test_download_file_rejects_misaligned_range(tmp_path):
+    """Test a 206 that doesn't start at the .part size is not appended."""
+    import io
+    from unittest.mock import patch
+
+    import requests
+
+    from system_setup.utils.download import download_file
+
+    destination = tmp_path / "file.bin"
+    (tmp_path / "file.bin.part").write_bytes(b"partial")
+    (tmp_path / "file.bin.part.validator").write_text('"v1"')
+
+    response = _stream_response(
+        io.BytesIO(b"whole file"), status_code=206, headers={"Content-Range": "bytes 0-9/10"},
+    )
+    with patch("requests.Session.get", return_value=response):
+        with pytest.raises(requests.HTTPError):
+            download_file("https://example.com/file.bin", destination)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_from_gdrive_uses_library_in_process(tmp_path):
+    """Test an importable gdown is called directly instead of via its CLI."""
+    import sys
+    from unittest.mock import MagicMock, patch
+
+    from system_setup.utils.download import download_from_gdrive
+
+    destination = tmp_path / "dotfiles.tar.gz"
+
+    def fake_download(url, output, quiet):
+        Path(output).write_bytes(b"archive")
+        return output
+
+    gdown = MagicMock()
+    gdown.download.side_effect = fake_download
+
+    with patch.dict(sys.modules, {"gdown": gdown}), patch("subprocess.run") as mock_run:
+        assert download_from_gdrive("abc123", destination) is True
+
+    mock_run.assert_not_called()
+    assert gdown.download.call_args.args[0].endswith("id=abc123")
+    assert destination.read_bytes() == b"archive"